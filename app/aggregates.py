@@ -0,0 +1,269 @@
+"""
+Aggregate index (cube) ของผลวิเคราะห์รีวิว
+
+เก็บจำนวนแยกตาม (platform, day, aspect, sentiment) ไว้ล่วงหน้า
+เพื่อให้ metrics ของ filter ใดๆ ได้จากการรวม cell เล็กๆ แทนการวนรีวิวทั้งหมดใหม่
+trend รายสัปดาห์/รายเดือนได้จากการรวม cell รายวันเข้า bucket ที่ใหญ่กว่า (ไม่ขึ้นกับจำนวนรีวิว)
+"""
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SENTIMENTS = ("positive", "negative", "neutral")
+GRANULARITIES = ("day", "week", "month")
+_SENTIMENT_INDEX = {s: i for i, s in enumerate(SENTIMENTS)}
+
+
+def review_platform(review: dict) -> str:
+    return (review.get("source_platform") or "unknown").lower()
+
+
+def review_day(review: dict) -> str:
+    # รองรับทั้ง "2024-01-15" และ "2024-01-15T09:30:00Z"
+    return (review.get("review_date") or "")[:10]
+
+
+@lru_cache(maxsize=16384)
+def bucket_start(day: str, granularity: str) -> Optional[str]:
+    """วันแรกของ bucket ที่ day อยู่ (week เริ่มวันจันทร์แบบ ISO) หรือ None ถ้า day ไม่ใช่วันที่"""
+    try:
+        d = date.fromisoformat(day)
+    except ValueError:
+        return None
+    if granularity == "week":
+        d -= timedelta(days=d.weekday())
+    elif granularity == "month":
+        d = d.replace(day=1)
+    return d.isoformat()
+
+
+def next_bucket(bucket: str, granularity: str) -> str:
+    d = date.fromisoformat(bucket)
+    if granularity == "day":
+        d += timedelta(days=1)
+    elif granularity == "week":
+        d += timedelta(days=7)
+    else:
+        d = d.replace(year=d.year + 1, month=1) if d.month == 12 else d.replace(month=d.month + 1)
+    return d.isoformat()
+
+
+class _PlatformCube:
+    """cell รายวันของ platform เดียว เรียงตามวันที่เพื่อหา range ด้วย bisect"""
+
+    def __init__(self):
+        self.days: List[str] = []
+        self.review_counts: Dict[str, int] = {}
+        # day -> Counter[(ASPECT, sentiment)]
+        self.cells: Dict[str, Counter] = {}
+        # day -> [positive, negative, neutral] รวมทุก aspect (trend ที่ไม่ได้เลือก aspect ไม่ต้องวนทุก cell)
+        self.sentiments: Dict[str, List[int]] = {}
+        # day -> จำนวนรีวิวที่มี sentiment นั้นอย่างน้อยหนึ่ง aspect (รีวิวเดียวนับครั้งเดียว)
+        self.review_sentiments: Dict[str, List[int]] = {}
+
+    def cell(self, day: str) -> Counter:
+        cell = self.cells.get(day)
+        if cell is None:
+            insort(self.days, day)
+            self.review_counts[day] = 0
+            self.sentiments[day] = [0, 0, 0]
+            self.review_sentiments[day] = [0, 0, 0]
+            cell = self.cells[day] = Counter()
+        return cell
+
+    def day_range(self, from_date: Optional[str], to_date: Optional[str]) -> List[str]:
+        lo = bisect_left(self.days, from_date) if from_date else 0
+        hi = bisect_right(self.days, to_date) if to_date else len(self.days)
+        return self.days[lo:hi]
+
+
+class AggregateIndex:
+    """Cube ของจำนวนรีวิวและ sentiment ต่อ aspect ของ batch หนึ่ง"""
+
+    def __init__(self, reviews: Iterable[dict] = ()):
+        self.platforms: Dict[str, _PlatformCube] = {}
+        for r in reviews:
+            self.add(r)
+
+    def add(self, review: dict) -> None:
+        """บวกรีวิวหนึ่งรายการเข้า cube"""
+        platform = review_platform(review)
+        cube = self.platforms.get(platform)
+        if cube is None:
+            cube = self.platforms[platform] = _PlatformCube()
+        day = review_day(review)
+        cell = cube.cell(day)
+        cube.review_counts[day] += 1
+        totals = cube.sentiments[day]
+        present = set()
+        for aspect, detail in (review.get("results") or {}).items():
+            sentiment = detail.get("sentiment", "neutral")
+            if sentiment in SENTIMENTS:
+                cell[(aspect.upper(), sentiment)] += 1
+                totals[_SENTIMENT_INDEX[sentiment]] += 1
+                present.add(_SENTIMENT_INDEX[sentiment])
+        review_totals = cube.review_sentiments[day]
+        for i in present:
+            review_totals[i] += 1
+
+    def platform_counts(
+        self, from_date: Optional[str] = None, to_date: Optional[str] = None
+    ) -> Dict[str, int]:
+        """จำนวนรีวิวต่อ platform (ทุก platform) ในช่วงวันที่กำหนด"""
+        return {
+            platform: sum(cube.review_counts[d] for d in cube.day_range(from_date, to_date))
+            for platform, cube in self.platforms.items()
+        }
+
+    def sentiment_counts(
+        self,
+        platforms: Optional[Iterable[str]] = None,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+    ) -> Tuple[Dict[str, int], Dict[str, Dict[str, int]]]:
+        """คืน (overall_sentiment, aspect_metrics) ของ platforms ที่เลือก (None = ทุก platform)"""
+        selected = self.platforms.keys() if platforms is None else {p.lower() for p in platforms}
+        totals: Counter = Counter()
+        for platform in selected:
+            cube = self.platforms.get(platform)
+            if cube is None:
+                continue
+            for day in cube.day_range(from_date, to_date):
+                totals.update(cube.cells[day])
+
+        overall = {s: 0 for s in SENTIMENTS}
+        aspects: Dict[str, Dict[str, int]] = {}
+        for (aspect, sentiment), n in totals.items():
+            if n <= 0:
+                continue
+            overall[sentiment] += n
+            aspects.setdefault(aspect, {s: 0 for s in SENTIMENTS})[sentiment] += n
+        return overall, aspects
+
+    def matching_reviews(
+        self,
+        platforms: Optional[Iterable[str]] = None,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+        aspect: Optional[str] = None,
+        sentiment: Optional[str] = None,
+    ) -> int:
+        """จำนวนรีวิวที่มี aspect / sentiment ตาม filter (แบบเดียวกับ search.matches ที่ไม่มีคำค้น)
+
+        แต่ละรีวิวมี aspect หนึ่งครั้ง จำนวนของ (aspect, sentiment) ใน cell จึงเป็นจำนวนรีวิวพอดี
+        filter แค่ sentiment ใช้ review_sentiments ที่นับรีวิวละครั้ง
+        """
+        selected = self.platforms.keys() if platforms is None else {p.lower() for p in platforms}
+        wanted = [(aspect, s) for s in SENTIMENTS if sentiment is None or s == sentiment] if aspect else None
+        total = 0
+        for platform in selected:
+            cube = self.platforms.get(platform)
+            if cube is None:
+                continue
+            for day in cube.day_range(from_date, to_date):
+                if wanted is not None:
+                    cell = cube.cells[day]
+                    total += sum(cell.get(key, 0) for key in wanted)
+                elif sentiment is not None:
+                    total += cube.review_sentiments[day][_SENTIMENT_INDEX[sentiment]]
+                else:
+                    total += cube.review_counts[day]
+        return total
+
+    def trend(
+        self,
+        granularity: str = "day",
+        platforms: Optional[Iterable[str]] = None,
+        aspect: Optional[str] = None,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+    ) -> List[dict]:
+        """จำนวน sentiment ต่อ bucket เวลา เรียงตามเวลา (bucket ที่ไม่มีรีวิวระหว่างทางได้ค่า 0)
+
+        aspect = None รวมทุก aspect, review_count คือจำนวนรีวิวทั้งหมดของ bucket (ไม่ขึ้นกับ aspect)
+        """
+        selected = self.platforms.keys() if platforms is None else {p.lower() for p in platforms}
+        wanted = [(aspect.upper(), s) for s in SENTIMENTS] if aspect else None
+
+        def days():
+            for platform in selected:
+                cube = self.platforms.get(platform)
+                if cube is None:
+                    continue
+                for day in cube.day_range(from_date, to_date):
+                    if wanted is None:
+                        positive, negative, neutral = cube.sentiments[day]
+                    else:
+                        cell = cube.cells[day]
+                        positive, negative, neutral = (cell.get(key, 0) for key in wanted)
+                    yield day, positive, negative, neutral, cube.review_counts[day]
+
+        return trend_points(days(), granularity)
+
+
+def trend_points(days: Iterable[Tuple[str, int, int, int, int]], granularity: str) -> List[dict]:
+    """รวมแถวรายวัน (day, positive, negative, neutral, review_count) เข้า bucket เรียงตามเวลา
+
+    วันเดียวกันมาได้หลายแถว (เช่นแยก platform) bucket ที่ไม่มีรีวิวระหว่างทางได้ค่า 0
+    """
+    counts: Dict[str, List[int]] = {}
+    for day, positive, negative, neutral, reviews in days:
+        bucket = bucket_start(day, granularity)
+        if bucket is None:
+            continue
+        row = counts.get(bucket)
+        if row is None:
+            row = counts[bucket] = [0, 0, 0, 0]
+        row[0] += positive
+        row[1] += negative
+        row[2] += neutral
+        row[3] += reviews
+
+    points = []
+    if not counts:
+        return points
+    bucket, last = min(counts), max(counts)
+    while bucket <= last:
+        positive, negative, neutral, reviews = counts.get(bucket, (0, 0, 0, 0))
+        points.append({
+            "bucket": bucket,
+            "review_count": reviews,
+            "sentiment": {"positive": positive, "negative": negative, "neutral": neutral},
+        })
+        bucket = next_bucket(bucket, granularity)
+    return points
+
+
+def metrics_delta(added: Iterable[dict] = (), removed: Iterable[dict] = ()) -> dict:
+    """การเปลี่ยนแปลงของ cube เมื่อเพิ่ม/ลบรีวิว แยกเป็น cell ตาม (platform, วัน) (สำหรับส่งเป็น delta ให้ dashboard)
+
+    dashboard เลือกบวกเฉพาะ cell ที่ตรงกับ platform / ช่วงวันที่ที่เปิดอยู่ได้เอง
+    """
+    cells: Dict[Tuple[str, str], list] = {}
+    for sign, reviews in ((1, added), (-1, removed)):
+        for review in reviews:
+            key = (review_platform(review), review_day(review))
+            cell = cells.get(key)
+            if cell is None:
+                cell = cells[key] = [0, Counter(), {}]
+            cell[0] += sign
+            for aspect, detail in (review.get("results") or {}).items():
+                sentiment = detail.get("sentiment", "neutral")
+                if sentiment in SENTIMENTS:
+                    cell[1][sentiment] += sign
+                    cell[2].setdefault(aspect.upper(), Counter())[sentiment] += sign
+    return {
+        "cells": [
+            {
+                "platform": platform,
+                "date": day,
+                "reviews": reviews,
+                "sentiment": {s: n for s, n in overall.items() if n},
+                "aspects": {a: {s: n for s, n in c.items() if n} for a, c in aspects.items() if any(c.values())},
+            }
+            for (platform, day), (reviews, overall, aspects) in sorted(cells.items())
+            if reviews or any(overall.values())
+        ],
+    }
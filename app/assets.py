@@ -0,0 +1,230 @@
+"""
+ส่ง static file และหน้า HTML จาก memory พร้อม gzip / brotli ที่บีบอัดไว้ตั้งแต่ start
+
+- StaticAssets อ่านทุกไฟล์ใน static/ ครั้งเดียวตอนสร้าง แล้วให้ URL แบบมี hash ของเนื้อไฟล์
+  เช่น /static/js/dashboard.3f2a9c1b7d0e.js (Cache-Control: immutable 1 ปี, เนื้อไฟล์เปลี่ยน = URL เปลี่ยน)
+  URL เดิม /static/js/dashboard.js ยังใช้ได้ แต่ browser ต้อง revalidate ด้วย ETag ทุกครั้ง (no-cache)
+- ไฟล์ข้อความ (html / js / css / json / svg) ถูกบีบอัด gzip และ brotli (ถ้าติดตั้ง package brotli) ไว้ล่วงหน้า
+  เก็บเฉพาะแบบที่เล็กลงอย่างน้อย 10% แล้วเลือกตาม Accept-Encoding ต่อ request (jpg / png บีบไม่ลง ส่งตามเดิม)
+- ETag ต่อ encoding + If-None-Match -> 304, Range ช่วงเดียว -> 206 (จากต้นฉบับที่ไม่บีบอัด) พร้อม If-Range
+- render_pages: template ที่ไม่มีข้อมูล dynamic ถูก render ครั้งเดียว แล้วส่งด้วยกลไกเดียวกัน
+
+ไฟล์ที่เพิ่ม/แก้ใน static/ หรือ templates/ หลัง start มีผลเมื่อ restart เท่านั้น
+"""
+import gzip
+import mimetypes
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import PlainTextResponse, Response
+
+from app.cache import etag_matches, make_etag
+
+try:
+    import brotli
+except ImportError:  # brotli เป็น optional dependency (ไม่มีก็ส่งแค่ gzip)
+    brotli = None
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+HASH_LENGTH = 12
+# ต้องเล็กลงอย่างน้อยเท่านี้ถึงจะเก็บแบบบีบอัดไว้ (ไม่คุ้มกับ CPU ฝั่ง browser ถ้าเล็กลงนิดเดียว)
+MIN_SAVING = 0.9
+_COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml", "application/xml")
+
+
+def _compressors() -> List[Tuple[str, Callable[[bytes], bytes]]]:
+    # เรียงตามลำดับที่อยากส่ง: brotli เล็กกว่า gzip
+    found = []
+    if brotli is not None:
+        found.append(("br", lambda body: brotli.compress(body, quality=11)))
+    found.append(("gzip", lambda body: gzip.compress(body, compresslevel=9, mtime=0)))
+    return found
+
+
+class Asset:
+    __slots__ = ("body", "content_type", "etag", "digest", "variants")
+
+    def __init__(self, body: bytes, content_type: str):
+        self.body = body
+        self.content_type = content_type
+        self.etag = make_etag(body)
+        self.digest = self.etag.strip('"')
+        # encoding -> (body ที่บีบอัดแล้ว, ETag ของ representation นั้น)
+        self.variants: Dict[str, Tuple[bytes, str]] = {}
+        if content_type.startswith(_COMPRESSIBLE):
+            for encoding, compress in _compressors():
+                packed = compress(body)
+                if len(packed) <= len(body) * MIN_SAVING:
+                    self.variants[encoding] = (packed, f'"{self.digest}-{encoding}"')
+
+
+def content_type_of(path: str) -> str:
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if content_type.startswith("text/") or content_type == "application/javascript":
+        content_type += "; charset=utf-8"
+    return content_type
+
+
+def hashed_name(path: str, digest: str) -> str:
+    """"js/dashboard.js" -> "js/dashboard.<hash>.js" """
+    head, tail = os.path.split(path)
+    stem, ext = os.path.splitext(tail)
+    return os.path.join(head, f"{stem}.{digest[:HASH_LENGTH]}{ext}").replace(os.sep, "/")
+
+
+def accepted_encodings(header: Optional[str]) -> Dict[str, float]:
+    """Accept-Encoding -> {encoding: q} (ไม่สนใจ parameter อื่นนอกจาก q)"""
+    accepted: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    return accepted
+
+
+def parse_range(header: str, size: int):
+    """
+    "bytes=a-b" / "bytes=a-" / "bytes=-n" -> (start, end) แบบรวมปลาย
+    คืน None ถ้ารูปแบบผิดหรือขอหลายช่วง (ส่งทั้งไฟล์แทน) และ "unsatisfiable" ถ้าช่วงอยู่นอกไฟล์
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash:
+        return None
+    try:
+        if not first:
+            length = int(last)
+            if length <= 0:
+                return "unsatisfiable"
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        return "unsatisfiable"
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+class StaticAssets:
+    """ASGI app สำหรับ mount ที่ /static (แทน StaticFiles) เนื้อไฟล์ทั้งหมดอยู่ใน memory"""
+
+    def __init__(self, directory: str, prefix: str = "/static"):
+        self.prefix = prefix
+        self.assets: Dict[str, Asset] = {}
+        self.hashed: Dict[str, str] = {}
+        self.immutable = set()
+        for root, _, names in os.walk(directory):
+            for name in sorted(names):
+                full = os.path.join(root, name)
+                path = os.path.relpath(full, directory).replace(os.sep, "/")
+                with open(full, "rb") as f:
+                    asset = Asset(f.read(), content_type_of(name))
+                versioned = hashed_name(path, asset.digest)
+                self.assets[path] = self.assets[versioned] = asset
+                self.hashed[path] = versioned
+                self.immutable.add(versioned)
+        self.served = 0
+        self.not_modified = 0
+        self.partial = 0
+        self.bytes_sent = 0
+        self.bytes_saved = 0
+        self.by_encoding: Dict[str, int] = {}
+
+    def url(self, path: str) -> str:
+        """URL แบบมี hash สำหรับใช้ใน template: {{ static_url('js/dashboard.js') }}"""
+        path = path.lstrip("/")
+        return f"{self.prefix}/{self.hashed.get(path, path)}"
+
+    def respond(self, asset: Asset, headers: Headers, cache_control: str, head: bool = False) -> Response:
+        response_headers = {"Cache-Control": cache_control, "Vary": "Accept-Encoding", "Accept-Ranges": "bytes"}
+        range_header = headers.get("range")
+        if range_header and headers.get("if-range") not in (None, asset.etag):
+            # If-Range ไม่ตรง (ไฟล์เปลี่ยนไปแล้ว หรือเป็นวันที่ซึ่งเราไม่มี Last-Modified) ส่งทั้งไฟล์
+            range_header = None
+
+        # Range ใช้กับต้นฉบับเสมอ (offset ของ client ไม่ขึ้นกับ encoding)
+        encoding, body, etag = None, asset.body, asset.etag
+        if not range_header and asset.variants:
+            accepted = accepted_encodings(headers.get("accept-encoding"))
+            for name, (packed, packed_etag) in asset.variants.items():
+                if accepted.get(name, accepted.get("*", 0.0)) > 0:
+                    encoding, body, etag = name, packed, packed_etag
+                    break
+        response_headers["ETag"] = etag
+
+        if etag_matches(headers.get("if-none-match"), etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=response_headers)
+
+        status = 200
+        if range_header:
+            span = parse_range(range_header, len(body))
+            if span == "unsatisfiable":
+                response_headers["Content-Range"] = f"bytes */{len(body)}"
+                return Response(status_code=416, headers=response_headers)
+            if span is not None:
+                start, end = span
+                response_headers["Content-Range"] = f"bytes {start}-{end}/{len(body)}"
+                body = body[start:end + 1]
+                status = 206
+                self.partial += 1
+        if encoding is not None:
+            response_headers["Content-Encoding"] = encoding
+            self.bytes_saved += len(asset.body) - len(body)
+        self.served += 1
+        self.bytes_sent += len(body)
+        self.by_encoding[encoding or "identity"] = self.by_encoding.get(encoding or "identity", 0) + 1
+        response_headers["Content-Type"] = asset.content_type
+        if head:
+            response_headers["Content-Length"] = str(len(body))
+            body = b""
+        return Response(content=body, status_code=status, headers=response_headers)
+
+    async def __call__(self, scope, receive, send) -> None:
+        assert scope["type"] == "http"
+        if scope["method"] not in ("GET", "HEAD"):
+            response: Response = PlainTextResponse("Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"})
+        else:
+            # path ที่เหลือหลังตัด prefix ของ Mount ("/static/js/a.js" -> "js/a.js")
+            path = scope["path"][len(scope.get("root_path", "")):].lstrip("/")
+            asset = self.assets.get(path)
+            if asset is None:
+                response = PlainTextResponse("Not Found", status_code=404)
+            else:
+                cache_control = IMMUTABLE if path in self.immutable else REVALIDATE
+                response = self.respond(asset, Headers(scope=scope), cache_control, head=scope["method"] == "HEAD")
+        await response(scope, receive, send)
+
+    def stats(self) -> dict:
+        return {
+            "files": len(self.hashed),
+            "bytes": sum(len(self.assets[path].body) for path in self.hashed),
+            "compressed_variants": sum(len(self.assets[path].variants) for path in self.hashed),
+            "brotli": brotli is not None,
+            "served": self.served,
+            "not_modified": self.not_modified,
+            "partial": self.partial,
+            "bytes_sent": self.bytes_sent,
+            "bytes_saved": self.bytes_saved,
+            **{f"served_{name}": count for name, count in self.by_encoding.items()},
+        }
+
+
+def render_pages(templates, names: List[str]) -> Dict[str, Asset]:
+    """render template ที่ไม่ขึ้นกับ request ครั้งเดียว (Jinja2Templates ของ main.py)"""
+    return {name: Asset(templates.get_template(name).render().encode("utf-8"), "text/html; charset=utf-8") for name in names}
@@ -0,0 +1,277 @@
+"""
+Batch registry: ข้อมูลของแต่ละ batch แยกเป็น partition ของตัวเอง
+
+    mock_data/
+        reviews.json, qc_items.json, ...   <- partition ตั้งต้น (layout เดิม) ใช้กับ batch_id ที่ไม่มีโฟลเดอร์ของตัวเอง
+        batches/<batch_id>/reviews.json    <- partition ของ batch (reviews.snap, qc_items.json,
+                                              reviews.ingested.ndjson แบบเดียวกับ partition ตั้งต้น)
+        qc_sessions.json                   <- index ของ session_id -> partition และช่วง qc_item_id
+
+แต่ละ partition ถูกโหลดเมื่อถูกเรียกใช้ครั้งแรก ถ้าประมาณการ memory รวมของ partition ที่โหลดไว้
+เกิน budget (REVIEW_RADAR_BATCH_MEMORY_MB) partition ที่ไม่ได้ใช้นานที่สุดจะถูกปลดออกจาก memory
+โดย on_evict (ใน main.py) จะ flush QC ที่ยังไม่ได้เขียนลง disk ก่อน
+budget เป็นของแต่ละ process (worker) แยกกัน
+"""
+import json
+import os
+import re
+import threading
+from bisect import bisect_right, insort
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.qc_store import DEFAULT_SESSION_ID, item_session
+from app.store import MockDataStore
+
+BATCHES_DIR = "batches"
+SESSION_INDEX = "qc_sessions.json"
+# ไฟล์ของ partition และตัวคูณจากขนาดบน disk เป็นขนาดใน memory โดยประมาณ
+# (JSON ที่ parse แล้วพร้อม index ใหญ่กว่าไฟล์ราว 3-4 เท่า, snapshot อ่าน content จาก mmap
+#  แต่ index ต่อรีวิวใน ReviewDataset ยังอยู่ใน heap ราว 3 เท่าของขนาดไฟล์)
+PARTITION_FILES = {
+    "reviews.json": 4.0,
+    "reviews.snap": 3.0,
+    "reviews.ingested.ndjson": 4.0,
+    "qc_items.json": 4.0,
+}
+_BATCH_ID = re.compile(r"^[A-Za-z0-9_.-]{1,128}$")
+
+
+def batch_memory_budget() -> Optional[int]:
+    """budget เป็น byte จาก REVIEW_RADAR_BATCH_MEMORY_MB (ไม่ตั้ง/0 = ไม่จำกัด)"""
+    value = os.environ.get("REVIEW_RADAR_BATCH_MEMORY_MB", "")
+    try:
+        mb = float(value)
+    except ValueError:
+        return None
+    return int(mb * 1024 * 1024) if mb > 0 else None
+
+
+class BatchPartition:
+    """key = None สำหรับ partition ตั้งต้น (ไฟล์อยู่ที่ root ของ data_dir)
+
+    lock: ถือไว้ตั้งแต่หยิบ QC store ของ partition จนแก้เสร็จ และระหว่าง flush + ปลดออกจาก memory
+    การแก้ไขจึงไม่ตกไปอยู่ใน store ที่ถูกปลดไปแล้ว (หรือถูกปลดระหว่าง flush กับ evict)
+    pins: จำนวนงานยาวที่ถือ dataset ของ partition ไว้ (เช่น ingest แบบ stream) ระหว่างนี้ไม่ถูกปลด
+    """
+
+    __slots__ = ("key", "directory", "lock", "pins")
+
+    def __init__(self, key: Optional[str]):
+        self.key = key
+        self.directory = f"{BATCHES_DIR}/{key}" if key is not None else ""
+        self.lock = threading.Lock()
+        self.pins = 0
+
+    def file(self, name: str) -> str:
+        return f"{self.directory}/{name}" if self.directory else name
+
+
+class SessionIndex:
+    """session_id -> partition และช่วง qc_item_id ของ session (สำหรับ endpoint ที่ไม่มี batch_id ใน path)
+
+    qc_item_id ของ session หนึ่งถูกจองเป็นช่วงต่อเนื่อง จึงหา session ของ item ได้ด้วย bisect
+    """
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.sessions: Dict[int, Dict[str, Any]] = {}
+        self._starts: List[Tuple[int, int]] = []
+        for row in rows or []:
+            self.add(row["session_id"], row.get("batch"), row["first_item_id"], row["last_item_id"])
+
+    def add(self, session_id: int, batch: Optional[str], first_item_id: int, last_item_id: int) -> None:
+        self.sessions[session_id] = {
+            "session_id": session_id,
+            "batch": batch,
+            "first_item_id": first_item_id,
+            "last_item_id": last_item_id,
+        }
+        if last_item_id >= first_item_id:
+            insort(self._starts, (first_item_id, session_id))
+
+    def session(self, session_id: int) -> Optional[Dict[str, Any]]:
+        return self.sessions.get(session_id)
+
+    def item_session(self, qc_item_id: int) -> Optional[Dict[str, Any]]:
+        i = bisect_right(self._starts, (qc_item_id, float("inf"))) - 1
+        if i < 0:
+            return None
+        row = self.sessions[self._starts[i][1]]
+        return row if qc_item_id <= row["last_item_id"] else None
+
+    def next_ids(self) -> Tuple[int, int]:
+        """(session_id, qc_item_id แรก) ถัดไปที่ยังไม่ถูกใช้ในทุก partition"""
+        session_id = max(self.sessions, default=DEFAULT_SESSION_ID - 1) + 1
+        item_id = max((row["last_item_id"] for row in self.sessions.values()), default=0) + 1
+        return session_id, item_id
+
+    def dump(self) -> List[Dict[str, Any]]:
+        return [self.sessions[s] for s in sorted(self.sessions)]
+
+
+class BatchRegistry:
+    def __init__(
+        self,
+        data_store: MockDataStore,
+        on_open: Callable[[BatchPartition], None],
+        on_evict: Callable[[BatchPartition], None],
+        memory_budget: Optional[int] = None,
+    ):
+        self.data_store = data_store
+        self.on_open = on_open
+        self.on_evict = on_evict
+        self.memory_budget = memory_budget
+        # partition ที่โหลดอยู่ เรียงจากใช้ล่าสุดน้อยที่สุด -> มากที่สุด (key -> byte โดยประมาณ)
+        self._loaded: "OrderedDict[Optional[str], int]" = OrderedDict()
+        self._opened: Dict[Optional[str], BatchPartition] = {}
+        self._lock = threading.RLock()
+        self.evictions = 0
+        data_store.register(SESSION_INDEX, SessionIndex)
+
+    def _batch_dir(self, batch_id: str) -> str:
+        return self.data_store.path(f"{BATCHES_DIR}/{batch_id}")
+
+    def batches(self) -> List[str]:
+        """batch_id ที่มีโฟลเดอร์ของตัวเองบน disk"""
+        try:
+            names = os.listdir(self.data_store.path(BATCHES_DIR))
+        except FileNotFoundError:
+            return []
+        return sorted(n for n in names if _BATCH_ID.match(n) and os.path.isdir(self._batch_dir(n)))
+
+    def partition(self, batch_id: str, create: bool = False) -> BatchPartition:
+        """partition ของ batch ถ้ามีโฟลเดอร์อยู่แล้ว (หรือ create=True) ไม่งั้นใช้ partition ตั้งต้น"""
+        key: Optional[str] = None
+        if _BATCH_ID.match(batch_id):
+            if create:
+                os.makedirs(self._batch_dir(batch_id), exist_ok=True)
+            if os.path.isdir(self._batch_dir(batch_id)):
+                key = batch_id
+        return self._open(key)
+
+    def _open(self, key: Optional[str]) -> BatchPartition:
+        with self._lock:
+            partition = self._opened.get(key)
+            if partition is None:
+                partition = self._opened[key] = BatchPartition(key)
+                self.on_open(partition)
+            return partition
+
+    def estimate(self, partition: BatchPartition) -> int:
+        total = 0.0
+        for name, factor in PARTITION_FILES.items():
+            try:
+                total += os.path.getsize(self.data_store.path(partition.file(name))) * factor
+            except FileNotFoundError:
+                continue
+        return int(total)
+
+    def touch(self, partition: BatchPartition, refresh: bool = False) -> None:
+        """บันทึกว่า partition ถูกใช้ (และโหลดอยู่ใน memory) แล้วปลด partition เก่าถ้าเกิน budget
+
+        เรียกใน thread pool หลังโหลดข้อมูล (on_evict flush QC ลง disk) handler ที่ถือ object ของ partition
+        อยู่จึงอ่านต่อได้จนจบ (แต่ partition ที่ถูกปลดจะถูกโหลดใหม่จาก disk ในการเรียกครั้งถัดไป)
+        partition ที่มีคนถือ lock อยู่ (กำลังแก้ QC) ไม่ถูกปลดในรอบนี้ ไม่ต้องรอ lock จึงไม่ deadlock
+        partition ที่ถูก pin ไว้ก็ถูกข้ามเช่นกัน
+        """
+        with self._lock:
+            key = partition.key
+            if key in self._loaded and not refresh:
+                self._loaded.move_to_end(key)
+                return
+            self._loaded[key] = self.estimate(partition)
+            self._loaded.move_to_end(key)
+            if self.memory_budget is None:
+                return
+            # เรียงจากใช้ล่าสุดน้อยที่สุด ไม่รวม partition ที่เพิ่งถูกใช้ (ตัวสุดท้าย)
+            for victim in list(self._loaded)[:-1]:
+                if sum(self._loaded.values()) <= self.memory_budget:
+                    break
+                partition = self._opened[victim]
+                if partition.pins or not partition.lock.acquire(blocking=False):
+                    continue
+                try:
+                    self.on_evict(partition)
+                    del self._loaded[victim]
+                    self.evictions += 1
+                finally:
+                    partition.lock.release()
+
+    def pin(self, partition: BatchPartition) -> None:
+        """กัน partition ไม่ให้ถูกปลดจนกว่าจะ unpin (เรียกก่อนโหลด dataset ที่จะถือไว้นาน)"""
+        with self._lock:
+            partition.pins += 1
+
+    def unpin(self, partition: BatchPartition) -> None:
+        with self._lock:
+            partition.pins -= 1
+
+    def forget(self) -> None:
+        """ล้างสถานะ LRU (เช่นหลัง reload ทั้ง store) ทุก partition จะถูกนับใหม่เมื่อถูกใช้"""
+        with self._lock:
+            self._loaded.clear()
+
+    # --- session index ---
+
+    @property
+    def sessions(self) -> SessionIndex:
+        with self._lock:
+            index = self.data_store.get(SESSION_INDEX)
+            if index is None:
+                index = self.rebuild_sessions()
+            return index
+
+    def session_partition(self, session_id: int) -> Optional[BatchPartition]:
+        row = self.sessions.session(session_id)
+        return self._open(row["batch"]) if row is not None else None
+
+    def item_partition(self, qc_item_id: int) -> Optional[BatchPartition]:
+        row = self.sessions.item_session(qc_item_id)
+        return self._open(row["batch"]) if row is not None else None
+
+    def rebuild_sessions(self) -> SessionIndex:
+        """สร้าง qc_sessions.json ใหม่จาก qc_items.json ของทุก partition
+
+        เรียกเองเมื่อยังไม่มีไฟล์ index และตอน reload (เผื่อ qc_items.json ถูกแก้จากภายนอก)
+        """
+        with self._lock:
+            self.data_store.evict(SESSION_INDEX)
+            index = SessionIndex([])
+            for key in [None, *self.batches()]:
+                path = self.data_store.path(BatchPartition(key).file("qc_items.json"))
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        items = json.load(f) or []
+                except FileNotFoundError:
+                    continue
+                ranges: Dict[int, List[int]] = {}
+                for item in items:
+                    qc_item_id = item.get("qc_item_id")
+                    if not isinstance(qc_item_id, int):
+                        continue
+                    span = ranges.setdefault(item_session(item), [qc_item_id, qc_item_id])
+                    span[0] = min(span[0], qc_item_id)
+                    span[1] = max(span[1], qc_item_id)
+                for session_id, (first, last) in ranges.items():
+                    index.add(session_id, key, first, last)
+            self.data_store.save(SESSION_INDEX, index.dump())
+            return self.data_store.get(SESSION_INDEX)
+
+    def reserve_session(self, partition: BatchPartition, item_count: int) -> Tuple[int, int]:
+        """จอง session_id และช่วง qc_item_id ใหม่ให้ partition แล้วบันทึก index ลง disk"""
+        with self._lock:
+            index = self.sessions
+            session_id, first_item_id = index.next_ids()
+            index.add(session_id, partition.key, first_item_id, first_item_id + item_count - 1)
+            self.data_store.save(SESSION_INDEX, index.dump())
+            return session_id, first_item_id
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "memory_budget": self.memory_budget,
+                "estimated_bytes": sum(self._loaded.values()),
+                "evictions": self.evictions,
+                "loaded": [key or "" for key in self._loaded],
+                "batches": self.batches(),
+            }
@@ -0,0 +1,92 @@
+"""
+LRU cache ของ response ที่ serialise แล้ว พร้อม strong ETag
+
+key = (endpoint, params ที่ normalise แล้ว, version ของข้อมูล) เมื่อข้อมูลเปลี่ยน version ก็เปลี่ยน
+entry เดิมจึงไม่ถูกใช้อีก (และถูกดันออกตาม LRU/TTL หรือ invalidate ตรงๆ)
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, NamedTuple, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    created: float
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 512, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.not_modified = 0
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry.created > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, body: bytes) -> CachedResponse:
+        entry = CachedResponse(body, make_etag(body), time.monotonic())
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def invalidate(self, endpoint: Optional[str] = None) -> None:
+        """ลบ entry ทั้งหมด หรือเฉพาะของ endpoint (สมาชิกตัวแรกของ key)"""
+        with self._lock:
+            if endpoint is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if isinstance(k, tuple) and k and k[0] == endpoint]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "not_modified": self.not_modified,
+        }
+
+    def respond(self, request: Request, entry: CachedResponse) -> Response:
+        """304 ถ้า If-None-Match ตรงกับ ETag ไม่งั้นส่ง body ที่ serialise ไว้แล้ว"""
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), entry.etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in [tag.strip() for tag in header.split(",")]
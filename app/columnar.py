@@ -0,0 +1,114 @@
+"""
+Columnar backing (NumPy) ของผลทำนายระดับ (review, aspect) สำหรับเลือก QC session
+
+เก็บเป็น array ขนานกัน: review index, aspect code และ confidence (float32)
+Bucket A จึงได้จาก np.argpartition แทนการวน heap ทีละแถวใน Python
+metrics ใช้ aggregate cube (รวม cell รายวัน เร็วกว่าการนับทุกแถวด้วย np.bincount)
+
+เป็น optional: ถ้าไม่มี numpy หรือปิดด้วย REVIEW_RADAR_COLUMNAR=0 ระบบจะใช้ dict path ตามเดิม
+"""
+import os
+import random
+from typing import Dict, List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy ไม่ได้อยู่ใน requirements หลัก
+    np = None
+
+
+def columnar_enabled() -> bool:
+    return np is not None and os.environ.get("REVIEW_RADAR_COLUMNAR", "1") != "0"
+
+
+class _Column:
+    """array ที่ต่อท้ายได้แบบ amortised O(1): ขยาย capacity ทีละ 2 เท่า ไม่ copy ทั้ง array ทุก batch"""
+
+    __slots__ = ("data", "size")
+
+    def __init__(self, dtype):
+        self.data = np.empty(0, dtype=dtype)
+        self.size = 0
+
+    def extend(self, values: List) -> None:
+        end = self.size + len(values)
+        if end > len(self.data):
+            grown = np.empty(max(end, 2 * len(self.data), 1024), dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size:end] = values
+        self.size = end
+
+    @property
+    def values(self) -> "np.ndarray":
+        return self.data[:self.size]
+
+
+class ColumnarPredictions:
+    def __init__(self, reviews: Sequence[dict]):
+        self.aspects: List[str] = []
+        self._aspect_codes: Dict[str, int] = {}
+        self.reviews = 0
+        # ระดับ (review, aspect)
+        self._review_index = _Column(np.int32)
+        self._aspect = _Column(np.uint16)
+        self._confidence = _Column(np.float32)
+        self.extend(reviews)
+
+    @property
+    def review_index(self) -> "np.ndarray":
+        return self._review_index.values
+
+    @property
+    def aspect(self) -> "np.ndarray":
+        return self._aspect.values
+
+    @property
+    def confidence(self) -> "np.ndarray":
+        return self._confidence.values
+
+    def extend(self, reviews: Sequence[dict]) -> None:
+        """ต่อท้ายรีวิวใหม่ (ตำแหน่งต่อจากรีวิวเดิมใน dataset) ไม่ต้องสร้าง array เดิมใหม่"""
+        row_review, row_aspect, row_confidence = [], [], []
+        for i, review in enumerate(reviews, start=self.reviews):
+            for aspect, detail in (review.get("results") or {}).items():
+                a_code = self._aspect_codes.get(aspect)
+                if a_code is None:
+                    a_code = self._aspect_codes[aspect] = len(self.aspects)
+                    self.aspects.append(aspect)
+                row_review.append(i)
+                row_aspect.append(a_code)
+                row_confidence.append(float(detail.get("confidence", 0.0)))
+            self.reviews = i + 1
+        self._review_index.extend(row_review)
+        self._aspect.extend(row_aspect)
+        self._confidence.extend(row_confidence)
+
+    def __len__(self) -> int:
+        return self._confidence.size
+
+    def select_buckets(
+        self, low_confidence_count: int, random_audit_count: int, rng: random.Random
+    ) -> Tuple[List[int], List[int]]:
+        """ตำแหน่งแถวของ Bucket A (confidence ต่ำสุด k แถว) และ Bucket B (สุ่มจากแถวที่เหลือ)"""
+        n = len(self)
+        k = min(low_confidence_count, n)
+        if k == 0:
+            bucket_a = []
+        else:
+            part = np.argpartition(self.confidence, k - 1)[:k] if k < n else np.arange(n)
+            bucket_a = part[np.lexsort((part, self.confidence[part]))].tolist()
+
+        # สุ่มเกินไว้ k แถวแล้วตัดแถวที่อยู่ใน Bucket A ทิ้ง ยังคง uniform บนแถวที่เหลือ
+        chosen = set(bucket_a)
+        m = min(random_audit_count, n - k)
+        candidates = rng.sample(range(n), min(n, m + k))
+        bucket_b = [i for i in candidates if i not in chosen][:m]
+        return bucket_a, bucket_b
+
+    def prediction(self, reviews: Sequence[dict], row: int):
+        """แปลงแถวกลับเป็น (confidence, review, aspect, detail) แบบเดียวกับ qc_session.iter_predictions"""
+        review = reviews[int(self.review_index[row])]
+        aspect = self.aspects[int(self.aspect[row])]
+        detail = review["results"][aspect]
+        return (float(detail.get("confidence", 0.0)), review, aspect, detail)
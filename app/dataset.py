@@ -0,0 +1,299 @@
+"""
+ReviewDataset: รีวิวของ batch หนึ่ง พร้อม index ที่สร้างครั้งเดียวตอนโหลดข้อมูล
+
+- by_platform: รีวิวของแต่ละ platform เรียงตาม (review_date, review_id) สำหรับหา range ด้วย bisect
+- aggregates: cube ของจำนวน sentiment สำหรับ metrics
+- columnar: array แบบ NumPy ของผลทำนาย (optional, สร้างเมื่อถูกเรียกใช้ครั้งแรก)
+- qc_candidates: pool ของผลทำนายที่ confidence ต่ำสุด สำหรับ Bucket A ของ QC session
+- search: inverted index (character bigram) ของ content สำหรับค้นข้อความ
+  (สร้างใน background thread หลังโหลดข้อมูล ดู start_search_index)
+
+add_reviews() อัปเดตทุก index แบบ incremental (ใช้ตอน ingest ข้อมูลใหม่)
+"""
+import base64
+import heapq
+import json
+import sys
+import threading
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from app.aggregates import AggregateIndex, review_day, review_platform
+from app.columnar import ColumnarPredictions, columnar_enabled
+from app.encoding import dumps, review_payload
+from app.qc_candidates import LowConfidencePool
+from app.search import SearchIndex
+from app.store import next_version
+
+ReviewKey = Tuple[str, int]
+
+
+def review_key(review: dict) -> ReviewKey:
+    return (review_day(review), review.get("review_id", 0))
+
+
+def as_dict(review: Mapping) -> dict:
+    """รีวิวจาก snapshot เป็น Mapping แบบ lazy แปลงเป็น dict ก่อน serialise"""
+    return review if isinstance(review, dict) else dict(review)
+
+
+def encode_cursor(key: ReviewKey) -> str:
+    """แปลง (review_date, review_id) เป็น cursor แบบ opaque สำหรับส่งให้ client"""
+    raw = json.dumps([key[0], key[1]], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> ReviewKey:
+    """แปลง cursor กลับเป็น (review_date, review_id), raise ValueError ถ้ารูปแบบไม่ถูกต้อง"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        day, review_id = json.loads(raw)
+    except Exception:
+        raise ValueError("invalid cursor")
+    if not isinstance(day, str) or not isinstance(review_id, int):
+        raise ValueError("invalid cursor")
+    return (day, review_id)
+
+
+class PlatformIndex:
+    """รีวิวของ platform เดียว เรียงตาม (review_date, review_id)"""
+
+    def __init__(self):
+        self.keys: List[ReviewKey] = []
+        self.reviews: List[dict] = []
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def extend(self, reviews: List[dict]) -> None:
+        """เพิ่มหลายรีวิวพร้อมกัน: sort เฉพาะชุดใหม่แล้วแทรกเข้า list เดิมในรอบเดียว"""
+        new = sorted(((review_key(r), r) for r in reviews), key=lambda e: e[0])
+        if not new:
+            return
+        if not self.keys or new[0][0] >= self.keys[-1]:
+            self.keys.extend(k for k, _ in new)
+            self.reviews.extend(r for _, r in new)
+            return
+        # หาตำแหน่งแทรกด้วย bisect แล้วต่อ slice ของเดิม (copy ใน C) แทนการ merge ทีละรายการ
+        keys: List[ReviewKey] = []
+        reviews: List[dict] = []
+        prev = 0
+        for key, review in new:
+            i = bisect_right(self.keys, key, prev)
+            keys += self.keys[prev:i]
+            reviews += self.reviews[prev:i]
+            keys.append(key)
+            reviews.append(review)
+            prev = i
+        keys += self.keys[prev:]
+        reviews += self.reviews[prev:]
+        self.keys, self.reviews = keys, reviews
+
+    def add(self, review: dict) -> None:
+        key = review_key(review)
+        if not self.keys or key >= self.keys[-1]:
+            self.keys.append(key)
+            self.reviews.append(review)
+        else:
+            i = bisect_right(self.keys, key)
+            self.keys.insert(i, key)
+            self.reviews.insert(i, review)
+
+    def date_range(self, from_date: Optional[str], to_date: Optional[str]) -> Tuple[int, int]:
+        """ตำแหน่ง [lo, hi) ของรีวิวที่ review_date อยู่ในช่วง (รวมปลายทั้งสองข้าง)"""
+        lo = bisect_left(self.keys, (from_date,)) if from_date else 0
+        hi = bisect_right(self.keys, (to_date, sys.maxsize)) if to_date else len(self.keys)
+        return lo, max(lo, hi)
+
+
+class ReviewView:
+    """ชุดรีวิวที่ผ่าน filter แล้ว เก็บเป็นช่วง [lo, hi) ของแต่ละ PlatformIndex (ไม่ copy ข้อมูล)"""
+
+    def __init__(self, parts: List[Tuple[PlatformIndex, int, int]]):
+        self.parts = [(index, lo, hi) for index, lo, hi in parts if hi > lo]
+
+    def __len__(self) -> int:
+        return sum(hi - lo for _, lo, hi in self.parts)
+
+    def after(self, key: ReviewKey) -> "ReviewView":
+        """ส่วนของ view ที่อยู่ถัดจาก key (keyset pagination)"""
+        return ReviewView([
+            (index, max(lo, bisect_right(index.keys, key, lo, hi)), hi)
+            for index, lo, hi in self.parts
+        ])
+
+    def __iter__(self) -> Iterator[dict]:
+        """วนรีวิวเรียงตาม (review_date, review_id) โดย merge ข้ามหลาย platform"""
+        if len(self.parts) == 1:
+            index, lo, hi = self.parts[0]
+            return (index.reviews[i] for i in range(lo, hi))
+        streams = [_keyed(index, n, lo, hi) for n, (index, lo, hi) in enumerate(self.parts)]
+        return (index.reviews[i] for _, _, i, index in heapq.merge(*streams))
+
+
+def _keyed(index: PlatformIndex, n: int, lo: int, hi: int) -> Iterator[tuple]:
+    # n ใช้กันกรณี key ซ้ำข้าม platform ไม่ให้ heapq ไปเทียบ PlatformIndex
+    keys = index.keys
+    for i in range(lo, hi):
+        yield (keys[i], n, i, index)
+
+
+class ReviewDataset:
+    def __init__(self, reviews: Sequence[dict]):
+        # reviews อาจเป็น list จาก reviews.json หรือ Snapshot (mmap) ของ SnapshotReview
+        # snapshot ประหยัดแค่ json.load กับ content/results (อ่านจาก mmap ทุกครั้ง) ส่วน index ยังอยู่ใน heap
+        # เป็น O(n) เหมือนเดิม: SnapshotReview ต่อรีวิวใน list นี้และ by_platform, key (date, id), review_ids
+        # รวมราว 300 byte ต่อรีวิว (ประมาณ 3 เท่าของขนาดไฟล์ snapshot)
+        self.reviews = reviews if isinstance(reviews, list) else list(reviews or [])
+        # JSON ของรีวิวแต่ละรายการที่ encode แล้ว (review_id -> bytes)
+        # รีวิวจาก snapshot ไม่ cache เพื่อไม่ให้ content ทั้งหมดกลับมาอยู่ใน heap
+        self._fragments: Optional[Dict[int, bytes]] = {} if isinstance(reviews, list) else None
+        self.by_platform: Dict[str, PlatformIndex] = {}
+        for r in sorted(self.reviews, key=review_key):
+            self._platform_index(r).add(r)
+        self.aggregates = AggregateIndex(self.reviews)
+        self.review_ids = {r["review_id"] for r in self.reviews}
+        self._columnar: Optional[ColumnarPredictions] = None
+        self._qc_candidates: Optional[LowConfidencePool] = None
+        self._search: Optional[SearchIndex] = None
+        self._search_thread: Optional[threading.Thread] = None
+        self._search_error: Optional[BaseException] = None
+        self._search_ready = threading.Event()
+        # เปลี่ยนทุกครั้งที่ข้อมูลถูกแก้ (ใช้เป็นส่วนหนึ่งของ key ของ response cache)
+        self.version = next_version()
+        # request ถูกคำนวณใน thread pool (app.executor) ผู้อ่านหลายขั้นตอนและการแก้ไขต้องถือ lock นี้
+        self.lock = threading.RLock()
+
+    @property
+    def columnar(self) -> Optional[ColumnarPredictions]:
+        """คืน None ถ้าไม่มี numpy หรือปิดไว้"""
+        if self._columnar is None and columnar_enabled():
+            self._columnar = ColumnarPredictions(self.reviews)
+        return self._columnar
+
+    @property
+    def qc_candidates(self) -> LowConfidencePool:
+        # สร้างเมื่อถูกเรียกใช้ครั้งแรก หลังจากนั้น add_reviews อัปเดตแบบ incremental
+        if self._qc_candidates is None:
+            self._qc_candidates = LowConfidencePool(self.reviews)
+        return self._qc_candidates
+
+    def start_search_index(self) -> None:
+        """เริ่มสร้าง search index ใน background thread (เรียกหลังโหลดข้อมูลเสร็จ)
+
+        doc ของ index คือตำแหน่งใน self.reviews (รีวิวถูกต่อท้ายเท่านั้น ตำแหน่งเดิมจึงไม่เลื่อน)
+        """
+        with self.lock:
+            if self._search is not None or self._search_thread is not None:
+                return
+            self._search_ready.clear()
+            thread = self._search_thread = threading.Thread(
+                target=self._build_search, name="search-index", daemon=True
+            )
+        thread.start()
+
+    def _build_search(self) -> None:
+        # สร้างจากสำเนารายการรีวิวโดยไม่ถือ lock (ราว 12 วินาทีที่ 1M รีวิว) request อื่นและ ingest ทำงานต่อได้
+        with self.lock:
+            reviews = list(self.reviews)
+        index: Optional[SearchIndex] = None
+        error: Optional[BaseException] = None
+        try:
+            index = SearchIndex(reviews)
+        except Exception as exc:
+            error = exc
+        with self.lock:
+            if index is not None:
+                # รีวิวที่ ingest ระหว่างสร้างต่อท้าย self.reviews เสมอ
+                index.extend(self.reviews[len(reviews):])
+            self._search, self._search_error, self._search_thread = index, error, None
+            self._search_ready.set()
+
+    @contextmanager
+    def search_locked(self) -> Iterator[SearchIndex]:
+        """search index ที่พร้อมใช้ พร้อมถือ lock ไว้ตลอด block (รอการสร้างโดยไม่ถือ lock)"""
+        while True:
+            self.start_search_index()
+            self._search_ready.wait()
+            with self.lock:
+                if self._search is not None:
+                    yield self._search
+                    return
+                if self._search_error is not None:
+                    error, self._search_error = self._search_error, None
+                    raise error
+
+    def __len__(self) -> int:
+        return len(self.reviews)
+
+    def encode(self, review: Mapping) -> bytes:
+        """JSON bytes ของรีวิวตาม schema ReviewItem"""
+        if self._fragments is None:
+            return dumps(review_payload(review))
+        review_id = review["review_id"]
+        fragment = self._fragments.get(review_id)
+        if fragment is None:
+            fragment = self._fragments[review_id] = dumps(review_payload(review))
+        return fragment
+
+    def _platform_index(self, review: dict) -> PlatformIndex:
+        platform = review_platform(review)
+        index = self.by_platform.get(platform)
+        if index is None:
+            index = self.by_platform[platform] = PlatformIndex()
+        return index
+
+    def view(
+        self,
+        platforms: Optional[Iterable[str]] = None,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+    ) -> ReviewView:
+        """รีวิวของ platforms ที่เลือก (None = ทุก platform) ในช่วงวันที่กำหนด"""
+        if platforms is None:
+            indexes = list(self.by_platform.values())
+        else:
+            indexes = [self.by_platform[p] for p in sorted({p.lower() for p in platforms}) if p in self.by_platform]
+        return ReviewView([(index, *index.date_range(from_date, to_date)) for index in indexes])
+
+    def add_reviews(
+        self, reviews: List[dict], before_insert: Optional[Callable[[List[dict]], None]] = None
+    ) -> List[dict]:
+        """เพิ่มรีวิวชุดใหม่ อัปเดต date index, cube, QC candidates และ columnar แบบ incremental
+
+        review_id ที่มีอยู่แล้ว (เช่น ingest พร้อมกันสองที่) ถูกข้าม เช็คภายใต้ lock จึงไม่เพิ่มซ้ำ
+        before_insert(รีวิวที่จะเพิ่มจริง) ถูกเรียกภายใต้ lock ก่อนแก้ index (เช่นเขียน log ของการ ingest)
+        คืนรีวิวที่ถูกเพิ่มจริง
+        """
+        with self.lock:
+            review_ids = self.review_ids
+            fresh: List[dict] = []
+            for review in reviews:
+                if review["review_id"] not in review_ids:
+                    review_ids.add(review["review_id"])
+                    fresh.append(review)
+            reviews = fresh
+            if not reviews:
+                return reviews
+            if before_insert is not None:
+                try:
+                    before_insert(reviews)
+                except Exception:
+                    review_ids.difference_update(r["review_id"] for r in reviews)
+                    raise
+            by_platform: Dict[str, List[dict]] = {}
+            for review in reviews:
+                by_platform.setdefault(review_platform(review), []).append(review)
+                self.aggregates.add(review)
+                if self._qc_candidates is not None:
+                    self._qc_candidates.add(review)
+            for platform, group in by_platform.items():
+                self._platform_index(group[0]).extend(group)
+            if self._columnar is not None:
+                self._columnar.extend(reviews)
+            if self._search is not None:
+                self._search.extend(reviews)
+            self.reviews.extend(reviews)
+            self.version = next_version()
+            return reviews
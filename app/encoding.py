@@ -0,0 +1,57 @@
+"""
+Fast path สำหรับ encode response เป็น JSON bytes โดยไม่ต้องสร้าง Pydantic model ต่อรายการ
+
+ข้อมูลถูก validate ครั้งเดียวตอนโหลด (ดู build_review_dataset / build_qc_store ใน main.py)
+ตอนตอบ request จึงแค่เลือกฟิลด์ตาม schema แล้ว encode (ใช้ orjson ถ้ามี) หรือใช้ fragment ที่ encode ไว้แล้ว
+"""
+import json
+from typing import Any, Iterable, Mapping
+
+try:
+    import orjson
+except ImportError:  # orjson เป็น optional dependency
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def join_array(fragments: Iterable[bytes]) -> bytes:
+    return b"[" + b",".join(fragments) + b"]"
+
+
+def review_payload(review: Mapping) -> dict:
+    """ฟิลด์ของรีวิวตาม schema ReviewItem (ลำดับเดียวกับที่ Pydantic serialise)"""
+    return {
+        "review_id": review["review_id"],
+        "source_platform": review["source_platform"],
+        "review_date": review["review_date"],
+        "content": review["content"],
+        "results": {
+            aspect: {"sentiment": detail["sentiment"], "confidence": float(detail["confidence"])}
+            for aspect, detail in review["results"].items()
+        },
+    }
+
+
+QC_ITEM_FIELDS = (
+    "qc_item_id",
+    "review_id",
+    "review_content",
+    "aspect",
+    "predicted_sentiment",
+    "confidence",
+    "sentiment_gap",
+    "status",
+)
+
+
+def qc_item_payload(item: Mapping) -> dict:
+    """ฟิลด์ของ QC item ตาม schema QCItem"""
+    payload = {field: item[field] for field in QC_ITEM_FIELDS}
+    payload["confidence"] = float(payload["confidence"])
+    payload["sentiment_gap"] = float(payload["sentiment_gap"])
+    return payload
@@ -0,0 +1,124 @@
+"""
+Fan-out hub สำหรับ Server-Sent Events
+
+การเปลี่ยนแปลงแต่ละครั้ง encode เป็นข้อความ SSE ครั้งเดียวแล้วกระจายไปยัง queue ของ client ทุกตัว
+ที่ subscribe topic นั้นไว้ (เช่น "qc-session:55", "batch:55") queue มีขนาดจำกัด client ที่ตามไม่ทัน
+จะถูกล้าง queue แล้วได้ event "resync" ให้ไปโหลดข้อมูลเต็มใหม่แทน
+"""
+import asyncio
+import json
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Set
+
+HEARTBEAT_SECONDS = 15.0
+
+
+def format_event(event: str, data: Any) -> bytes:
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return f"event: {event}\ndata: {payload}\n\n".encode("utf-8")
+
+
+RESYNC = format_event("resync", {})
+
+
+class Subscription:
+    def __init__(self, topic: str, maxsize: int):
+        self.topic = topic
+        self.queue: "asyncio.Queue[bytes]" = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def offer(self, message: bytes) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # client ตามไม่ทัน: ทิ้ง event ที่ค้างทั้งหมดแล้วบอกให้ resync
+            self.dropped += self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+
+class EventHub:
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._topics: Dict[str, Set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def subscribe(self, topic: str) -> Subscription:
+        self._loop = asyncio.get_running_loop()
+        sub = Subscription(topic, self.queue_size)
+        with self._lock:
+            self._topics.setdefault(topic, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._topics.get(sub.topic)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._topics[sub.topic]
+
+    def subscribers(self, topic: Optional[str] = None) -> int:
+        if topic is not None:
+            return len(self._topics.get(topic, ()))
+        return sum(len(subs) for subs in self._topics.values())
+
+    def publish(self, topic: str, event: str, data: Any) -> None:
+        """ส่ง event ไปยังทุก client ของ topic (เรียกจาก thread ไหนก็ได้)"""
+        with self._lock:
+            subs = list(self._topics.get(topic, ()))
+        if not subs:
+            return
+        message = format_event(event, data)
+        self.published += 1
+        self._dispatch(subs, message)
+
+    def publish_prefix(self, prefix: str, event: str, data: Any) -> None:
+        """ส่ง event ไปยังทุก topic ที่ขึ้นต้นด้วย prefix (เช่น "batch:" ตอน reload ข้อมูล)"""
+        with self._lock:
+            subs = [s for topic, group in self._topics.items() if topic.startswith(prefix) for s in group]
+        if not subs:
+            return
+        message = format_event(event, data)
+        self.published += 1
+        self._dispatch(subs, message)
+
+    def _dispatch(self, subs, message: bytes) -> None:
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            for sub in subs:
+                sub.offer(message)
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(lambda: [sub.offer(message) for sub in subs])
+
+    async def stream(
+        self, topic: str, is_disconnected, initial: Optional[Callable[[], Awaitable[bytes]]] = None
+    ) -> AsyncIterator[bytes]:
+        """async generator ของข้อความ SSE สำหรับ StreamingResponse
+
+        initial (ถ้ามี) ถูกเรียกหลัง subscribe แล้ว event ที่เกิดระหว่างสร้าง snapshot จึงไม่หาย
+        (อาจซ้ำกับ snapshot ได้ แต่ไม่ตกหล่น)
+        """
+        sub = self.subscribe(topic)
+        try:
+            yield b"retry: 3000\n\n"
+            if initial is not None:
+                yield await initial()
+            while True:
+                try:
+                    yield await asyncio.wait_for(sub.queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await is_disconnected():
+                        break
+                    yield b": keep-alive\n\n"
+        finally:
+            self.unsubscribe(sub)
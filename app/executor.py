@@ -0,0 +1,91 @@
+"""
+Executor สำหรับงาน blocking (โหลดไฟล์, aggregation, encode response ก้อนใหญ่) ไม่ให้ค้าง event loop
+
+- ใช้ thread pool ขนาดคงที่ และจำกัดจำนวนงานที่รอคิวด้วย semaphore (เกินแล้ว request รอ ไม่สร้าง thread เพิ่ม)
+- run_once (single-flight): ถ้างาน key เดียวกันกำลังทำอยู่ request ที่ตามมารอผลของงานเดิมแทนการคำนวณซ้ำ
+
+ข้อมูลทั้งหมดอยู่ใน memory ของ process จึงใช้ thread pool ไม่ใช่ process pool
+(งานที่เป็น Python ล้วนยังติด GIL แต่ event loop ได้สลับไปตอบ request อื่น เช่น static / HTML ระหว่างรอ)
+"""
+import asyncio
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from app import perf
+
+
+def executor_threads() -> int:
+    value = os.environ.get("REVIEW_RADAR_EXECUTOR_THREADS", "")
+    return int(value) if value.isdigit() and int(value) > 0 else min(4, os.cpu_count() or 1)
+
+
+class BlockingExecutor:
+    def __init__(self, max_workers: int = 4, max_pending: int = 256):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="review-radar")
+        # semaphore / future ผูกกับ event loop ที่สร้าง (TestClient แต่ละตัวมี loop ของตัวเอง)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        self.submitted = 0
+        self.coalesced = 0
+        self.in_flight = 0
+
+    def _bind(self) -> Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.max_pending)
+            self._flights = {}
+        return loop, self._slots
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """รัน fn(*args) ใน thread pool แล้วรอผล"""
+        loop, slots = self._bind()
+        async with slots:
+            self.submitted += 1
+            self.in_flight += 1
+            # ส่ง context ของ request ไปด้วย ให้ perf.stage() ใน thread นับเข้ากับ request เดียวกัน
+            context = contextvars.copy_context()
+            call = partial(self._call, time.perf_counter(), fn, *args)
+            try:
+                return await loop.run_in_executor(self._pool, context.run, call)
+            finally:
+                self.in_flight -= 1
+
+    @staticmethod
+    def _call(submitted: float, fn: Callable[..., Any], *args: Any) -> Any:
+        perf.add("queue", time.perf_counter() - submitted)
+        return fn(*args)
+
+    async def run_once(self, key: Hashable, fn: Callable[..., Any], *args: Any) -> Any:
+        """เหมือน run แต่ request ที่ key ตรงกับงานที่กำลังทำอยู่จะได้ผลเดียวกัน (ไม่คำนวณซ้ำ)"""
+        self._bind()
+        future = self._flights.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            future = asyncio.ensure_future(self.run(fn, *args))
+            self._flights[key] = future
+
+            def _done(f: asyncio.Future, key: Hashable = key) -> None:
+                if self._flights.get(key) is f:
+                    del self._flights[key]
+
+            future.add_done_callback(_done)
+        # shield: request ที่ถูกยกเลิก (client ปิด connection) ไม่ทำให้งานของ request อื่นถูกยกเลิกไปด้วย
+        return await asyncio.shield(future)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,267 @@
+"""
+Streaming ingestion ของรีวิวแบบ NDJSON (หนึ่งรีวิวต่อบรรทัด)
+
+body ถูกอ่านทีละ chunk -> ตัดเป็นบรรทัด -> parse -> validate -> ตัดรีวิวซ้ำ -> เพิ่มเข้า dataset ทีละ batch
+ไม่ต้องอ่านทั้งไฟล์เข้า memory และทุก index ของ dataset ถูกอัปเดตแบบ incremental (ReviewDataset.add_reviews)
+รีวิวที่รับแล้วถูกต่อท้ายลง log (reviews.ingested.ndjson) เพื่อเล่นซ้ำตอนโหลด dataset ใหม่
+
+CLI (ส่งไฟล์ไปยัง server ที่รันอยู่แบบ chunked upload):
+    python -m app.ingest reviews.ndjson --batch BATCH_ID [--url http://localhost:8000]
+"""
+import argparse
+import http.client
+import json
+import sys
+import time
+from typing import (
+    Any, AsyncIterable, Callable, Dict, IO, Iterable, Iterator, List, Optional, Set,
+)
+from urllib.parse import quote, urlsplit
+
+from app.encoding import dumps
+
+try:
+    import orjson
+except ImportError:  # orjson เป็น optional dependency
+    orjson = None
+
+INGEST_LOG = "reviews.ingested.ndjson"
+BATCH_SIZE = 1000
+MAX_LINE_BYTES = 1 << 20
+MAX_ERRORS = 10
+
+
+def loads(line: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+class LineSplitter:
+    """ตัด byte chunk เป็นบรรทัด บรรทัดที่ยาวเกิน max_line_bytes ถูกทิ้งและคืนเป็น None แทน"""
+
+    def __init__(self, max_line_bytes: int = MAX_LINE_BYTES):
+        self.max_line_bytes = max_line_bytes
+        self._buffer = bytearray()
+        self._skipping = False
+
+    def feed(self, chunk: bytes) -> List[Optional[bytes]]:
+        lines: List[Optional[bytes]] = []
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end < 0:
+                break
+            if self._skipping:
+                self._skipping = False
+            elif len(self._buffer) + end - start > self.max_line_bytes:
+                lines.append(None)
+                self._buffer.clear()
+            elif self._buffer:
+                self._buffer += chunk[start:end]
+                lines.append(bytes(self._buffer))
+                self._buffer.clear()
+            else:
+                lines.append(chunk[start:end])
+            start = end + 1
+        if not self._skipping and start < len(chunk):
+            self._buffer += chunk[start:]
+            if len(self._buffer) > self.max_line_bytes:
+                # รายงานครั้งเดียว แล้วข้ามไปจนเจอขึ้นบรรทัดใหม่
+                lines.append(None)
+                self._buffer.clear()
+                self._skipping = True
+        return lines
+
+    def close(self) -> List[Optional[bytes]]:
+        if self._skipping or not self._buffer:
+            return []
+        line = bytes(self._buffer)
+        self._buffer.clear()
+        return [line]
+
+
+def iter_lines(chunks: Iterable[bytes], max_line_bytes: int = MAX_LINE_BYTES) -> Iterator[Optional[bytes]]:
+    splitter = LineSplitter(max_line_bytes)
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+    yield from splitter.close()
+
+
+async def aiter_lines(chunks: AsyncIterable[bytes], max_line_bytes: int = MAX_LINE_BYTES):
+    splitter = LineSplitter(max_line_bytes)
+    async for chunk in chunks:
+        for line in splitter.feed(chunk):
+            yield line
+    for line in splitter.close():
+        yield line
+
+
+class IngestReport:
+    def __init__(self):
+        self.received = 0
+        self.accepted = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+
+    def error(self, line_no: int, message: str) -> None:
+        self.invalid += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append({"line": line_no, "error": message})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "received": self.received,
+            "accepted": self.accepted,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "errors": self.errors,
+            "seconds": round(self.seconds, 4),
+            "rows_per_sec": round(self.received / self.seconds, 1) if self.seconds > 0 else 0.0,
+        }
+
+
+class Ingestor:
+    """รับรีวิวทีละบรรทัด แล้วเพิ่มเข้า dataset ทุก batch_size รายการ
+
+    validate: รับ dict คืน dict ที่ผ่าน schema แล้ว หรือ raise ValueError (ValidationError ของ Pydantic ก็เป็น ValueError)
+    on_batch: เรียกหลังเพิ่มแต่ละ batch (เช่นส่ง metrics delta ให้ dashboard)
+    """
+
+    def __init__(
+        self,
+        dataset,
+        validate: Callable[[dict], dict],
+        log: Optional[IO[bytes]] = None,
+        on_batch: Optional[Callable[[List[dict]], None]] = None,
+        batch_size: int = BATCH_SIZE,
+    ):
+        self.dataset = dataset
+        self.validate = validate
+        self.log = log
+        self.on_batch = on_batch
+        self.batch_size = batch_size
+        self.report = IngestReport()
+        # review_id ของ batch ที่ยังไม่ flush (ที่ flush แล้วอยู่ใน dataset.review_ids) ล้างทุก flush
+        self._seen: Set[Any] = set()
+        self._pending: List[dict] = []
+
+    def feed(self, line: Optional[bytes]) -> None:
+        if line is not None and not line.strip():
+            return
+        report = self.report
+        report.received += 1
+        if line is None:
+            report.error(report.received, "line too long")
+            return
+        try:
+            row = loads(line)
+            if not isinstance(row, dict):
+                raise ValueError("expected a JSON object")
+            row = self.validate(row)
+        except ValueError as exc:
+            report.error(report.received, _error_message(exc))
+            return
+        review_id = row["review_id"]
+        if review_id in self._seen or review_id in self.dataset.review_ids:
+            report.duplicates += 1
+            return
+        self._seen.add(review_id)
+        self._pending.append(row)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def feed_many(self, lines: Iterable[Optional[bytes]]) -> None:
+        """feed ทีละหลายบรรทัด (ให้ server ส่งงาน parse/validate เข้า thread pool เป็นก้อน)"""
+        for line in lines:
+            self.feed(line)
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        rows, self._pending = self._pending, []
+        self._seen.clear()
+        # feed() ตัดรีวิวซ้ำไปแล้วแบบไม่ถือ lock: ingest อื่นที่วิ่งพร้อมกันอาจเพิ่ม review_id เดียวกันไปก่อน
+        # dataset เช็คซ้ำอีกรอบภายใต้ lock แล้วเขียน log / นับ / ส่ง delta เฉพาะแถวที่เพิ่มจริง
+        inserted = self.dataset.add_reviews(rows, before_insert=self._write_log if self.log is not None else None)
+        self.report.accepted += len(inserted)
+        self.report.duplicates += len(rows) - len(inserted)
+        if inserted and self.on_batch is not None:
+            self.on_batch(inserted)
+
+    def _write_log(self, rows: List[dict]) -> None:
+        self.log.write(b"".join(dumps(row) + b"\n" for row in rows))
+        self.log.flush()
+
+    def finish(self) -> IngestReport:
+        self.flush()
+        self.report.seconds = time.perf_counter() - self.report.started
+        return self.report
+
+
+def _error_message(exc: ValueError) -> str:
+    errors = getattr(exc, "errors", None)
+    if callable(errors):
+        first = errors()[0]
+        return f"{'.'.join(str(p) for p in first['loc'])}: {first['msg']}"
+    return str(exc)
+
+
+def replay_log(path: str, dataset, validate: Callable[[dict], dict]) -> IngestReport:
+    """เพิ่มรีวิวจาก log ของการ ingest ครั้งก่อนๆ เข้า dataset (ไม่มี log = ไม่ทำอะไร)"""
+    ingestor = Ingestor(dataset, validate)
+    try:
+        with open(path, "rb") as f:
+            for line in iter_lines(iter(lambda: f.read(1 << 16), b"")):
+                ingestor.feed(line)
+    except FileNotFoundError:
+        pass
+    return ingestor.finish()
+
+
+# --- CLI ---
+
+def _read_chunks(f: IO[bytes], size: int = 1 << 16) -> Iterator[bytes]:
+    while True:
+        chunk = f.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def upload(path: str, batch_id: str, url: str) -> Dict[str, Any]:
+    """ส่งไฟล์ NDJSON ไปยัง server แบบ Transfer-Encoding: chunked (ไม่อ่านทั้งไฟล์เข้า memory)"""
+    parts = urlsplit(url)
+    conn_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    conn = conn_cls(parts.netloc, timeout=600)
+    endpoint = f"{parts.path.rstrip('/')}/api/batches/{quote(batch_id, safe='')}/reviews/ingest"
+    try:
+        with open(path, "rb") as f:
+            conn.request(
+                "POST", endpoint, body=_read_chunks(f),
+                headers={"Content-Type": "application/x-ndjson"}, encode_chunked=True,
+            )
+        response = conn.getresponse()
+        body = response.read()
+        if response.status != 200:
+            raise SystemExit(f"ingest failed ({response.status}): {body.decode('utf-8', 'replace')}")
+        return json.loads(body)
+    finally:
+        conn.close()
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.ingest", description="Stream NDJSON reviews into a batch")
+    parser.add_argument("path", help="ไฟล์ NDJSON (หนึ่งรีวิวต่อบรรทัด)")
+    parser.add_argument("--batch", required=True, help="batch_id ปลายทาง")
+    parser.add_argument("--url", default="http://localhost:8000", help="URL ของ server")
+    args = parser.parse_args(argv)
+    report = upload(args.path, args.batch, args.url)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,35 +1,311 @@
-from fastapi import FastAPI, Request, Query, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, FastAPI, Request, Query, HTTPException
+from fastapi.responses import HTMLResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
-from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field, ValidationError
+from typing import Optional, List, Dict, Any, Awaitable, Callable, Iterator, Tuple
 import os
 import json
 import random
-from datetime import datetime
+from datetime import datetime, date
 from collections import defaultdict
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from itertools import islice
+
+from app.assets import REVALIDATE, StaticAssets, render_pages
+from app.aggregates import GRANULARITIES, SENTIMENTS, metrics_delta
+from app.batches import BatchPartition, BatchRegistry, batch_memory_budget
+from app.cache import ResponseCache
+from app.encoding import dumps, join_array
+from app.dataset import ReviewDataset, as_dict, decode_cursor, encode_cursor, review_key
+from app.qc_session import LOW_CONFIDENCE, RANDOM_AUDIT, select_session_buckets, to_qc_item
+from app.events import EventHub, format_event
+from app import perf
+from app.executor import BlockingExecutor, executor_threads
+from app.ingest import BATCH_SIZE, INGEST_LOG, Ingestor, aiter_lines, replay_log
+from app.perf import PerfMiddleware, PerfRecorder, SamplingProfiler, perf_enabled
+from app.qc_store import QCItemStore, QCWriteBehind, item_session
+from app.sampling import make_rng, sample_view
+from app.search import matches, query_terms
+from app.snapshot import Snapshot
+from app.sqlite_store import SQLiteBackend, backend_name
+from app.store import MockDataStore
+from starlette.concurrency import run_in_threadpool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if sqlite_backend is not None:
+        # ฐานข้อมูลว่าง: worker แรกที่ได้ write lock นำเข้าข้อมูลจาก mock_data
+        await run_in_threadpool(sqlite_backend.seed, iter_file_partitions)
+    qc_writer.start()
+    if os.environ.get("REVIEW_RADAR_PROFILE", "0") not in ("", "0"):
+        profiler.start()
+    yield
+    profiler.stop()
+    # flush การแก้ไข QC ที่ค้างอยู่ก่อนปิด server
+    await qc_writer.stop()
+    if sqlite_backend is not None:
+        sqlite_backend.close()
+
 
 app = FastAPI(
     title="ReviewRadar API",
     description="API for Sentiment Analysis Dashboard & QC System",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # --- Config Path ---
 base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-app.mount("/static", StaticFiles(directory=os.path.join(base_dir, "static")), name="static")
+# static file อยู่ใน memory พร้อม gzip/brotli และ URL แบบมี hash ของเนื้อไฟล์ (ดู app/assets.py)
+static_assets = StaticAssets(os.path.join(base_dir, "static"))
+app.mount("/static", static_assets, name="static")
 templates = Jinja2Templates(directory=os.path.join(base_dir, "templates"))
+templates.env.globals["static_url"] = static_assets.url
+# หน้า HTML ไม่มีข้อมูล dynamic: render ครั้งเดียวตอน start
+pages = render_pages(templates, ["dashboard.html", "qc.html"])
+
+
+# --- Performance Instrumentation ---
+# REVIEW_RADAR_PERF=1: ใส่ Server-Timing header และเก็บ histogram ต่อ endpoint/stage (ดูที่ /debug/perf)
+# ตอนปิดไม่มี middleware, perf.stage() ไม่จับเวลา และไม่มี route /debug/perf* (ไม่มี auth จึงไม่เปิดบน production)
+perf_recorder = PerfRecorder()
+profiler = SamplingProfiler()
+if perf_enabled():
+    app.add_middleware(PerfMiddleware, recorder=perf_recorder)
 
 
 # --- Helper Function: Load Mock Data ---
+# parse แต่ละไฟล์ครั้งเดียวแล้วเก็บไว้ใน memory, โหลดใหม่เมื่อไฟล์บน disk เปลี่ยน
+data_store = MockDataStore(os.environ.get("REVIEW_RADAR_DATA_DIR") or os.path.join(base_dir, "mock_data"))
+
+def validate_rows(rows, model, filename: str) -> list:
+    """validate ข้อมูลทุกแถวกับ schema ครั้งเดียวตอนโหลด แถวที่ไม่ผ่านจะถูกข้าม
+
+    ค่าที่ coerce แล้วจาก model ถูกเขียนกลับลง dict (ฟิลด์อื่นที่ไม่อยู่ใน schema ยังอยู่ครบ)
+    ตอนตอบ request จึง encode ตรงได้เลยโดยไม่ต้อง validate ซ้ำ
+    """
+    valid = []
+    for i, row in enumerate(rows or []):
+        try:
+            valid.append(validate_row(row, model))
+        except ValidationError as exc:
+            print(f"Skip invalid row #{i} in {filename}: {exc.errors()[0]['msg']}")
+    return valid
+
+def validate_row(row: dict, model) -> dict:
+    """validate แถวเดียว (raise ValidationError ถ้าไม่ผ่าน) แล้วเขียนค่าที่ coerce แล้วกลับลง dict"""
+    validated = model.model_validate(row).model_dump()
+    for key, value in validated.items():
+        if isinstance(value, dict) and isinstance(row.get(key), dict):
+            for sub_key, sub_value in value.items():
+                if isinstance(sub_value, dict):
+                    row[key][sub_key].update(sub_value)
+        else:
+            row[key] = value
+    return row
+
+def validate_review(row: dict) -> dict:
+    return validate_row(row, ReviewItem)
+
+def replay_ingested(dataset: ReviewDataset, log_path: str) -> ReviewDataset:
+    """เพิ่มรีวิวที่เคย ingest เข้ามา (reviews.ingested.ndjson) ต่อจากข้อมูลตั้งต้น"""
+    report = replay_log(log_path, dataset, validate_review)
+    if report.invalid:
+        print(f"Skip {report.invalid} invalid rows in {log_path}")
+    return dataset
+
+def build_review_dataset(rows, log_path: str) -> ReviewDataset:
+    dataset = replay_ingested(ReviewDataset(validate_rows(rows, ReviewItem, "reviews.json")), log_path)
+    # search index สร้างใน background ทันทีที่โหลดเสร็จ (ไม่ใช่ตอน request แรกที่ค้นข้อความ)
+    dataset.start_search_index()
+    return dataset
+
+def build_snapshot_dataset(snapshot: Snapshot, log_path: str) -> ReviewDataset:
+    dataset = replay_ingested(ReviewDataset(snapshot), log_path)
+    dataset.start_search_index()
+    return dataset
+
+def build_qc_store(rows) -> QCItemStore:
+    return QCItemStore(validate_rows(rows, QCItem, "qc_items.json"))
+
+def open_partition(partition: BatchPartition) -> None:
+    """ลงทะเบียน builder ของไฟล์ใน partition (เรียกครั้งแรกที่ batch ถูกใช้)"""
+    log_path = data_store.path(partition.file(INGEST_LOG))
+    # reviews.json ถูกแปลงเป็น ReviewDataset (พร้อม aggregate index) ตั้งแต่ตอนโหลด
+    data_store.register(partition.file("reviews.json"), lambda rows: build_review_dataset(rows, log_path))
+    # reviews.snap (สร้างด้วย `python -m app.snapshot mock_data/reviews.json`) เปิดด้วย mmap แทน json.load
+    # ข้อมูลใน snapshot มี type ตายตัวอยู่แล้ว จึงไม่ต้อง validate ซ้ำ
+    data_store.register(
+        partition.file("reviews.snap"), lambda snap: build_snapshot_dataset(snap, log_path), reader=Snapshot
+    )
+    # qc_items.json ถูก index ตาม qc_item_id, การแก้ไขถูกรวบเขียนลงไฟล์ทุก 1 วินาที
+    data_store.register(partition.file("qc_items.json"), build_qc_store)
+
+def evict_partition(partition: BatchPartition) -> None:
+    """flush QC ที่ยังไม่ได้เขียนลง disk ก่อน แล้วปลดข้อมูลของ partition ออกจาก memory
+
+    BatchRegistry เรียกขณะถือ partition.lock อยู่ ไม่มีใครแก้ QC store ระหว่าง flush กับ evict
+    """
+    qc_writer.flush_file(partition.file("qc_items.json"))
+    for name in ("reviews.json", "reviews.snap", "qc_items.json"):
+        data_store.evict(partition.file(name))
+
+# แต่ละ batch_id มีข้อมูลของตัวเองใน mock_data/batches/<batch_id>/ (batch ที่ไม่มีโฟลเดอร์ใช้ไฟล์ใน mock_data)
+# โหลดเมื่อถูกใช้ครั้งแรก และปลด batch ที่ไม่ได้ใช้นานที่สุดเมื่อเกิน REVIEW_RADAR_BATCH_MEMORY_MB
+batch_registry = BatchRegistry(data_store, open_partition, evict_partition, batch_memory_budget())
+qc_writer = QCWriteBehind(data_store, "qc_items.json", interval=1.0)
+
+# --- Storage Backend ---
+# REVIEW_RADAR_BACKEND=sqlite: ทุก worker (uvicorn --workers N) ใช้ข้อมูลชุดเดียวกันใน SQLite (WAL mode)
+# แทนการถือสำเนาของไฟล์ใน mock_data แยกกันคนละชุด (ค่าเริ่มต้น "file" ใช้ไฟล์ตามเดิม)
+sqlite_backend = (
+    SQLiteBackend(
+        os.environ.get("REVIEW_RADAR_SQLITE_PATH") or data_store.path("review_radar.db"),
+        pool_size=int(os.environ.get("REVIEW_RADAR_SQLITE_POOL", "8")),
+        memory_budget=batch_memory_budget(),
+    )
+    if backend_name() == "sqlite" else None
+)
+
+# --- Blocking Work Executor ---
+# การโหลดไฟล์ / aggregation / encode response ก้อนใหญ่ถูกส่งไปทำใน thread pool ขนาดจำกัด ไม่ให้ค้าง event loop
+# request ที่เหมือนกันซึ่งกำลังคำนวณอยู่ (cache key เดียวกัน) รอผลจากงานเดียวกันแทนการคำนวณซ้ำ
+blocking = BlockingExecutor(max_workers=executor_threads(), max_pending=256)
+
+# --- Response Cache ---
+# cache response ที่ serialise แล้วของ metrics / QC session, key มี version ของข้อมูลอยู่ด้วย
+response_cache = ResponseCache(max_entries=512, ttl=300.0)
+
+# --- Live Events (SSE) ---
+# การเปลี่ยนแปลงถูก broadcast ครั้งเดียวไปยังทุก client ที่เปิดหน้า QC / dashboard ค้างไว้
+event_hub = EventHub(queue_size=100)
+
+def publish_metrics_delta(batch_id: str, version: int, added=(), removed=()) -> None:
+    """ส่ง counter ของ metrics ที่เปลี่ยนไปให้ dashboard ที่เปิด batch นี้อยู่
+
+    version คือ version ของ dataset หลังการเปลี่ยนแปลง dashboard ข้าม delta ที่ไม่ใหม่กว่า
+    meta.version ของ metrics ที่โหลดไว้ (ข้อมูลนั้นรวม delta นี้ไปแล้ว)
+    """
+    delta = metrics_delta(added, removed)
+    if delta["cells"]:
+        event_hub.publish(f"batch:{batch_id}", "metrics_delta", {"version": version, **delta})
+
+def sse_response(
+    request: Request, topic: str, initial: Optional[Callable[[], Awaitable[bytes]]] = None
+) -> StreamingResponse:
+    return StreamingResponse(
+        event_hub.stream(topic, request.is_disconnected, initial),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 def load_mock_json(filename: str):
-    """โหลดไฟล์ JSON จากโฟลเดอร์ mock_data"""
-    file_path = os.path.join(base_dir, "mock_data", filename)
-    if not os.path.exists(file_path):
+    """โหลดไฟล์ JSON จากโฟลเดอร์ mock_data (ผ่าน in-memory store)"""
+    return data_store.get(filename)
+
+def load_partition_dataset(partition: BatchPartition) -> Optional[ReviewDataset]:
+    # ใช้ snapshot ถ้ามีและไม่เก่ากว่า reviews.json
+    if data_store.is_fresh(partition.file("reviews.snap"), partition.file("reviews.json")):
+        return load_mock_json(partition.file("reviews.snap"))
+    return load_mock_json(partition.file("reviews.json"))
+
+def get_review_dataset(batch_id: str) -> ReviewDataset:
+    """คืน ReviewDataset ของ batch"""
+    if sqlite_backend is not None:
+        return sqlite_backend.review_dataset(batch_id)
+    partition = batch_registry.partition(batch_id)
+    dataset = load_partition_dataset(partition)
+    batch_registry.touch(partition)
+    return dataset if dataset is not None else ReviewDataset([])
+
+def aggregates_version(batch_id: str) -> int:
+    """version ของข้อมูลที่ metrics / trends ของ batch คำนวณจาก (ใช้เป็น key ของ response cache)"""
+    if sqlite_backend is not None:
+        return sqlite_backend.batch_version(batch_id)
+    return get_review_dataset(batch_id).version
+
+@contextmanager
+def read_aggregates(batch_id: str) -> Iterator[Tuple[Any, int]]:
+    """(cube, version) ของ batch ที่อ่านได้คงที่ตลอด block
+
+    SQLite: cube ในฐานข้อมูลที่ทุก worker ใช้ร่วมกัน (ไม่ต้องโหลดรีวิวของ batch เข้า worker)
+    ไฟล์: AggregateIndex ของ dataset ภายใต้ dataset.lock
+    """
+    if sqlite_backend is not None:
+        with sqlite_backend.aggregates(batch_id) as aggregates:
+            yield aggregates, aggregates.version
+        return
+    dataset = get_review_dataset(batch_id)
+    with dataset.lock:
+        yield dataset.aggregates, dataset.version
+
+def iter_file_partitions():
+    """(partition, reviews, qc_items) ของทุก partition ในไฟล์ สำหรับ seed SQLite backend"""
+    for batch_id in ["", *batch_registry.batches()]:
+        partition = batch_registry.partition(batch_id)
+        dataset = load_partition_dataset(partition)
+        qc_store = load_mock_json(partition.file("qc_items.json"))
+        yield (
+            partition.key or "",
+            list(dataset.reviews) if dataset is not None else [],
+            qc_store.items if qc_store is not None else [],
+        )
+        batch_registry.on_evict(partition)
+
+def get_qc_store(partition: BatchPartition) -> QCItemStore:
+    filename = partition.file("qc_items.json")
+    qc_store = load_mock_json(filename)
+    if qc_store is None:
+        # batch ที่ยังไม่เคยมี QC session: สร้างไฟล์ว่างไว้ก่อน ให้ write-behind มีที่เขียน
+        data_store.save(filename, [])
+        qc_store = load_mock_json(filename)
+    batch_registry.touch(partition)
+    return qc_store
+
+def session_write_lock(session_id: int):
+    """lock ของ partition ที่ session อยู่ สำหรับถือไว้ตั้งแต่หยิบ QC store จนแก้เสร็จ (SQLite ไม่ต้องใช้)"""
+    if sqlite_backend is not None:
+        return nullcontext()
+    partition = batch_registry.session_partition(session_id)
+    return partition.lock if partition is not None else nullcontext()
+
+def get_session_store(session_id: int) -> QCItemStore:
+    """QC store ของ partition ที่ session นี้อยู่ (404 ถ้าไม่มี session)"""
+    if sqlite_backend is not None:
+        qc_store = sqlite_backend.session_store(session_id)
+        if qc_store is None:
+            raise HTTPException(status_code=404, detail="QC session not found")
+        return qc_store
+    partition = batch_registry.session_partition(session_id)
+    qc_store = get_qc_store(partition) if partition is not None else None
+    if qc_store is None or qc_store.session_items(session_id) is None:
+        raise HTTPException(status_code=404, detail="QC session not found")
+    return qc_store
+
+def parse_platforms(platforms: Optional[str]) -> Optional[List[str]]:
+    """แปลง "shopee,google" เป็น ["shopee", "google"], คืน None ถ้าไม่ได้เลือกหรือเลือก 'all'"""
+    platform_list = [p.strip().lower() for p in platforms.split(",") if p.strip()] if platforms else []
+    if not platform_list or 'all' in platform_list:
         return None
-    with open(file_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return platform_list
+
+def parse_date(value: Optional[str], name: str) -> Optional[str]:
+    """ตรวจรูปแบบวันที่ (YYYY-MM-DD) ของ query param คืนค่าเป็น string สำหรับเทียบกับ review_date"""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value[:10]).isoformat()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: expected YYYY-MM-DD")
+
+def parse_cursor(cursor: Optional[str]):
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 
 # ==========================================
@@ -48,6 +324,8 @@ class AppliedFilters(BaseModel):
 
 class MetricsMeta(BaseModel):
     applied_filters: AppliedFilters
+    # version ของข้อมูลที่ใช้คำนวณ (dashboard ใช้เทียบกับ version ของ metrics_delta)
+    version: Optional[int] = None
 
 class PlatformCounts(BaseModel):
     youtube: int = 0
@@ -71,6 +349,21 @@ class MetricsResponse(BaseModel):
     meta: MetricsMeta
     data: MetricsData
 
+class TrendMeta(BaseModel):
+    batch_id: str
+    granularity: str
+    aspect: Optional[str]
+    applied_filters: AppliedFilters
+
+class TrendPoint(BaseModel):
+    bucket: str
+    review_count: int
+    sentiment: SentimentCount
+
+class TrendsResponse(BaseModel):
+    meta: TrendMeta
+    data: List[TrendPoint]
+
 class ReviewResultDetail(BaseModel):
     sentiment: str
     confidence: float
@@ -83,9 +376,14 @@ class ReviewItem(BaseModel):
     results: Dict[str, ReviewResultDetail] 
 
 class ReviewMeta(BaseModel):
+    # ค้นด้วย q: เป็นค่าประมาณขอบบน (total_exact = false) เท่ากับ total_candidates
     total_found: int
+    total_exact: bool = True
+    # เฉพาะการค้นด้วย q: จำนวนรีวิวที่ผ่าน bigram index + filter ก่อนตรวจคำค้นจริง
+    total_candidates: Optional[int] = None
     sort: str
     batch_id: str
+    next_cursor: Optional[str] = None
 
 class ReviewsResponse(BaseModel):
     meta: ReviewMeta
@@ -101,6 +399,11 @@ class QCData(BaseModel):
     breakdown: QCBreakdown
     created_at: str
 
+class QCSessionCreatePayload(BaseModel):
+    low_confidence_count: int = Field(40, ge=0)   # Bucket A
+    random_audit_count: int = Field(10, ge=0)     # Bucket B
+    seed: Optional[int] = None
+
 class QCSessionResponse(BaseModel):
     message: str
     data: QCData
@@ -143,6 +446,66 @@ class QCUpdateResponse(BaseModel):
     success: bool
     data: QCUpdateData
 
+class QCBulkItemUpdate(QCItemUpdatePayload):
+    qc_item_id: int
+    confirmed: int = 1
+
+class QCBulkUpdatePayload(BaseModel):
+    items: List[QCBulkItemUpdate]
+
+class QCBulkItemResult(BaseModel):
+    qc_item_id: int
+    success: bool
+    status: Optional[str] = None
+    final_sentiment: Optional[str] = None
+    error: Optional[str] = None
+
+class QCBulkUpdateResponse(BaseModel):
+    success: bool
+    session_id: int
+    updated_count: int
+    updated_at: str
+    progress: QCProgress
+    results: List[QCBulkItemResult]
+
+# --- Ingestion Models ---
+class IngestError(BaseModel):
+    line: int
+    error: str
+
+class IngestResponse(BaseModel):
+    batch_id: str
+    received: int
+    accepted: int
+    duplicates: int
+    invalid: int
+    errors: List[IngestError]
+    seconds: float
+    rows_per_sec: float
+    total_reviews: int
+
+# --- Data Store Models ---
+class StoreStats(BaseModel):
+    hits: int
+    misses: int
+    reloads: int
+    files: Dict[str, int]
+
+
+class BatchRegistryStats(BaseModel):
+    memory_budget: Optional[int]
+    estimated_bytes: int
+    evictions: int
+    loaded: List[str]
+    batches: List[str]
+
+# --- Debug Models ---
+class ProfilerPayload(BaseModel):
+    enabled: bool
+    # ต่ำกว่า 5ms ตัว sampler เองกิน CPU จนผลคลาดเคลื่อน (และถ่วง request จริง)
+    interval_ms: float = Field(5.0, ge=5.0, le=1000.0)
+    reset: bool = False
+
 
 # ==========================================
 # ENDPOINTS
@@ -150,114 +513,229 @@ class QCUpdateResponse(BaseModel):
 
 @app.get("/", response_class=HTMLResponse)
 async def read_dashboard(request: Request):
-    return templates.TemplateResponse("dashboard.html", {"request": request})
+    return static_assets.respond(pages["dashboard.html"], request.headers, REVALIDATE)
 
 @app.get("/qc", response_class=HTMLResponse)
 async def read_qc_dashboard(request: Request):
-    return templates.TemplateResponse("qc.html", {"request": request})
+    return static_assets.respond(pages["qc.html"], request.headers, REVALIDATE)
 
 # --- 1.1 GET Metrics ---
 @app.get("/api/batches/{batch_id}/metrics", response_model=MetricsResponse)
 async def get_batch_metrics(
+    request: Request,
     batch_id: str,
     platforms: Optional[str] = Query(None),
     from_date: Optional[str] = None,
     to_date: Optional[str] = None
 ):
-    platform_list = platforms.split(",") if platforms else []
-    
-    # 1. โหลด Raw Data จาก reviews.json (แทน metrics.json)
-    all_reviews = load_mock_json("reviews.json")
-    if not all_reviews:
-        all_reviews = []
-
-    # 2. คำนวณ Platform Counts (Global Stats)
-    # นับรีวิวทั้งหมดที่มีอยู่จริง เพื่อโชว์ตัวเลขบนปุ่มกด (เช่น YouTube 10, TikTok 50)
-    p_counts = defaultdict(int)
-    for r in all_reviews:
-        p_name = r.get("source_platform", "unknown").lower()
-        p_counts[p_name] += 1
-
-    # 3. Filter Data (กรองข้อมูลตามปุ่มที่กด)
-    filtered_reviews = all_reviews
-    
-    # ถ้ามีการส่ง platforms มา (เช่น ?platforms=youtube) ให้คัดเฉพาะอันนั้น
-    if platform_list and 'all' not in [p.lower() for p in platform_list]:
-        target_platform = platform_list[0].lower()
-        filtered_reviews = [r for r in filtered_reviews if r.get("source_platform", "").lower() == target_platform]
-
-    # 4. Aggregation (คำนวณกราฟจากข้อมูลที่กรองแล้ว)
-    overall_sent = {"positive": 0, "negative": 0, "neutral": 0}
-    # ใช้ defaultdict เพื่อให้ไม่ต้องเช็ค key ก่อนบวก
-    aspect_mets = defaultdict(lambda: {"positive": 0, "negative": 0, "neutral": 0})
-
-    for r in filtered_reviews:
-        results = r.get("results", {})
-        for aspect, detail in results.items():
-            # ดึง sentiment จาก JSON (positive, negative, neutral)
-            sentiment = detail.get("sentiment", "neutral")
-            
-            # นับเข้า Overall Chart
-            if sentiment in overall_sent:
-                overall_sent[sentiment] += 1
-            
-            # นับเข้า Aspect Chart (แปลงชื่อเป็นตัวใหญ่ เช่น taste -> TASTE)
-            aspect_key = aspect.upper()
-            if sentiment in ["positive", "negative", "neutral"]:
-                aspect_mets[aspect_key][sentiment] += 1
+    with perf.stage("filter"):
+        platform_list = [p.strip().lower() for p in platforms.split(",") if p.strip()] if platforms else []
+        start, end = parse_date(from_date, "from_date"), parse_date(to_date, "to_date")
+        # Filter (กรองตามปุ่มที่กด) เลือกได้หลาย platform, ไม่ส่งมาหรือเป็น 'all' = ทุก platform
+        selected_platforms = parse_platforms(platforms)
 
-    return {
-        "meta": {
-            "applied_filters": {
-                "platforms": platform_list,
-                "date_range": {"start": from_date, "end": to_date}
-            }
-        },
-        "data": {
-            "platform_counts": dict(p_counts),     # ส่งค่าที่นับจริง
-            "overall_sentiment": overall_sent,     # ส่งค่าที่นับจริง
-            "aspect_metrics": dict(aspect_mets)    # ส่งค่าที่นับจริง
-        }
-    }
+    # 1. โหลด Dataset ของ batch (aggregate index ถูกสร้างไว้แล้วตอนโหลดไฟล์) ใน thread pool
+    #    SQLite: อ่านแค่ version ของ batch (cube อยู่ในฐานข้อมูล)
+    with perf.stage("load"):
+        version = await blocking.run(aggregates_version, batch_id)
+
+    # ถ้าเคยคำนวณ filter นี้บนข้อมูล version เดียวกันแล้ว ส่งของเดิม (หรือ 304 ถ้า ETag ตรง)
+    # ลำดับ/ค่าซ้ำของ platforms ไม่เปลี่ยนผลลัพธ์ ("google,shopee" กับ "shopee,google" ใช้ cache เดียวกัน)
+    platform_list = sorted(set(platform_list))
+    cache_key = ("metrics", batch_id, tuple(platform_list), start, end, version)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        perf.mark("cache", "hit")
+        return response_cache.respond(request, cached)
+
+    def compute():
+        with perf.stage("aggregate"), read_aggregates(batch_id) as (aggregates, version):
+            # 2. Platform Counts (Global Stats) ของทุก platform ในช่วงวันที่ เพื่อโชว์ตัวเลขบนปุ่มกด
+            p_counts = aggregates.platform_counts(start, end)
+
+            # 3. Aggregation: รวม cell รายวันของ cube ในช่วงวันที่ แทนการวนทุกรีวิว
+            overall_sent, aspect_mets = aggregates.sentiment_counts(selected_platforms, start, end)
+
+        with perf.stage("validate"):
+            result = MetricsResponse.model_validate({
+                "meta": {
+                    "applied_filters": {
+                        "platforms": platform_list,
+                        "date_range": {"start": start, "end": end}
+                    },
+                    "version": version
+                },
+                "data": {
+                    "platform_counts": p_counts,
+                    "overall_sentiment": overall_sent,
+                    "aspect_metrics": aspect_mets
+                }
+            })
+        with perf.stage("encode"):
+            return response_cache.put(cache_key, result.model_dump_json().encode("utf-8"))
+
+    # request พร้อมกันที่ filter เดียวกันใช้ผลคำนวณเดียวกัน
+    cached = await blocking.run_once(cache_key, compute)
+    return response_cache.respond(request, cached)
 
 # --- 1.2 GET Reviews ---
 @app.get("/api/batches/{batch_id}/reviews", response_model=ReviewsResponse)
 async def get_batch_reviews(
     batch_id: str,
-    sort: str = "random",
-    limit: int = 10,
-    platform: Optional[str] = None
+    sort: Optional[str] = None,
+    limit: int = Query(10, ge=0),
+    platform: Optional[str] = None,
+    platforms: Optional[str] = Query(None),
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    cursor: Optional[str] = None,
+    seed: Optional[int] = None,
+    q: Optional[str] = None,
+    aspect: Optional[str] = None,
+    sentiment: Optional[str] = None
 ):
-    all_reviews = load_mock_json("reviews.json")
-    if not all_reviews:
-        all_reviews = []
+    # platforms (comma separated) ใช้แทน platform เดี่ยวแบบเดิมได้
+    selected_platforms = parse_platforms(platforms or platform)
+    start, end = parse_date(from_date, "from_date"), parse_date(to_date, "to_date")
 
-    filtered = all_reviews
-    if platform and platform != 'all':
-        filtered = [r for r in filtered if r['source_platform'] == platform]
+    # q = คำค้นใน content (หลายคำคั่นด้วยช่องว่าง ต้องมีครบทุกคำ) ค่าเริ่มต้นเรียงตาม relevance
+    terms = query_terms(q) if q else []
+    if q and q.strip() and not terms:
+        raise HTTPException(status_code=400, detail="Invalid q: each search term needs at least 2 characters")
+    aspect = aspect.strip().upper() if aspect and aspect.strip() else None
+    sentiment = sentiment.strip().lower() if sentiment and sentiment.strip() else None
+    if sentiment is not None and sentiment not in SENTIMENTS:
+        raise HTTPException(status_code=400, detail=f"Invalid sentiment: expected one of {', '.join(SENTIMENTS)}")
+    sort = sort or ("relevance" if terms else "random")
+    filtering = aspect is not None or sentiment is not None
 
-    if sort == "random":
-        count = min(limit, len(filtered))
-        selected_reviews = random.sample(filtered, count)
-    else:
-        selected_reviews = filtered[:limit]
+    after = parse_cursor(cursor) if sort not in ("random", "relevance") else None
 
-    return {
-        "meta": { "total_found": len(filtered), "sort": sort, "batch_id": batch_id },
-        "data": selected_reviews
-    }
+    def build() -> bytes:
+        # หาช่วงรีวิวใน index ที่เรียงตามวันที่ (bisect) ไม่ต้องวนทุกรีวิว
+        with perf.stage("load"):
+            dataset = get_review_dataset(batch_id)
+        next_cursor = None
+        total_found = total_candidates = None
+        wanted = limit if sort in ("random", "relevance") else limit + 1
+        if terms:
+            # inverted index ให้ candidate ที่กรอง platform / วันที่ / aspect / sentiment แล้ว
+            # ตรวจคำค้นซ้ำเฉพาะรีวิวที่จะส่งออกจริง (ตรวจทุก candidate เพื่อนับจริงช้าเกินไปกับคำที่พบบ่อย)
+            with perf.stage("select"), dataset.search_locked() as index:
+                docs = index.candidates(terms, selected_platforms, start, end, aspect, sentiment)
+                if sort == "relevance":
+                    order = index.ranked(docs)
+                elif sort == "random":
+                    order = index.sample(docs, make_rng(seed))
+                else:
+                    order = index.by_date(docs, after)
+                found = (dataset.reviews[d] for d in order)
+                selected_reviews = list(islice((r for r in found if matches(r, terms, aspect, sentiment)), wanted))
+                total_candidates = len(docs)
+        else:
+            with perf.stage("select"), dataset.lock:
+                filtered = dataset.view(selected_platforms, start, end)
+                # aspect / sentiment อย่างเดียวใช้ view ตามวันที่เดิม กรองทีละรีวิว จำนวนรวมนับจาก cube
+                keep = (lambda r: matches(r, (), aspect, sentiment)) if filtering else None
+                if sort == "random":
+                    # สุ่มจากตำแหน่งใน index โดยตรง (O(limit)) ส่ง seed มาเพื่อให้ได้ชุดเดิมซ้ำได้
+                    selected_reviews = sample_view(filtered, limit, make_rng(seed), keep)
+                else:
+                    # เรียงตาม (review_date, review_id) แล้วตัดหน้าแบบ keyset: ?cursor=<next_cursor จากหน้าก่อน>
+                    page = filtered.after(after) if after else filtered
+                    selected_reviews = list(islice(filter(keep, page) if keep else page, wanted))
+                if filtering:
+                    total_found = dataset.aggregates.matching_reviews(selected_platforms, start, end, aspect, sentiment)
+                else:
+                    total_found = len(filtered)
+        if len(selected_reviews) > limit:
+            selected_reviews = selected_reviews[:limit]
+            if selected_reviews:
+                next_cursor = encode_cursor(review_key(selected_reviews[-1]))
+
+        # ข้อมูลถูก validate ไว้แล้วตอนโหลด ต่อ JSON ของแต่ละรีวิวที่ encode ไว้เป็น response ได้เลย
+        meta = {"total_found": total_found, "total_exact": True}
+        if terms:
+            meta = {"total_found": total_candidates, "total_exact": False, "total_candidates": total_candidates}
+        meta.update(sort=sort, batch_id=batch_id, next_cursor=next_cursor)
+        with perf.stage("encode"):
+            return b'{"meta":' + dumps(meta) + b',"data":' + join_array(dataset.encode(r) for r in selected_reviews) + b"}"
+
+    # bisect / สุ่ม / encode ทำใน thread pool
+    body = await blocking.run(build)
+    return Response(content=body, media_type="application/json")
+
+# --- 1.3 GET Reviews Export (NDJSON) ---
+NDJSON_PAGE_SIZE = 1000
+
+@app.get("/api/batches/{batch_id}/reviews.ndjson")
+async def export_batch_reviews(
+    batch_id: str,
+    platforms: Optional[str] = Query(None),
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None
+):
+    selected_platforms = parse_platforms(platforms)
+    start, end = parse_date(from_date, "from_date"), parse_date(to_date, "to_date")
+
+    def generate():
+        # ดึงทีละหน้าด้วย keyset (review_date, review_id) ให้ memory คงที่ไม่ว่า batch จะใหญ่แค่ไหน
+        # และไม่พังถ้ามีรีวิวถูก ingest เพิ่มระหว่าง stream
+        after = None
+        while True:
+            # generator แบบ sync ถูก StreamingResponse วนใน thread pool ถือ lock เฉพาะตอนตัดหน้า
+            dataset = get_review_dataset(batch_id)
+            with dataset.lock:
+                view = dataset.view(selected_platforms, start, end)
+                page = list(islice(view.after(after) if after else view, NDJSON_PAGE_SIZE))
+            if not page:
+                break
+            yield "".join(json.dumps(as_dict(r), ensure_ascii=False) + "\n" for r in page).encode("utf-8")
+            after = review_key(page[-1])
+
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{batch_id}_reviews.ndjson"'}
+    )
 
 # --- 2.1 POST QC Session ---
 @app.post("/api/batches/{batch_id}/qc-sessions", status_code=201, response_model=QCSessionResponse)
-async def create_qc_session(batch_id: str):
-    # ในความเป็นจริง ต้องไป Query DB มาคำนวณ
-    # แต่นี้ Mock เราเลย hardcode ตัวเลข breakdown ไว้ก่อน
+async def create_qc_session(batch_id: str, payload: Optional[QCSessionCreatePayload] = None):
+    payload = payload or QCSessionCreatePayload()
+
+    def create():
+        dataset = get_review_dataset(batch_id)
+        # Bucket A (confidence ต่ำสุด) + Bucket B (สุ่ม audit จากที่เหลือ)
+        with dataset.lock:
+            bucket_a, bucket_b = select_session_buckets(
+                dataset,
+                payload.low_confidence_count,
+                payload.random_audit_count,
+                make_rng(payload.seed)
+            )
+            items = [to_qc_item(p, LOW_CONFIDENCE) for p in bucket_a] + [to_qc_item(p, RANDOM_AUDIT) for p in bucket_b]
+        if sqlite_backend is not None:
+            session_id = sqlite_backend.create_session(batch_id, items)
+        else:
+            # session_id / qc_item_id ถูกจองจาก index กลาง ไม่ให้ซ้ำกันข้าม batch
+            partition = batch_registry.partition(batch_id)
+            session_id, first_item_id = batch_registry.reserve_session(partition, len(items))
+            with partition.lock:
+                get_qc_store(partition).add_session(batch_id, items, session_id, first_item_id)
+        return session_id, items, bucket_a, bucket_b
+
+    # เลือก bucket (วนผลทำนาย / argpartition) และเขียน store ใน thread pool
+    session_id, items, bucket_a, bucket_b = await blocking.run(create)
+    response_cache.invalidate("qc-session")
+    event_hub.publish(f"batch:{batch_id}", "qc_session", {"session_id": session_id, "total_items": len(items)})
+
     return {
         "message": "QC Session generated successfully",
         "data": {
-            "session_id": 55,
-            "total_items": 54, # แก้ให้ตรงกับจำนวน Mock data ที่เรามี
-            "breakdown": { "low_confidence_count": 44, "random_audit_count": 10 },
+            "session_id": session_id,
+            "total_items": len(items),
+            "breakdown": { "low_confidence_count": len(bucket_a), "random_audit_count": len(bucket_b) },
             "created_at": datetime.now().isoformat() + "Z"
         }
     }
@@ -265,53 +743,84 @@ async def create_qc_session(batch_id: str):
 
 # --- 2.2 GET QC Session Items (UPDATED) ---
 @app.get("/api/qc-sessions/{session_id}", response_model=QCItemsResponse)
-async def get_qc_session_items(session_id: int):
-    # 1. โหลดข้อมูลจากไฟล์ JSON จริง
-    qc_items = load_mock_json("qc_items.json")
-    if not qc_items:
-        qc_items = []
-        
-    # 2. คำนวณ Progress แบบ Dynamic
-    total = len(qc_items)
-    reviewed_count = len([i for i in qc_items if i.get('status') == 'reviewed'])
-    remaining = total - reviewed_count
+async def get_qc_session_items(request: Request, session_id: int):
+    # 1. ดึงจาก QC store ของ batch ที่ session อยู่ (โหลดจาก qc_items.json ครั้งเดียว)
+    def load():
+        qc_store = get_session_store(session_id)
+        # version ของ SQLite backend เป็น query อ่านพร้อมกันใน thread pool
+        return qc_store, qc_store.version
 
-    return {
-        "meta": {
+    with perf.stage("load"):
+        qc_store, version = await blocking.run(load)
+    cache_key = ("qc-session", session_id, version)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        perf.mark("cache", "hit")
+        return response_cache.respond(request, cached)
+
+    def build():
+        items = qc_store.session_items(session_id)
+
+        # 2. Progress มาจาก counter ที่อัปเดตทุกครั้งที่มีการ review ไม่ต้องนับใหม่
+        meta = {
             "session_id": session_id,
-            "batch_name": "KFC_Competitor_Analysis_Q1",
-            "progress": { 
-                "total": total, 
-                "reviewed": reviewed_count, 
-                "remaining": remaining 
-            }
-        },
-        "items": qc_items
-    }
+            "batch_name": qc_store.session_batch(session_id),
+            "progress": qc_store.progress(session_id)
+        }
+        # items ถูก validate ตอนโหลดแล้ว ใช้ JSON ที่ encode ไว้ของแต่ละ item แทนการสร้าง QCItem ใหม่
+        with perf.stage("encode"):
+            body = b'{"meta":' + dumps(meta) + b',"items":' + join_array(qc_store.encode(i) for i in items) + b"}"
+        return response_cache.put(cache_key, body)
+
+    # หลายคนเปิด session เดียวกันพร้อมกันหลัง item ถูกแก้ -> encode ครั้งเดียว
+    cached = await blocking.run_once(cache_key, build)
+    return response_cache.respond(request, cached)
 
 
 # --- 2.3 PATCH QC Item (UPDATED LOGIC) ---
 @app.patch("/api/qc-items/{qc_item_id}", response_model=QCUpdateResponse)
 async def update_qc_item(qc_item_id: int, payload: QCItemUpdatePayload):
-    # 1. โหลดข้อมูลเพื่อหาตัวเดิม (Optional: ใน Mockup อาจจะไม่โหลดก็ได้)
-    qc_items = load_mock_json("qc_items.json")
-    
-    # 2. หา Item (Mock Logic)
-    target_item = next((item for item in qc_items if item["qc_item_id"] == qc_item_id), None)
-    
-    # 3. Determine final sentiment
-    final_sentiment = payload.correct_sentiment
-    if not final_sentiment:
-         # ถ้าไม่ส่งค่าแก้มา ให้ใช้ค่าเดิมจาก Prediction (ถ้าหาเจอ)
-         if target_item:
-             final_sentiment = target_item["predicted_sentiment"]
-         else:
-             final_sentiment = "neutral" # Fallback
-
-    # Note: ใน Mockup นี้เราจะไม่ save ทับไฟล์ JSON จริงๆ เพราะอาจจะทำให้ไฟล์พังได้ง่าย
-    # เราจะแค่ Return Success กลับไปให้ Frontend อัปเดต UI
-
-    print(f"Mock DB: QC Item {qc_item_id} updated -> Status: Reviewed, Sentiment: {final_sentiment}")
+    updated_at = datetime.now().isoformat() + "Z"
+
+    def review():
+        # 1. หา batch ของ item จาก index ของ session แล้วหา Item ตาม qc_item_id (O(1))
+        if sqlite_backend is not None:
+            return apply(sqlite_backend.item_store(qc_item_id))
+        partition = batch_registry.item_partition(qc_item_id)
+        if partition is None:
+            return None
+        # ถือ lock ของ partition ตั้งแต่หยิบ store จนแก้เสร็จ (partition ไม่ถูกปลดระหว่างนั้น)
+        with partition.lock:
+            return apply(get_qc_store(partition))
+
+    def apply(qc_store):
+        target_item = qc_store.get(qc_item_id) if qc_store is not None else None
+        if target_item is None:
+            return None
+
+        # 2. Determine final sentiment: ถ้าไม่ส่งค่าแก้มา ให้ใช้ค่าเดิมจาก Prediction
+        final_sentiment = payload.correct_sentiment or target_item["predicted_sentiment"]
+
+        # 3. อัปเดตใน memory ทันที แล้ว QCWriteBehind จะรวบเขียนลง qc_items.json แบบ atomic
+        qc_store.review(qc_item_id, final_sentiment, payload.confirmed, updated_at)
+        session_id = item_session(target_item)
+        return session_id, final_sentiment, qc_store.progress(session_id)
+
+    # โหลด partition / เขียน SQLite อาจค้างนาน ทำใน thread pool
+    result = await blocking.run(review)
+    if result is None:
+        raise HTTPException(status_code=404, detail="QC item not found")
+    session_id, final_sentiment, progress = result
+    response_cache.invalidate("qc-session")
+
+    # 4. แจ้งทุกคนที่เปิด session นี้อยู่ (status ของ item + progress ใหม่)
+    event_hub.publish(f"qc-session:{session_id}", "qc_item", {
+        "qc_item_id": qc_item_id,
+        "status": "reviewed",
+        "final_sentiment": final_sentiment,
+        "updated_at": updated_at,
+        "progress": progress
+    })
 
     return {
         "success": True,
@@ -319,6 +828,242 @@ async def update_qc_item(qc_item_id: int, payload: QCItemUpdatePayload):
             "qc_item_id": qc_item_id,
             "status": "reviewed",
             "final_sentiment": final_sentiment,
-            "updated_at": datetime.now().isoformat() + "Z"
+            "updated_at": updated_at
+        }
+    }
+
+
+# --- 2.5 PATCH QC Session Items (Bulk) ---
+@app.patch("/api/qc-sessions/{session_id}/items", response_model=QCBulkUpdateResponse)
+async def bulk_update_qc_items(session_id: int, payload: QCBulkUpdatePayload):
+    # อัปเดตทุก item ใน lock เดียว แล้วค่อย invalidate cache / แจ้ง SSE / flush ครั้งเดียว
+    updated_at = datetime.now().isoformat() + "Z"
+
+    def review():
+        with session_write_lock(session_id):
+            qc_store = get_session_store(session_id)
+            results = qc_store.review_many(session_id, [u.model_dump() for u in payload.items], updated_at)
+            return results, qc_store.progress(session_id)
+
+    results, progress = await blocking.run(review)
+    updated = [r for r in results if r["success"]]
+
+    if updated:
+        response_cache.invalidate("qc-session")
+        event_hub.publish(f"qc-session:{session_id}", "qc_items", {
+            "items": [
+                {"qc_item_id": r["qc_item_id"], "status": r["status"], "final_sentiment": r["final_sentiment"]}
+                for r in updated
+            ],
+            "updated_at": updated_at,
+            "progress": progress
+        })
+
+    # ผลราย item อาจมีเป็นหมื่นรายการ encode ตรงแทนการสร้าง model ทีละตัว
+    return Response(content=dumps({
+        "success": len(updated) == len(results),
+        "session_id": session_id,
+        "updated_count": len(updated),
+        "updated_at": updated_at,
+        "progress": progress,
+        "results": results
+    }), media_type="application/json")
+
+
+# --- 2.4 GET QC Session Events (SSE) ---
+@app.get("/api/qc-sessions/{session_id}/events")
+async def stream_qc_session_events(request: Request, session_id: int):
+    qc_store = await blocking.run(get_session_store, session_id)
+
+    # ส่ง progress ปัจจุบันไปก่อน จากนั้นเป็น delta ของแต่ละ item ที่ถูก review
+    # (snapshot ถูกสร้างหลัง subscribe แล้ว review ที่เกิดระหว่างนั้นจึงไม่หายไป)
+    async def initial() -> bytes:
+        # SQLite backend นับ progress ด้วย query ทำใน thread pool
+        return format_event("progress", await blocking.run(qc_store.progress, session_id))
+
+    return sse_response(request, f"qc-session:{session_id}", initial)
+
+
+# --- 1.4 GET Batch Events (SSE) ---
+@app.get("/api/batches/{batch_id}/events")
+async def stream_batch_events(request: Request, batch_id: str):
+    return sse_response(request, f"batch:{batch_id}")
+
+
+# --- 1.5 POST Ingest Reviews (NDJSON stream) ---
+@app.post("/api/batches/{batch_id}/reviews/ingest", response_model=IngestResponse)
+async def ingest_reviews(request: Request, batch_id: str, create: bool = False):
+    # body เป็น NDJSON (หนึ่งรีวิวต่อบรรทัด) อ่านทีละ chunk และเพิ่มเข้า dataset ทุก 1000 รายการ
+    # แถวที่ไม่ผ่าน schema หรือ review_id ซ้ำจะถูกข้ามและนับไว้ใน report
+    # create=true สร้าง partition ใหม่ให้ batch (mock_data/batches/<batch_id>/) ถ้ายังไม่มี
+    def open_sink():
+        if sqlite_backend is not None:
+            # เขียนลง SQLite ทีละ batch (worker อื่นเห็นรีวิวใหม่ทันที) ไม่ต้องมี log แยก
+            return None, sqlite_backend.review_sink(batch_id, create=create), nullcontext()
+        partition = batch_registry.partition(batch_id, create=create)
+        # pin ตลอดการ ingest: ถ้า partition ถูกปลดกลางทาง request ถัดไปจะโหลด dataset ใหม่จาก log ณ ตอนนั้น
+        # แถวที่เขียนหลังจากนั้นจะไปอยู่แค่ใน log กับ dataset เก่าที่ไม่มีใครเห็น
+        batch_registry.pin(partition)
+        try:
+            if load_mock_json(partition.file("reviews.json")) is None and not data_store.is_fresh(
+                partition.file("reviews.snap"), partition.file("reviews.json")
+            ):
+                # partition ใหม่ยังไม่มีข้อมูลตั้งต้น: สร้าง reviews.json ว่าง ให้ log ของการ ingest ถูกเล่นซ้ำตอนโหลดใหม่
+                data_store.save(partition.file("reviews.json"), [])
+            dataset = get_review_dataset(batch_id)
+            return partition, dataset, open(data_store.path(partition.file(INGEST_LOG)), "ab")
+        except BaseException:
+            batch_registry.unpin(partition)
+            raise
+
+    partition, dataset, log_file = await blocking.run(open_sink)
+    try:
+        with log_file as log:
+            ingestor = Ingestor(
+                dataset, validate_review, log=log,
+                on_batch=lambda rows: publish_metrics_delta(batch_id, ingestor.dataset.version, added=rows),
+            )
+            # อ่าน body บน event loop แต่ parse / validate / อัปเดต index เป็นก้อนละ BATCH_SIZE บรรทัดใน thread pool
+            lines = []
+            async for line in aiter_lines(request.stream()):
+                lines.append(line)
+                if len(lines) >= BATCH_SIZE:
+                    await blocking.run(ingestor.feed_many, lines)
+                    lines = []
+            await blocking.run(ingestor.feed_many, lines)
+            report = await blocking.run(ingestor.finish)
+    finally:
+        if partition is not None:
+            batch_registry.unpin(partition)
+    if report.accepted:
+        response_cache.invalidate("metrics")
+        response_cache.invalidate("trends")
+        if partition is not None:
+            # ประมาณขนาดใหม่ (อาจปลด partition อื่นพร้อม flush QC ลง disk) ใน thread pool
+            await blocking.run(batch_registry.touch, partition, True)
+    return {"batch_id": batch_id, **report.as_dict(), "total_reviews": len(dataset)}
+
+
+# --- 1.6 GET Sentiment Trends ---
+@app.get("/api/batches/{batch_id}/trends", response_model=TrendsResponse)
+async def get_batch_trends(
+    request: Request,
+    batch_id: str,
+    granularity: str = "day",
+    aspect: Optional[str] = None,
+    platforms: Optional[str] = Query(None),
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None
+):
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"Invalid granularity: expected one of {', '.join(GRANULARITIES)}")
+    platform_list = [p.strip().lower() for p in platforms.split(",") if p.strip()] if platforms else []
+    selected_platforms = parse_platforms(platforms)
+    start, end = parse_date(from_date, "from_date"), parse_date(to_date, "to_date")
+    aspect = aspect.strip().upper() if aspect and aspect.strip() else None
+
+    with perf.stage("load"):
+        version = await blocking.run(aggregates_version, batch_id)
+    platform_list = sorted(set(platform_list))
+    cache_key = ("trends", batch_id, granularity, aspect, tuple(platform_list), start, end, version)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        perf.mark("cache", "hit")
+        return response_cache.respond(request, cached)
+
+    def compute():
+        # รวม cell รายวันของ cube เข้า bucket (week/month) ใช้เวลาตามจำนวนวัน ไม่ใช่จำนวนรีวิว
+        with perf.stage("aggregate"), read_aggregates(batch_id) as (aggregates, _):
+            points = aggregates.trend(granularity, selected_platforms, aspect, start, end)
+        meta = {
+            "batch_id": batch_id,
+            "granularity": granularity,
+            "aspect": aspect,
+            "applied_filters": {"platforms": platform_list, "date_range": {"start": start, "end": end}}
         }
+        with perf.stage("encode"):
+            return response_cache.put(cache_key, dumps({"meta": meta, "data": points}))
+
+    cached = await blocking.run_once(cache_key, compute)
+    return response_cache.respond(request, cached)
+
+
+# --- 3.1 GET Data Store Stats ---
+@app.get("/api/store/stats", response_model=StoreStats)
+async def get_store_stats():
+    return data_store.stats()
+
+
+# --- 3.2 POST Reload Data Store ---
+@app.post("/api/store/reload", response_model=StoreStats)
+async def reload_store():
+    # บังคับโหลดไฟล์ใน mock_data ใหม่ทั้งหมด (เช่น หลังแก้ไฟล์แบบ in-place ที่ mtime ไม่เปลี่ยน)
+    # flush การแก้ไข QC ที่ค้างอยู่ก่อน ไม่ให้หายไปตอนโหลดใหม่
+    def reload():
+        if sqlite_backend is not None:
+            # ข้อมูลหลักอยู่ใน SQLite (ไฟล์ JSON ใช้แค่ตอน seed) โหลด dataset ใหม่จากฐานข้อมูลอย่างเดียว
+            sqlite_backend.forget()
+            return
+        qc_writer.flush()
+        data_store.reload()
+        batch_registry.rebuild_sessions()
+        batch_registry.forget()
+
+    await blocking.run(reload)
+    response_cache.invalidate()
+    event_hub.publish_prefix("batch:", "resync", {})
+    event_hub.publish_prefix("qc-session:", "resync", {})
+    return data_store.stats()
+
+
+# --- 3.3 GET Batch Registry ---
+@app.get("/api/batches", response_model=BatchRegistryStats)
+async def get_batch_registry():
+    # รายชื่อ batch มาจาก query (SQLite) หรือ listdir ของ mock_data/batches
+    return await blocking.run(sqlite_backend.stats if sqlite_backend is not None else batch_registry.stats)
+
+
+# --- 4. Debug (mount เฉพาะเมื่อ REVIEW_RADAR_PERF=1) ---
+debug_router = APIRouter()
+
+# --- 4.1 GET Perf Counters ---
+@debug_router.get("/debug/perf")
+async def get_perf(format: str = "json"):
+    # histogram ต่อ endpoint/stage (มีค่าเมื่อ REVIEW_RADAR_PERF=1) + counter ของ cache / store / executor
+    counters = {
+        "response_cache": response_cache.stats(),
+        "data_store": data_store.stats(),
+        "executor": blocking.stats(),
+        "events": {"published": event_hub.published, "subscribers": event_hub.subscribers()},
+        "qc_writer": {"flushes": qc_writer.flushes},
+        "batches": await run_in_threadpool(sqlite_backend.stats if sqlite_backend is not None else batch_registry.stats),
+        "profiler": profiler.stats(),
+        "static": static_assets.stats(),
     }
+    if format == "prometheus":
+        return PlainTextResponse(perf_recorder.prometheus(counters), media_type="text/plain; version=0.0.4")
+    return {"enabled": perf_enabled(), "endpoints": perf_recorder.snapshot(), "counters": counters}
+
+
+# --- 4.2 POST Sampling Profiler Toggle ---
+@debug_router.post("/debug/perf/profiler")
+async def toggle_profiler(payload: ProfilerPayload):
+    if payload.reset:
+        profiler.reset()
+    if payload.enabled:
+        await run_in_threadpool(profiler.start, payload.interval_ms / 1000)
+    else:
+        await run_in_threadpool(profiler.stop)
+    return profiler.stats()
+
+
+# --- 4.3 GET Sampling Profile ---
+@debug_router.get("/debug/perf/profile")
+async def get_profile(format: str = "top", limit: int = Query(30, ge=1)):
+    # format=collapsed: "frame;frame;frame count" ต่อบรรทัด ใช้กับ flamegraph.pl / speedscope ได้ตรง ๆ
+    if format == "collapsed":
+        return PlainTextResponse(profiler.collapsed())
+    return {**profiler.stats(), "top": profiler.top(limit)}
+
+if perf_enabled():
+    app.include_router(debug_router)
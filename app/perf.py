@@ -0,0 +1,282 @@
+"""
+Instrumentation ของ hot path: เวลาแต่ละ stage ต่อ request, Server-Timing header, histogram และ sampling profiler
+
+- เปิดด้วย REVIEW_RADAR_PERF=1 (PerfMiddleware ถูกติดตั้งเฉพาะตอนเปิด)
+  ตอนปิด stage() เป็นแค่ ContextVar.get() แล้วคืน context manager เปล่า
+- stage ที่จับเวลาใน thread pool (BlockingExecutor) ถูกนับเข้ากับ request เดียวกันผ่าน contextvars
+- histogram เก็บ bucket สะสม (สำหรับ Prometheus) + percentile จาก sample ล่าสุด N ตัวต่อ (endpoint, stage)
+- SamplingProfiler: thread ที่อ่าน stack ของทุก thread ทุก interval แล้วนับเป็น collapsed stack (ใช้กับ flamegraph)
+"""
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+
+# ขอบบนของ bucket (วินาที) แบบเดียวกับ default ของ Prometheus client ที่ละเอียดขึ้นช่วงต่ำกว่า ms
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+WINDOW = 1024
+TOTAL = "total"
+
+_NOOP = nullcontext()
+_current: ContextVar[Optional["RequestTimings"]] = ContextVar("review_radar_perf", default=None)
+
+
+def perf_enabled() -> bool:
+    return os.environ.get("REVIEW_RADAR_PERF", "0") not in ("", "0")
+
+
+class RequestTimings:
+    __slots__ = ("stages", "marks")
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.marks: Dict[str, str] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        # stage ชื่อเดียวกันหลายครั้งใน request เดียว (เช่น encode ทีละหน้า) รวมเป็นค่าเดียว
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def header(self, total: float) -> str:
+        parts = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.stages.items()]
+        parts.extend(f'{name};desc="{desc}"' for name, desc in self.marks.items())
+        parts.append(f"{TOTAL};dur={total * 1000:.3f}")
+        return ", ".join(parts)
+
+
+class _Stage:
+    __slots__ = ("timings", "name", "started")
+
+    def __init__(self, timings: RequestTimings, name: str):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self) -> "_Stage":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.timings.add(self.name, time.perf_counter() - self.started)
+
+
+def stage(name: str):
+    """with stage("aggregate"): ... จับเวลาเข้ากับ request ปัจจุบัน (ไม่มี request ที่ถูกวัด = ไม่ทำอะไร)"""
+    timings = _current.get()
+    if timings is None:
+        return _NOOP
+    return _Stage(timings, name)
+
+
+def add(name: str, seconds: float) -> None:
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+def mark(name: str, desc: str) -> None:
+    """ข้อมูลประกอบที่ไม่ใช่เวลา เช่น mark("cache", "hit") -> Server-Timing: cache;desc="hit" """
+    timings = _current.get()
+    if timings is not None:
+        timings.marks[name] = desc
+
+
+class LatencyHistogram:
+    __slots__ = ("counts", "count", "sum", "max", "recent")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.recent: deque = deque(maxlen=WINDOW)
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def summary(self) -> Dict[str, float]:
+        recent = sorted(self.recent)
+
+        def quantile(q: float) -> float:
+            return round(recent[min(len(recent) - 1, int(len(recent) * q))] * 1000, 3) if recent else 0.0
+
+        return {
+            "count": self.count,
+            "mean_ms": round(self.sum / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": quantile(0.50),
+            "p95_ms": quantile(0.95),
+            "p99_ms": quantile(0.99),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class PerfRecorder:
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, timings: RequestTimings, total: float) -> None:
+        with self._lock:
+            for name, seconds in ((TOTAL, total), *timings.stages.items()):
+                histogram = self._histograms.get((endpoint, name))
+                if histogram is None:
+                    histogram = self._histograms[(endpoint, name)] = LatencyHistogram()
+                histogram.observe(seconds)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        with self._lock:
+            result: Dict[str, Dict[str, Dict[str, float]]] = {}
+            for (endpoint, name), histogram in sorted(self._histograms.items()):
+                result.setdefault(endpoint, {})[name] = histogram.summary()
+            return result
+
+    def prometheus(self, counters: Dict[str, Dict[str, Any]]) -> str:
+        """text exposition format: histogram ของทุก (endpoint, stage) + counter ที่เป็นตัวเลขของแต่ละกลุ่ม"""
+        lines = [
+            "# HELP review_radar_stage_seconds Latency of request stages",
+            "# TYPE review_radar_stage_seconds histogram",
+        ]
+        with self._lock:
+            for (endpoint, name), h in sorted(self._histograms.items()):
+                labels = f'endpoint="{_escape(endpoint)}",stage="{_escape(name)}"'
+                cumulative = 0
+                for bound, count in zip((*BUCKETS, "+Inf"), h.counts):
+                    cumulative += count
+                    lines.append(f'review_radar_stage_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"review_radar_stage_seconds_sum{{{labels}}} {h.sum}")
+                lines.append(f"review_radar_stage_seconds_count{{{labels}}} {h.count}")
+        for group, values in counters.items():
+            for key, value in values.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                lines.append(f"review_radar_{group}_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def endpoint_label(scope: Dict[str, Any]) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return f"{scope['method']} {route.path}"
+    return "static" if scope.get("path", "").startswith("/static/") else "unmatched"
+
+
+class PerfMiddleware:
+    """ASGI middleware: เปิด RequestTimings ให้ request แล้วใส่ Server-Timing ตอนส่ง header และบันทึก histogram ตอนจบ"""
+
+    def __init__(self, app, recorder: PerfRecorder):
+        self.app = app
+        self.recorder = recorder
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings = RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+
+        async def send_with_timing(message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", timings.header(time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self.recorder.record(endpoint_label(scope), timings, time.perf_counter() - started)
+
+
+class SamplingProfiler:
+    """อ่าน stack ของทุก thread ทุก interval นับเป็น "a;b;c count" (collapsed stack ของ flamegraph.pl / speedscope)"""
+
+    def __init__(self, max_stacks: int = 20_000, max_depth: int = 64):
+        self.max_stacks = max_stacks
+        self.max_depth = max_depth
+        self.interval = 0.005
+        self.samples = 0
+        self.dropped = 0
+        self._stacks: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float = 0.005) -> None:
+        self.stop()
+        self.interval = interval
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="review-radar-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+            self.dropped = 0
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                names: List[str] = []
+                while frame is not None and len(names) < self.max_depth:
+                    code = frame.f_code
+                    names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                key = ";".join(reversed(names))
+                with self._lock:
+                    self.samples += 1
+                    if key in self._stacks or len(self._stacks) < self.max_stacks:
+                        self._stacks[key] += 1
+                    else:
+                        self.dropped += 1
+
+    def collapsed(self) -> str:
+        with self._lock:
+            return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+    def top(self, n: int = 20) -> List[Dict[str, Any]]:
+        """function ที่อยู่บนสุดของ stack บ่อยที่สุด (self time โดยประมาณ)"""
+        leaves: Counter = Counter()
+        with self._lock:
+            for stack, count in self._stacks.items():
+                leaves[stack.rsplit(";", 1)[-1]] += count
+        return [{"function": name, "samples": count} for name, count in leaves.most_common(n)]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "interval_ms": round(self.interval * 1000, 3),
+            "samples": self.samples,
+            "stacks": len(self._stacks),
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,78 @@
+"""
+QC candidate pool: ผลทำนาย (review, aspect) ที่ confidence ต่ำที่สุดไม่เกิน capacity รายการ
+
+สร้างครั้งเดียวตอนโหลด แล้วอัปเดตทีละรีวิวเมื่อมีข้อมูลเข้ามาใหม่ (ingestion)
+ทำให้ Bucket A ของ QC session เลือกได้ทันทีโดยไม่ต้องวนผลทำนายทั้งหมด
+"""
+import heapq
+import random
+from itertools import count
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+# (confidence, review, aspect, detail) แบบเดียวกับ qc_session.Prediction
+Prediction = Tuple[float, dict, str, dict]
+
+
+class LowConfidencePool:
+    def __init__(self, reviews: Iterable[dict] = (), capacity: int = 10_000):
+        self.capacity = capacity
+        # max-heap (ผ่าน -confidence) ของรายการที่ confidence ต่ำสุด
+        self._heap: List[Tuple[float, int, dict, str]] = []
+        self._seq = count()
+        self.total = 0          # จำนวนผลทำนายทั้งหมดที่เคยเห็น
+        self.max_aspects = 0    # จำนวน aspect สูงสุดต่อรีวิว (ใช้กับ rejection sampling)
+        self.evicted = False    # มีรายการถูกดันออกไปแล้วหรือยัง (pool ไม่ได้มีครบทุกรายการ)
+        for review in reviews:
+            self.add(review)
+
+    def add(self, review: dict) -> None:
+        results = review.get("results") or {}
+        self.total += len(results)
+        self.max_aspects = max(self.max_aspects, len(results))
+        heap = self._heap
+        for aspect, detail in results.items():
+            entry = (-float(detail.get("confidence", 0.0)), next(self._seq), review, aspect)
+            if len(heap) < self.capacity:
+                heapq.heappush(heap, entry)
+            else:
+                self.evicted = True
+                if entry[0] > heap[0][0]:
+                    heapq.heapreplace(heap, entry)
+
+    def lowest(self, k: int) -> Optional[List[Prediction]]:
+        """k รายการที่ confidence ต่ำสุด (เรียงจากน้อยไปมาก) หรือ None ถ้า pool เล็กเกินไป"""
+        if k > len(self._heap) and self.evicted:
+            return None
+        entries = heapq.nsmallest(k, self._heap, key=lambda e: (-e[0], e[1]))
+        return [(-neg, review, aspect, review["results"][aspect]) for neg, _, review, aspect in entries]
+
+
+def sample_predictions(
+    reviews: Sequence[dict],
+    k: int,
+    rng: random.Random,
+    exclude: Set[Tuple[int, str]],
+    max_aspects: int,
+) -> List[Prediction]:
+    """สุ่มผลทำนาย k รายการแบบ uniform จากคู่ (review, aspect) ทั้งหมด ยกเว้นที่อยู่ใน exclude
+
+    สุ่มรีวิวแบบ uniform แล้วรับด้วยความน่าจะเป็น n_aspects / max_aspects (rejection sampling)
+    จากนั้นสุ่ม aspect ในรีวิวนั้น ทุกคู่จึงมีโอกาสเท่ากันโดยไม่ต้องวนข้อมูลทั้งหมด
+    exclude เก็บ (id(review), aspect)
+    """
+    chosen: List[Prediction] = []
+    seen = set(exclude)
+    n = len(reviews)
+    while len(chosen) < k and n and max_aspects:
+        review = reviews[rng.randrange(n)]
+        results = review.get("results") or {}
+        if rng.random() * max_aspects >= len(results):
+            continue
+        aspect = rng.choice(list(results))
+        key = (id(review), aspect)
+        if key in seen:
+            continue
+        seen.add(key)
+        detail = results[aspect]
+        chosen.append((float(detail.get("confidence", 0.0)), review, aspect, detail))
+    return chosen
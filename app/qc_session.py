@@ -0,0 +1,105 @@
+"""
+สร้าง QC session จากผลทำนายใน reviews.json (active learning)
+
+- Bucket A: คู่ (review, aspect) ที่ confidence ต่ำที่สุด k รายการ เลือกด้วย heap ขนาดจำกัด
+- Bucket B: สุ่ม audit จากคู่ที่เหลือทั้งหมด ด้วย reservoir sampling (ใส่ seed ได้)
+
+ทั้งสอง bucket ได้จากการวนผลทำนายรอบเดียว ใช้ memory O(k) ไม่ขึ้นกับจำนวนผลทำนาย
+ถ้า dataset มี QC candidate pool ที่ใหญ่พอ จะใช้ pool (อัปเดตแบบ incremental) สำหรับ Bucket A
+และ rejection sampling สำหรับ Bucket B หรือถ้ามี columnar backing (numpy) จะใช้ np.argpartition
+"""
+import heapq
+import random
+from itertools import count
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from app.qc_candidates import sample_predictions
+from app.sampling import reservoir_sample
+
+LOW_CONFIDENCE = "low_confidence"
+RANDOM_AUDIT = "random_audit"
+
+# (confidence, review, aspect, detail)
+Prediction = Tuple[float, dict, str, dict]
+
+
+def iter_predictions(reviews: Iterable[dict]) -> Iterator[Prediction]:
+    for review in reviews:
+        for aspect, detail in (review.get("results") or {}).items():
+            yield (float(detail.get("confidence", 0.0)), review, aspect, detail)
+
+
+def select_buckets(
+    predictions: Iterable[Prediction],
+    low_confidence_count: int,
+    random_audit_count: int,
+    rng: Optional[random.Random] = None,
+) -> Tuple[List[Prediction], List[Prediction]]:
+    """คืน (bucket_a, bucket_b) จาก stream ของผลทำนายในรอบเดียว"""
+    # max-heap (ผ่าน -confidence) ของ k ตัวที่ confidence ต่ำสุดที่เห็นมาจนถึงตอนนี้
+    heap: List[Tuple[float, int, Prediction]] = []
+    seq = count()
+
+    def rejected() -> Iterator[Prediction]:
+        # ทุกผลทำนายที่ไม่ได้อยู่ใน bucket A ตอนจบจะถูก yield ออกมาครั้งเดียวพอดี
+        # (ไม่ได้เข้า heap หรือถูกดันออกจาก heap) reservoir ที่ต่อท้ายจึงสุ่มจากส่วนที่เหลือแบบ uniform
+        for pred in predictions:
+            if low_confidence_count <= 0:
+                yield pred
+            elif len(heap) < low_confidence_count:
+                heapq.heappush(heap, (-pred[0], next(seq), pred))
+            elif pred[0] < -heap[0][0]:
+                yield heapq.heapreplace(heap, (-pred[0], next(seq), pred))[2]
+            else:
+                yield pred
+
+    bucket_b = reservoir_sample(rejected(), random_audit_count, rng)
+    bucket_a = [pred for _, _, pred in sorted(heap, key=lambda e: (-e[0], e[1]))]
+    return bucket_a, bucket_b
+
+
+def select_session_buckets(
+    dataset,
+    low_confidence_count: int,
+    random_audit_count: int,
+    rng: Optional[random.Random] = None,
+) -> Tuple[List[Prediction], List[Prediction]]:
+    """เลือก bucket จาก ReviewDataset: candidate pool -> columnar -> streaming pass"""
+    rng = rng or random.Random()
+    pool = dataset.qc_candidates
+    bucket_a = pool.lowest(low_confidence_count)
+    # rejection sampling จะช้าลงมากถ้าต้องสุ่มเกือบทุกคู่ ใช้เฉพาะเมื่อสุ่มไม่เกินครึ่งหนึ่ง
+    if bucket_a is not None and 2 * (low_confidence_count + random_audit_count) <= pool.total:
+        exclude = {(id(review), aspect) for _, review, aspect, _ in bucket_a}
+        bucket_b = sample_predictions(dataset.reviews, random_audit_count, rng, exclude, pool.max_aspects)
+        return bucket_a, bucket_b
+
+    columnar = dataset.columnar
+    if columnar is None:
+        return select_buckets(iter_predictions(dataset.reviews), low_confidence_count, random_audit_count, rng)
+    rows_a, rows_b = columnar.select_buckets(low_confidence_count, random_audit_count, rng)
+    return (
+        [columnar.prediction(dataset.reviews, row) for row in rows_a],
+        [columnar.prediction(dataset.reviews, row) for row in rows_b],
+    )
+
+
+def sentiment_gap(detail: dict) -> float:
+    """ระยะห่างระหว่าง class ที่ทำนายกับอันดับสอง ถ้าโมเดลไม่ได้ส่งมา ใช้ขอบล่าง 2p - 1"""
+    if "sentiment_gap" in detail:
+        return float(detail["sentiment_gap"])
+    return round(max(0.0, 2 * float(detail.get("confidence", 0.0)) - 1), 2)
+
+
+def to_qc_item(pred: Prediction, bucket: str) -> dict:
+    confidence, review, aspect, detail = pred
+    return {
+        "review_id": review.get("review_id"),
+        "review_content": review.get("content", ""),
+        "aspect": aspect,
+        "predicted_sentiment": detail.get("sentiment", "neutral"),
+        "confidence": confidence,
+        "sentiment_gap": sentiment_gap(detail),
+        "status": "pending",
+        "bucket": bucket,
+    }
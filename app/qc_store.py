@@ -0,0 +1,245 @@
+"""
+QC item store: index ของ qc_items.json ตาม qc_item_id พร้อม counter ของ progress
+
+การแก้ไขทำใน memory ทันที แล้วค่อยถูกรวบเขียนลง disk เป็นรอบๆ โดย QCWriteBehind
+(เขียนไฟล์ชั่วคราวแล้ว rename ทับ ไฟล์จึงไม่พังแม้ process ตายกลางคัน)
+"""
+import asyncio
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.encoding import dumps, qc_item_payload
+from app.store import MockDataStore, next_version
+
+
+# item ใน qc_items.json ที่ไม่มี session_id (ชุด mock เดิม) ถือว่าอยู่ใน session นี้
+DEFAULT_SESSION_ID = 55
+DEFAULT_BATCH_NAME = "KFC_Competitor_Analysis_Q1"
+
+
+def item_session(item: dict) -> int:
+    return item.get("session_id", DEFAULT_SESSION_ID)
+
+
+class QCItemStore:
+    def __init__(self, items: List[dict]):
+        self.items = items or []
+        self.by_id: Dict[int, dict] = {}
+        self.by_session: Dict[int, List[dict]] = {}
+        # session_id -> batch_id (session ว่างไม่มี item ให้ดู batch_id)
+        self.session_batches: Dict[int, str] = {}
+        self.reviewed = 0
+        self.session_reviewed: Counter = Counter()
+        # JSON ของ item ที่ encode แล้ว (qc_item_id -> bytes) ล้างเมื่อ item ถูกแก้
+        self._fragments: Dict[int, bytes] = {}
+        for item in self.items:
+            self._index(item)
+        # version เพิ่มทุกครั้งที่มีการแก้ไข, dirty = มีการแก้ไขที่ยังไม่ได้เขียนลง disk
+        self.version = next_version()
+        self.dirty = False
+        self._lock = threading.Lock()
+
+    def _index(self, item: dict) -> None:
+        session_id = item_session(item)
+        self.by_id[item["qc_item_id"]] = item
+        self.by_session.setdefault(session_id, []).append(item)
+        self.session_batches.setdefault(session_id, item.get("batch_id", DEFAULT_BATCH_NAME))
+        if item.get("status") == "reviewed":
+            self.reviewed += 1
+            self.session_reviewed[session_id] += 1
+
+    @property
+    def total(self) -> int:
+        return len(self.items)
+
+    @property
+    def remaining(self) -> int:
+        return self.total - self.reviewed
+
+    def get(self, qc_item_id: int) -> Optional[dict]:
+        return self.by_id.get(qc_item_id)
+
+    def encode(self, item: dict) -> bytes:
+        """JSON bytes ของ item ตาม schema QCItem"""
+        fragment = self._fragments.get(item["qc_item_id"])
+        if fragment is None:
+            fragment = self._fragments[item["qc_item_id"]] = dumps(qc_item_payload(item))
+        return fragment
+
+    def session_items(self, session_id: int) -> Optional[List[dict]]:
+        return self.by_session.get(session_id)
+
+    def session_batch(self, session_id: int) -> str:
+        return self.session_batches.get(session_id, DEFAULT_BATCH_NAME)
+
+    def progress(self, session_id: Optional[int] = None) -> Dict[str, int]:
+        """progress ของ session (หรือทั้ง store ถ้าไม่ระบุ) จาก counter ที่ maintain ไว้"""
+        if session_id is None:
+            return {"total": self.total, "reviewed": self.reviewed, "remaining": self.remaining}
+        total = len(self.by_session.get(session_id, ()))
+        reviewed = self.session_reviewed[session_id]
+        return {"total": total, "reviewed": reviewed, "remaining": total - reviewed}
+
+    def next_session_id(self) -> int:
+        return max(self.by_session, default=DEFAULT_SESSION_ID - 1) + 1
+
+    def add_session(
+        self,
+        batch_id: str,
+        items: List[dict],
+        session_id: Optional[int] = None,
+        first_item_id: Optional[int] = None,
+    ) -> int:
+        """เพิ่ม QC session ใหม่ กำหนด session_id และ qc_item_id ให้ items แล้วคืน session_id
+
+        ถ้าไม่ระบุ session_id / first_item_id จะใช้เลขถัดไปของ store นี้
+        (เมื่อมีหลาย partition เลขถูกจองจาก BatchRegistry เพื่อไม่ให้ซ้ำกันข้าม partition)
+        """
+        with self._lock:
+            if session_id is None:
+                session_id = self.next_session_id()
+            next_id = first_item_id if first_item_id is not None else max(self.by_id, default=0) + 1
+            for offset, item in enumerate(items):
+                item["qc_item_id"] = next_id + offset
+                item["session_id"] = session_id
+                item["batch_id"] = batch_id
+                self.items.append(item)
+                self._index(item)
+            # session ว่างก็ต้องจองเลขไว้
+            self.by_session.setdefault(session_id, [])
+            self.session_batches.setdefault(session_id, batch_id)
+            self.version = next_version()
+            self.dirty = True
+            return session_id
+
+    def review(self, qc_item_id: int, final_sentiment: str, confirmed: int, updated_at: str) -> Optional[dict]:
+        """บันทึกผลการ review ของ item, คืน None ถ้าไม่พบ item"""
+        with self._lock:
+            item = self.by_id.get(qc_item_id)
+            if item is None:
+                return None
+            if item.get("status") != "reviewed":
+                self.reviewed += 1
+                self.session_reviewed[item_session(item)] += 1
+            item["status"] = "reviewed"
+            item["final_sentiment"] = final_sentiment
+            item["confirmed"] = confirmed
+            item["updated_at"] = updated_at
+            self._fragments.pop(qc_item_id, None)
+            self.version = next_version()
+            self.dirty = True
+            return item
+
+    def review_many(self, session_id: int, updates: List[dict], updated_at: str) -> List[dict]:
+        """บันทึกผล review หลาย item ของ session ใน lock เดียว (version/dirty เปลี่ยนครั้งเดียว)
+
+        updates: [{"qc_item_id", "correct_sentiment", "confirmed"}], คืนผลลัพธ์ราย item ตามลำดับเดิม
+        item ที่ไม่มีอยู่หรือไม่ได้อยู่ใน session นี้จะได้ success=False และไม่ถูกแก้
+        """
+        results = []
+        with self._lock:
+            for update in updates:
+                qc_item_id = update["qc_item_id"]
+                item = self.by_id.get(qc_item_id)
+                if item is None or item_session(item) != session_id:
+                    results.append({
+                        "qc_item_id": qc_item_id,
+                        "success": False,
+                        "status": None,
+                        "final_sentiment": None,
+                        "error": "QC item not found in session",
+                    })
+                    continue
+                if item.get("status") != "reviewed":
+                    self.reviewed += 1
+                    self.session_reviewed[session_id] += 1
+                final_sentiment = update.get("correct_sentiment") or item["predicted_sentiment"]
+                item["status"] = "reviewed"
+                item["final_sentiment"] = final_sentiment
+                item["confirmed"] = update.get("confirmed", 1)
+                item["updated_at"] = updated_at
+                self._fragments.pop(qc_item_id, None)
+                results.append({
+                    "qc_item_id": qc_item_id,
+                    "success": True,
+                    "status": "reviewed",
+                    "final_sentiment": final_sentiment,
+                    "error": None,
+                })
+            if any(r["success"] for r in results):
+                self.version = next_version()
+                self.dirty = True
+        return results
+
+    def dump(self) -> Tuple[int, List[dict]]:
+        """(version, copy ของ items) สำหรับเขียนลงไฟล์ เขียนสำเร็จแล้วค่อยเรียก mark_clean(version)"""
+        with self._lock:
+            return self.version, [dict(i) for i in self.items]
+
+    def mark_clean(self, version: int) -> None:
+        """เคลียร์สถานะ dirty หลังเขียนลงไฟล์สำเร็จ ถ้าไม่มีการแก้ไขใหม่ระหว่างเขียน"""
+        with self._lock:
+            if self.version == version:
+                self.dirty = False
+
+
+class QCWriteBehind:
+    """รวบการแก้ไข QC แล้ว flush ลงไฟล์ทุก interval วินาที (และตอน shutdown)
+
+    flush ทุกไฟล์ชื่อ filename ที่โหลดอยู่ (partition ตั้งต้นและ batches/<batch_id>/)
+    """
+
+    def __init__(self, data_store: MockDataStore, filename: str, interval: float = 1.0):
+        self.data_store = data_store
+        self.filename = filename
+        self.interval = interval
+        self.flushes = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def flush(self) -> bool:
+        """เขียน QC store ที่มีการแก้ไขค้างอยู่ลงไฟล์ คืน True ถ้ามีการเขียน
+
+        ไฟล์ที่เขียนไม่สำเร็จยัง dirty อยู่ (ลองใหม่รอบหน้า) ไฟล์อื่นยังถูกเขียนต่อ แล้วค่อย raise error แรก
+        """
+        written = False
+        failed: Optional[Exception] = None
+        for name in self.data_store.loaded(self.filename):
+            try:
+                written = self.flush_file(name) or written
+            except Exception as exc:
+                failed = failed or exc
+        if failed is not None:
+            raise failed
+        return written
+
+    def flush_file(self, name: str) -> bool:
+        qc_store = self.data_store.peek(name)
+        if qc_store is None or not qc_store.dirty:
+            return False
+        version, items = qc_store.dump()
+        self.data_store.save(name, items)
+        # แก้ไขที่เข้ามาระหว่างเขียน (version เปลี่ยน) ยัง dirty อยู่ให้รอบหน้าเขียนต่อ
+        qc_store.mark_clean(version)
+        self.flushes += 1
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await run_in_threadpool(self.flush)
+            except Exception as exc:  # เขียนไม่สำเร็จ ลองใหม่รอบหน้า
+                print(f"QC write-behind flush failed: {exc}")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await run_in_threadpool(self.flush)
@@ -0,0 +1,103 @@
+"""
+Sampling engine: สุ่มรีวิว k รายการแบบ uniform โดยไม่ต้อง copy ชุดข้อมูลที่กรองแล้ว
+
+- sample_view: สุ่มตำแหน่ง (index) ใน ReviewView แล้วค่อยดึงรีวิวตามตำแหน่ง ใช้เวลา O(k)
+  (มี keep: สุ่มตำแหน่งต่อไปจนได้รีวิวที่ผ่านเงื่อนไขครบ k)
+- reservoir_sample: สำหรับข้อมูลแบบ stream ที่รู้ขนาดล่วงหน้าไม่ได้ (Algorithm L)
+"""
+import math
+import random
+from bisect import bisect_right
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, Set, TypeVar
+
+from app.dataset import ReviewView
+
+T = TypeVar("T")
+
+_default_rng = random.Random()
+
+
+def make_rng(seed: Optional[int] = None) -> random.Random:
+    """RNG ที่ผลลัพธ์ทำซ้ำได้ถ้าระบุ seed, ไม่ระบุจะใช้ RNG กลางของ process"""
+    return random.Random(seed) if seed is not None else _default_rng
+
+
+def sample_view(
+    view: ReviewView, k: int, rng: Optional[random.Random] = None, keep: Optional[Callable[[dict], bool]] = None
+) -> List[dict]:
+    """สุ่มรีวิว k รายการจาก view แบบ uniform โดยไม่ซ้ำ
+
+    keep: เลือกเฉพาะรีวิวที่ keep(review) เป็นจริง สุ่มตำแหน่งต่อไปเรื่อยๆ จนได้ครบ k (หรือหมด view)
+    """
+    rng = rng or _default_rng
+    total = len(view)
+    k = min(max(k, 0), total)
+    if k == 0:
+        return []
+
+    # ตำแหน่งเริ่มต้นของแต่ละช่วงใน view เมื่อนำมาต่อกัน
+    starts = []
+    offset = 0
+    for _, lo, hi in view.parts:
+        starts.append(offset)
+        offset += hi - lo
+
+    # random.sample บน range ไม่สร้าง list ของทั้งช่วง
+    positions = rng.sample(range(total), k) if keep is None else shuffled_range(total, rng)
+    selected = []
+    for pos in positions:
+        n = bisect_right(starts, pos) - 1
+        index, lo, _ = view.parts[n]
+        review = index.reviews[lo + pos - starts[n]]
+        if keep is None or keep(review):
+            selected.append(review)
+            if len(selected) == k:
+                break
+    return selected
+
+
+def shuffled_range(n: int, rng: random.Random) -> Iterator[int]:
+    """0..n-1 ในลำดับสุ่มแบบ uniform ทีละตัว (ไม่สร้าง list ทั้งช่วงถ้าใช้แค่ส่วนหัว)"""
+    taken: Set[int] = set()
+    while len(taken) < n:
+        if len(taken) > n // 2:
+            # เหลือน้อยแล้ว สุ่มจากที่เหลือโดยตรงแทน rejection
+            rest = [i for i in range(n) if i not in taken]
+            rng.shuffle(rest)
+            yield from rest
+            return
+        i = rng.randrange(n)
+        if i not in taken:
+            taken.add(i)
+            yield i
+
+
+def _log_random(rng: random.Random) -> float:
+    """log ของเลขสุ่มในช่วง (0, 1] (rng.random() ให้ [0, 1) ซึ่ง log(0.0) เป็น ValueError)"""
+    return math.log(1.0 - rng.random())
+
+
+def reservoir_sample(items: Iterable[T], k: int, rng: Optional[random.Random] = None) -> List[T]:
+    """สุ่ม k รายการจาก stream แบบ uniform ในรอบเดียว ใช้ memory O(k)"""
+    rng = rng or _default_rng
+    if k <= 0:
+        return []
+    it = iter(items)
+    reservoir = list(islice(it, k))
+    if len(reservoir) < k:
+        rng.shuffle(reservoir)
+        return reservoir
+
+    # Algorithm L: กระโดดข้ามรายการที่ไม่ถูกเลือกแทนการสุ่มทีละตัว
+    w = math.exp(_log_random(rng) / k)
+    while True:
+        # w = 1 (สุ่มได้ 1.0 พอดี) คือ limit ที่ไม่ข้ามเลย
+        skip = math.floor(_log_random(rng) / math.log(1 - w)) if w < 1.0 else 0
+        try:
+            item = next(islice(it, skip, None))
+        except StopIteration:
+            break
+        reservoir[rng.randrange(k)] = item
+        w *= math.exp(_log_random(rng) / k)
+    return reservoir
@@ -0,0 +1,278 @@
+"""
+Full-text search ของ content รีวิวด้วย inverted index แบบ character bigram
+
+ภาษาไทยไม่เว้นวรรคระหว่างคำ จึงไม่ตัดคำ แต่ตัดข้อความเป็นช่วงตัวอักษรต่อเนื่อง (ไทย/อังกฤษ/ตัวเลข)
+แล้ว index ทุกคู่ตัวอักษรติดกัน (bigram) ของแต่ละช่วง เช่น "ราคา" -> รา, าค, คา
+คำค้นจะหา doc ที่มีทุก bigram ของทุกคำ (AND) แล้วตรวจซ้ำว่ามีคำนั้นอยู่จริง (substring) ก่อนส่งออก
+
+- doc = ตำแหน่งของรีวิวใน ReviewDataset.reviews (ingest ต่อท้ายเสมอ posting list จึงเรียงอยู่แล้ว)
+- เก็บ column ต่อ doc (platform, วันที่, bitmask ของ aspect x sentiment, จำนวน bigram)
+  เพื่อกรอง platform / ช่วงวันที่ / aspect / sentiment บน candidate ได้ทันทีโดยไม่ต้องอ่านรีวิว
+- ranking: doc ที่สั้นกว่า (คำค้นครอบคลุมข้อความมากกว่า) มาก่อน ถ้าเท่ากันรีวิวใหม่กว่ามาก่อน
+- ใช้ numpy ถ้ามี (intersect ด้วย searchsorted / กรองด้วย mask) ไม่มีก็ใช้ set / list แทน
+- len(candidates) คือจำนวนที่ผ่าน bigram + filter (API ส่งเป็น total_candidates อาจมากกว่าจำนวนที่มีคำนั้นจริงเล็กน้อย)
+"""
+import heapq
+import random
+import re
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy ไม่ได้อยู่ใน requirements หลัก
+    np = None
+
+from app.aggregates import review_day, review_platform
+
+_RUN = re.compile(r"[\w\u0E00-\u0E7F]+")
+# bit สุดท้ายใช้แทน aspect x sentiment ที่เกิน 63 แบบ (ต้องตรวจจาก results จริงตอนส่งออก)
+_OVERFLOW_BIT = 63
+_MAX_DAY = 99991231
+
+
+def grams(text: str) -> Set[str]:
+    return {run[i:i + 2] for run in _RUN.findall(text.lower()) for i in range(len(run) - 1)}
+
+
+def query_terms(q: str) -> List[str]:
+    """แยกคำค้นด้วยช่องว่าง คืนเฉพาะคำที่มี bigram อย่างน้อยหนึ่งตัว"""
+    return [term for term in q.lower().split() if grams(term)]
+
+
+def day_number(day: str) -> int:
+    """"2024-01-15" -> 20240115 (เรียงลำดับเหมือน string) วันที่ผิดรูปแบบได้ 0"""
+    digits = day[:10].replace("-", "")
+    return int(digits) if len(digits) == 8 and digits.isdigit() else 0
+
+
+class SearchIndex:
+    def __init__(self, reviews: Iterable[dict] = ()):
+        self.postings: Dict[str, array] = {}
+        self.review_id = array("q")
+        self.day = array("I")
+        self.platform = array("B")
+        self.tags = array("Q")
+        self.length = array("I")
+        self.platform_codes: Dict[str, int] = {}
+        self.tag_bits: Dict[Tuple[str, str], int] = {}
+        self.extend(reviews)
+
+    def __len__(self) -> int:
+        return len(self.review_id)
+
+    def extend(self, reviews: Iterable[dict]) -> None:
+        """index รีวิวที่ต่อท้าย dataset (doc ต่อจากตัวสุดท้ายตามลำดับ)"""
+        postings = self.postings
+        doc = len(self.review_id)
+        for review in reviews:
+            doc_grams = grams(review.get("content") or "")
+            for gram in doc_grams:
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array("I")
+                posting.append(doc)
+            self.review_id.append(review["review_id"])
+            self.day.append(day_number(review_day(review)))
+            self.platform.append(self._platform_code(review_platform(review)))
+            self.tags.append(self._tags(review.get("results") or {}))
+            self.length.append(len(doc_grams))
+            doc += 1
+
+    def _platform_code(self, platform: str) -> int:
+        code = self.platform_codes.get(platform)
+        if code is None:
+            code = self.platform_codes[platform] = min(len(self.platform_codes), 255)
+        return code
+
+    def _tag_bit(self, aspect: str, sentiment: str) -> int:
+        bit = self.tag_bits.get((aspect, sentiment))
+        if bit is None:
+            bit = self.tag_bits[(aspect, sentiment)] = min(len(self.tag_bits), _OVERFLOW_BIT)
+        return bit
+
+    def _tags(self, results: dict) -> int:
+        mask = 0
+        for aspect, detail in results.items():
+            mask |= 1 << self._tag_bit(aspect.upper(), detail.get("sentiment", "neutral"))
+        return mask
+
+    def tag_mask(self, aspect: Optional[str], sentiment: Optional[str]) -> int:
+        """bitmask ของ aspect x sentiment ที่ตรง filter (รวม overflow bit ถ้ามี)"""
+        mask = 0
+        for (a, s), bit in self.tag_bits.items():
+            if (aspect is None or a == aspect) and (sentiment is None or s == sentiment):
+                mask |= 1 << bit
+        if len(self.tag_bits) > _OVERFLOW_BIT:
+            mask |= 1 << _OVERFLOW_BIT
+        return mask
+
+    def candidates(
+        self,
+        terms: Sequence[str],
+        platforms: Optional[Iterable[str]] = None,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+        aspect: Optional[str] = None,
+        sentiment: Optional[str] = None,
+    ) -> Sequence[int]:
+        """doc ที่มีทุก bigram ของทุกคำและผ่าน filter เรียงจากน้อยไปมาก"""
+        wanted: Set[str] = set()
+        for term in terms:
+            wanted |= grams(term)
+        lists = []
+        for gram in wanted:
+            posting = self.postings.get(gram)
+            if posting is None:
+                return []
+            lists.append(posting)
+        lists.sort(key=len)
+
+        codes = None
+        if platforms is not None:
+            codes = {self.platform_codes[p.lower()] for p in platforms if p.lower() in self.platform_codes}
+        lo = day_number(from_date) if from_date else 0
+        hi = day_number(to_date) if to_date else _MAX_DAY
+        mask = self.tag_mask(aspect, sentiment) if aspect is not None or sentiment is not None else None
+        if np is not None:
+            return self._candidates_np(lists, codes, lo, hi, mask)
+
+        docs: Iterable[int] = range(len(self)) if not lists else lists[0]
+        if len(lists) > 1:
+            found = set(lists[0])
+            for posting in lists[1:]:
+                found.intersection_update(posting)
+            docs = sorted(found)
+        return [
+            d for d in docs
+            if (codes is None or self.platform[d] in codes)
+            and lo <= self.day[d] <= hi
+            and (mask is None or self.tags[d] & mask)
+        ]
+
+    def _candidates_np(self, lists, codes, lo, hi, mask):
+        if not lists:
+            # ไม่มีคำค้น: กรองทั้ง column ด้วย boolean mask แทนการ gather ทีละ doc
+            keep = np.ones(len(self), dtype=np.bool_)
+            if codes is not None:
+                keep &= np.isin(np.frombuffer(self.platform, dtype=np.uint8), list(codes))
+            if lo or hi != _MAX_DAY:
+                days = np.frombuffer(self.day, dtype=np.uint32)
+                keep &= (days >= lo) & (days <= hi)
+            if mask is not None:
+                keep &= (np.frombuffer(self.tags, dtype=np.uint64) & np.uint64(mask)) != 0
+            return np.flatnonzero(keep)
+        docs = np.frombuffer(lists[0], dtype=np.uint32)
+        seen = None
+        for posting in lists[1:]:
+            if not len(docs):
+                break
+            other = np.frombuffer(posting, dtype=np.uint32)
+            if len(docs) * 16 < len(other):
+                # posting เรียงอยู่แล้ว: หาตำแหน่งของ doc ใน list ที่ยาวกว่ามากด้วย searchsorted
+                pos = np.searchsorted(other, docs)
+                pos[pos == len(other)] = 0
+                docs = docs[other[pos] == docs]
+            else:
+                # ขนาดใกล้กัน: ทำ bitmap ของ list ที่ยาวกว่าแล้วเช็คทีละ doc (เร็วกว่า searchsorted ราว 3 เท่า)
+                if seen is None:
+                    seen = np.zeros(len(self), dtype=np.bool_)
+                else:
+                    seen[:] = False
+                seen[other] = True
+                docs = docs[seen[docs]]
+        if codes is not None and len(docs):
+            docs = docs[np.isin(np.frombuffer(self.platform, dtype=np.uint8)[docs], list(codes))]
+        if (lo or hi != _MAX_DAY) and len(docs):
+            days = np.frombuffer(self.day, dtype=np.uint32)[docs]
+            docs = docs[(days >= lo) & (days <= hi)]
+        if mask is not None and len(docs):
+            docs = docs[(np.frombuffer(self.tags, dtype=np.uint64)[docs] & np.uint64(mask)) != 0]
+        # ไม่ให้ view ของ array ติดออกไปนอก lock (array ที่มี buffer export อยู่จะ append ไม่ได้)
+        return docs.astype(np.int64)
+
+    # --- ลำดับของผลลัพธ์ ---
+
+    def ranked(self, docs: Sequence[int], chunk: int = 64) -> Iterator[int]:
+        """doc เรียงตาม relevance (สั้นกว่ามาก่อน แล้ววันที่ใหม่กว่ามาก่อน) ทีละชุดเท่าที่ถูกขอ"""
+        if np is None:
+            yield from sorted(docs, key=lambda d: (self.length[d], -self.day[d], -d))
+            return
+        docs = np.asarray(docs, dtype=np.int64)
+        lengths = np.frombuffer(self.length, dtype=np.uint32)[docs].astype(np.int64)
+        days = np.frombuffer(self.day, dtype=np.uint32)[docs].astype(np.int64)
+        key = (lengths << 27) | (_MAX_DAY - days)
+        n = len(docs)
+        if n and int(key.max()) >= (1 << 62) // n:
+            # key ใหญ่เกินจะรวม doc เข้าไปได้: sort ทั้งชุด
+            yield from (int(d) for d in docs[np.lexsort((-docs, key))])
+            return
+        # ให้ key ไม่ซ้ำ (เท่ากันแล้ว doc ที่เพิ่มทีหลังมาก่อน) ลำดับจึงคงที่ไม่ขึ้นกับ argpartition
+        yield from _smallest_first(docs, key * n + (n - 1 - np.arange(n)), chunk)
+
+    def by_date(self, docs: Sequence[int], after: Optional[Tuple[str, int]] = None, chunk: int = 64) -> Iterator[int]:
+        """doc เรียงตาม (review_date, review_id) ถัดจาก cursor (keyset แบบเดียวกับ ReviewView.after)"""
+        after_day, after_id = (day_number(after[0]), after[1]) if after else (-1, 0)
+        if np is None:
+            keyed = [(self.day[d], self.review_id[d], d) for d in docs]
+            keyed = [k for k in keyed if (k[0], k[1]) > (after_day, after_id)]
+            yield from (d for _, _, d in heapq.nsmallest(len(keyed), keyed))
+            return
+        docs = np.asarray(docs, dtype=np.int64)
+        days = np.frombuffer(self.day, dtype=np.uint32)[docs].astype(np.int64)
+        ids = np.frombuffer(self.review_id, dtype=np.int64)[docs]
+        keep = (days > after_day) | ((days == after_day) & (ids > after_id))
+        docs, days, ids = docs[keep], days[keep], ids[keep]
+        if len(ids) and (ids.min() < 0 or ids.max() >= 1 << 36):
+            # review_id ใหญ่เกินจะรวมเป็น key เดียวได้: sort ทั้งชุด
+            yield from (int(d) for d in docs[np.lexsort((ids, days))])
+            return
+        yield from _smallest_first(docs, (days << 36) | ids, chunk)
+
+    def sample(self, docs: Sequence[int], rng: random.Random) -> Iterator[int]:
+        """doc แบบสุ่มไม่ซ้ำ (uniform) ทีละตัวเท่าที่ถูกขอ"""
+        n = len(docs)
+        taken: Set[int] = set()
+        while len(taken) < n:
+            if len(taken) > n // 2:
+                # เหลือน้อยแล้ว สุ่มจากที่เหลือโดยตรงแทน rejection
+                rest = [i for i in range(n) if i not in taken]
+                rng.shuffle(rest)
+                yield from (int(docs[i]) for i in rest)
+                return
+            i = rng.randrange(n)
+            if i not in taken:
+                taken.add(i)
+                yield int(docs[i])
+
+
+def _smallest_first(docs, key, chunk: int) -> Iterator[int]:
+    """เรียง docs ตาม key จากน้อยไปมาก ทีละ chunk (argpartition) ไม่ต้อง sort ทั้งชุดถ้าต้องการแค่หัว"""
+    start = 0
+    order = np.arange(len(docs))
+    while start < len(docs):
+        end = min(len(docs), start + chunk)
+        rest = order[start:]
+        if end < len(docs):
+            part = np.argpartition(key[rest], end - start - 1)
+            rest = rest[part]
+            order[start:] = rest
+        head = order[start:end]
+        head = head[np.argsort(key[head], kind="stable")]
+        yield from (int(d) for d in docs[head])
+        start = end
+        chunk *= 4
+
+
+def matches(review: dict, terms: Sequence[str], aspect: Optional[str], sentiment: Optional[str]) -> bool:
+    """ตรวจซ้ำว่ารีวิวมีทุกคำค้นจริง และมี aspect / sentiment ตาม filter"""
+    if terms:
+        content = (review.get("content") or "").lower()
+        if not all(term in content for term in terms):
+            return False
+    if aspect is None and sentiment is None:
+        return True
+    return any(
+        (aspect is None or a.upper() == aspect) and (sentiment is None or d.get("sentiment", "neutral") == sentiment)
+        for a, d in (review.get("results") or {}).items()
+    )
@@ -0,0 +1,246 @@
+"""
+Snapshot แบบ binary ของรีวิวใน batch สำหรับเปิดด้วย mmap แทน json.load ทั้งไฟล์
+
+รูปแบบไฟล์ (native little-endian):
+
+    MAGIC (8 bytes) | header_len (uint32) | header (JSON) | padding ถึง 8 bytes | columns...
+
+header เก็บจำนวนรีวิว/แถวผลทำนาย, string table ที่ intern แล้ว (platforms, dates, aspects,
+sentiments) และตำแหน่งของแต่ละ column (offset นับจากต้น data section)
+
+- ระดับรีวิว:   review_id (q), platform (H), date (I), content_offset (Q), content_length (I),
+                result_offset (I, n+1 ตัว ชี้ไปที่แถวผลทำนาย)
+- ระดับผลทำนาย: aspect (H), sentiment (B), confidence (d), sentiment_gap (d, NaN = ไม่มี)
+- strings:      เนื้อหารีวิว (utf-8) ต่อกัน ข้อความซ้ำถูกเก็บครั้งเดียว
+
+ไฟล์ถูกเปิดแบบ read-only ด้วย mmap ทุก worker จึงใช้ page cache ชุดเดียวกันของ OS
+และ content จะถูก decode เฉพาะรีวิวที่ถูกส่งออกใน response เท่านั้น
+
+    python -m app.snapshot mock_data/reviews.json [mock_data/reviews.snap]
+"""
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Dict, Iterable, Iterator, List
+
+MAGIC = b"RRSNAP01"
+_HEADER_LEN = struct.Struct("<I")
+
+# (ชื่อ column, typecode ของ array/memoryview)
+REVIEW_COLUMNS = [
+    ("review_id", "q"),
+    ("platform", "H"),
+    ("date", "I"),
+    ("content_offset", "Q"),
+    ("content_length", "I"),
+    ("result_offset", "I"),
+]
+ROW_COLUMNS = [
+    ("aspect", "H"),
+    ("sentiment", "B"),
+    ("confidence", "d"),
+    ("sentiment_gap", "d"),
+]
+
+
+class _Interner:
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+def write_snapshot(reviews: Iterable[dict], path: str) -> int:
+    """เขียนรีวิวเป็นไฟล์ snapshot แบบ atomic, คืนจำนวนรีวิวที่เขียน"""
+    if sys.byteorder != "little":
+        raise RuntimeError("snapshot format requires a little-endian platform")
+
+    platforms, dates, aspects, sentiments = _Interner(), _Interner(), _Interner(), _Interner()
+    cols = {name: array(code) for name, code in REVIEW_COLUMNS + ROW_COLUMNS}
+    strings = bytearray()
+    content_refs: Dict[str, tuple] = {}
+
+    cols["result_offset"].append(0)
+    for review in reviews:
+        cols["review_id"].append(int(review["review_id"]))
+        cols["platform"].append(platforms.code(review.get("source_platform") or "unknown"))
+        cols["date"].append(dates.code(review.get("review_date") or ""))
+
+        content = review.get("content") or ""
+        ref = content_refs.get(content)
+        if ref is None:
+            raw = content.encode("utf-8")
+            ref = content_refs[content] = (len(strings), len(raw))
+            strings += raw
+        cols["content_offset"].append(ref[0])
+        cols["content_length"].append(ref[1])
+
+        for aspect, detail in (review.get("results") or {}).items():
+            cols["aspect"].append(aspects.code(aspect))
+            cols["sentiment"].append(sentiments.code(detail.get("sentiment", "neutral")))
+            cols["confidence"].append(float(detail.get("confidence", 0.0)))
+            cols["sentiment_gap"].append(float(detail.get("sentiment_gap", math.nan)))
+        cols["result_offset"].append(len(cols["aspect"]))
+
+    columns = {}
+    offset = 0
+    for name, _ in REVIEW_COLUMNS + ROW_COLUMNS:
+        size = len(cols[name]) * cols[name].itemsize
+        columns[name] = [offset, len(cols[name])]
+        offset += _pad(size)
+    header = {
+        "reviews": len(cols["review_id"]),
+        "rows": len(cols["aspect"]),
+        "platforms": platforms.values,
+        "dates": dates.values,
+        "aspects": aspects.values,
+        "sentiments": sentiments.values,
+        "columns": columns,
+        "strings": [offset, len(strings)],
+    }
+    header_raw = json.dumps(header, ensure_ascii=False).encode("utf-8")
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LEN.pack(len(header_raw)))
+        f.write(header_raw)
+        f.write(b"\0" * (_pad(f.tell()) - f.tell()))
+        for name, _ in REVIEW_COLUMNS + ROW_COLUMNS:
+            data = cols[name].tobytes()
+            f.write(data)
+            f.write(b"\0" * (_pad(len(data)) - len(data)))
+        f.write(strings)
+    os.replace(tmp_path, path)
+    return header["reviews"]
+
+
+def _pad(n: int) -> int:
+    return (n + 7) & ~7
+
+
+class Snapshot(Sequence):
+    """รีวิวใน snapshot ที่เปิดด้วย mmap ทำตัวเป็น Sequence ของ SnapshotReview"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a review snapshot")
+        (header_len,) = _HEADER_LEN.unpack_from(self._mm, len(MAGIC))
+        start = len(MAGIC) + _HEADER_LEN.size
+        header = json.loads(self._mm[start:start + header_len].decode("utf-8"))
+        base = _pad(start + header_len)
+
+        self._view = memoryview(self._mm)
+        self.platforms: List[str] = header["platforms"]
+        self.dates: List[str] = header["dates"]
+        self.aspects: List[str] = header["aspects"]
+        self.sentiments: List[str] = header["sentiments"]
+        self._n = header["reviews"]
+        for name, code in REVIEW_COLUMNS + ROW_COLUMNS:
+            offset, count = header["columns"][name]
+            size = count * struct.calcsize(code)
+            setattr(self, name, self._view[base + offset:base + offset + size].cast(code))
+        offset, size = header["strings"]
+        self._strings = self._view[base + offset:base + offset + size]
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [SnapshotReview(self, j) for j in range(*i.indices(self._n))]
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError(i)
+        return SnapshotReview(self, i)
+
+    def __iter__(self) -> Iterator["SnapshotReview"]:
+        return (SnapshotReview(self, i) for i in range(self._n))
+
+    def content(self, i: int) -> str:
+        offset = self.content_offset[i]
+        return bytes(self._strings[offset:offset + self.content_length[i]]).decode("utf-8")
+
+    def results(self, i: int) -> Dict[str, dict]:
+        results = {}
+        for row in range(self.result_offset[i], self.result_offset[i + 1]):
+            detail = {
+                "sentiment": self.sentiments[self.sentiment[row]],
+                "confidence": self.confidence[row],
+            }
+            gap = self.sentiment_gap[row]
+            if not math.isnan(gap):
+                detail["sentiment_gap"] = gap
+            results[self.aspects[self.aspect[row]]] = detail
+        return results
+
+
+class SnapshotReview(Mapping):
+    """รีวิวหนึ่งรายการใน snapshot
+
+    ไม่ cache ค่าที่ decode แล้วไว้ใน object เพื่อให้ index ที่ถือ object เหล่านี้ไว้ทุกตัวยังเล็กอยู่
+    content/results จะถูก decode จาก mmap ทุกครั้งที่ถูกอ่าน
+    """
+
+    __slots__ = ("_snap", "_i")
+    _KEYS = ("review_id", "source_platform", "review_date", "content", "results")
+
+    def __init__(self, snap: Snapshot, i: int):
+        self._snap = snap
+        self._i = i
+
+    def __getitem__(self, key: str):
+        snap, i = self._snap, self._i
+        if key == "review_id":
+            return snap.review_id[i]
+        if key == "source_platform":
+            return snap.platforms[snap.platform[i]]
+        if key == "review_date":
+            return snap.dates[snap.date[i]]
+        if key == "content":
+            return snap.content(i)
+        if key == "results":
+            return snap.results(i)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+    def __eq__(self, other):
+        if isinstance(other, SnapshotReview):
+            return self._snap is other._snap and self._i == other._i
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+
+def main(argv: List[str]) -> None:
+    if not argv or len(argv) > 2:
+        sys.exit("usage: python -m app.snapshot <reviews.json> [reviews.snap]")
+    source = argv[0]
+    target = argv[1] if len(argv) > 1 else os.path.splitext(source)[0] + ".snap"
+    with open(source, "r", encoding="utf-8") as f:
+        reviews = json.load(f)
+    count = write_snapshot(reviews, target)
+    print(f"Wrote {count} reviews to {target} ({os.path.getsize(target):,} bytes)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
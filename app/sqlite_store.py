@@ -0,0 +1,665 @@
+"""
+SQLite backend (REVIEW_RADAR_BACKEND=sqlite): ข้อมูลของทุก worker อยู่ในฐานข้อมูลไฟล์เดียว
+
+ใช้ WAL mode ทำให้อ่านพร้อมกันได้หลาย connection/process ขณะมีการเขียน (เขียนได้ทีละ transaction)
+- QC item / session อ่านเขียนจาก SQLite โดยตรง ทุก worker จึงเห็นการแก้ไขและ progress เดียวกันทันที
+- metrics / trends อ่านจาก cube ในตาราง review_days / review_cells ที่ทุก worker ใช้ร่วมกัน
+  (อัปเดตใน transaction เดียวกับการเพิ่มรีวิว) worker ไม่ต้องโหลดรีวิวของ batch เพื่อตอบ metrics
+- รายการรีวิว / ค้นหา / สร้าง QC session ยังใช้ ReviewDataset (date index / search index) ใน memory ของ worker
+  ตามข้อมูลใหม่ด้วย version ของ batch ในตาราง batches (ดึงเฉพาะแถวที่ seq มากกว่าที่เคยโหลด)
+
+ฐานข้อมูลว่างถูก seed จากไฟล์ใน mock_data ครั้งแรกที่ worker ใดก็ตามเริ่มทำงาน
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.aggregates import SENTIMENTS, metrics_delta, trend_points
+from app.dataset import ReviewDataset
+from app.encoding import dumps, qc_item_payload
+from app.qc_store import DEFAULT_BATCH_NAME, DEFAULT_SESSION_ID
+
+# batch_id ของ partition ตั้งต้น (ไฟล์ที่ root ของ mock_data) ใช้กับ batch_id ที่ไม่มีอยู่ในตาราง batches
+DEFAULT_PARTITION = ""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    batch_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS reviews (
+    seq INTEGER PRIMARY KEY,
+    batch_id TEXT NOT NULL,
+    review_id INTEGER NOT NULL,
+    platform TEXT NOT NULL,
+    review_date TEXT NOT NULL,
+    body TEXT NOT NULL,
+    UNIQUE (batch_id, review_id)
+);
+CREATE INDEX IF NOT EXISTS reviews_batch_platform_date ON reviews (batch_id, platform, review_date);
+-- cube ของ metrics: จำนวนรีวิวต่อ (platform, วัน) และจำนวน sentiment ต่อ (platform, วัน, aspect)
+CREATE TABLE IF NOT EXISTS review_days (
+    batch_id TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    day TEXT NOT NULL,
+    reviews INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (batch_id, platform, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS review_cells (
+    batch_id TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    day TEXT NOT NULL,
+    aspect TEXT NOT NULL,
+    sentiment TEXT NOT NULL,
+    n INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (batch_id, platform, day, aspect, sentiment)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS qc_sessions (
+    session_id INTEGER PRIMARY KEY,
+    batch_id TEXT NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    reviewed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS qc_items (
+    qc_item_id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS qc_items_session_status ON qc_items (session_id, status);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('qc_version', 0);
+"""
+
+
+def backend_name() -> str:
+    return os.environ.get("REVIEW_RADAR_BACKEND", "file").strip().lower()
+
+
+class ConnectionPool:
+    """pool ของ connection ที่ใช้ซ้ำได้ (แต่ละ connection ถูกใช้โดยทีละ thread)"""
+
+    def __init__(self, path: str, size: int = 8, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self.created = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: จัดการ transaction เองด้วย BEGIN IMMEDIATE / COMMIT
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self.created += 1
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError("SQLite connection pool exhausted")
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                yield conn
+            finally:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """transaction สำหรับเขียน (BEGIN IMMEDIATE จอง write lock ตั้งแต่ต้น ไม่ deadlock ตอน upgrade)"""
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def _decode_item(body: str) -> dict:
+    return json.loads(body)
+
+
+def _add_aggregates(conn: sqlite3.Connection, partition: str, reviews: Iterable[dict]) -> None:
+    """บวกรีวิวเข้า cube ของ batch (เรียกใน transaction เดียวกับที่ INSERT รีวิว)"""
+    days, cells = [], []
+    for cell in metrics_delta(added=reviews)["cells"]:
+        platform, day = cell["platform"], cell["date"]
+        days.append((partition, platform, day, cell["reviews"]))
+        for aspect, counts in cell["aspects"].items():
+            cells.extend((partition, platform, day, aspect, sentiment, n) for sentiment, n in counts.items())
+    conn.executemany(
+        "INSERT INTO review_days (batch_id, platform, day, reviews) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (batch_id, platform, day) DO UPDATE SET reviews = reviews + excluded.reviews",
+        days,
+    )
+    conn.executemany(
+        "INSERT INTO review_cells (batch_id, platform, day, aspect, sentiment, n) VALUES (?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT (batch_id, platform, day, aspect, sentiment) DO UPDATE SET n = n + excluded.n",
+        cells,
+    )
+
+
+class SQLiteAggregates:
+    """metrics / trend ของ batch หนึ่งจากตาราง cube (method ชุดเดียวกับ AggregateIndex)
+
+    ใช้ภายใน read transaction ของ SQLiteBackend.aggregates ผลทุก query จึงมาจากข้อมูลชุดเดียวกับ version
+    """
+
+    def __init__(self, conn: sqlite3.Connection, partition: str, version: int):
+        self.conn = conn
+        self.partition = partition
+        self.version = version
+
+    def _where(
+        self, platforms: Optional[Iterable[str]], from_date: Optional[str], to_date: Optional[str]
+    ) -> Tuple[str, List[Any]]:
+        clauses, params = ["batch_id = ?"], [self.partition]
+        if platforms is not None:
+            selected = sorted({p.lower() for p in platforms})
+            clauses.append(f"platform IN ({','.join('?' * len(selected))})")
+            params.extend(selected)
+        if from_date:
+            clauses.append("day >= ?")
+            params.append(from_date)
+        if to_date:
+            clauses.append("day <= ?")
+            params.append(to_date)
+        return " AND ".join(clauses), params
+
+    def platform_counts(self, from_date: Optional[str] = None, to_date: Optional[str] = None) -> Dict[str, int]:
+        """จำนวนรีวิวต่อ platform (ทุก platform ของ batch) ในช่วงวันที่กำหนด"""
+        where, params = self._where(None, from_date, to_date)
+        counts = {platform: 0 for platform, in self.conn.execute(
+            "SELECT DISTINCT platform FROM review_days WHERE batch_id = ?", (self.partition,)
+        )}
+        for platform, n in self.conn.execute(
+            f"SELECT platform, SUM(reviews) FROM review_days WHERE {where} GROUP BY platform", params
+        ):
+            counts[platform] = n
+        return counts
+
+    def sentiment_counts(
+        self,
+        platforms: Optional[Iterable[str]] = None,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+    ) -> Tuple[Dict[str, int], Dict[str, Dict[str, int]]]:
+        where, params = self._where(platforms, from_date, to_date)
+        overall = {s: 0 for s in SENTIMENTS}
+        aspects: Dict[str, Dict[str, int]] = {}
+        for aspect, sentiment, n in self.conn.execute(
+            f"SELECT aspect, sentiment, SUM(n) AS total FROM review_cells WHERE {where} "
+            f"GROUP BY aspect, sentiment HAVING total > 0 ORDER BY aspect",
+            params,
+        ):
+            overall[sentiment] += n
+            aspects.setdefault(aspect, {s: 0 for s in SENTIMENTS})[sentiment] += n
+        return overall, aspects
+
+    def trend(
+        self,
+        granularity: str = "day",
+        platforms: Optional[Iterable[str]] = None,
+        aspect: Optional[str] = None,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+    ) -> List[dict]:
+        where, params = self._where(platforms, from_date, to_date)
+        days: Dict[str, List[int]] = {}
+        for day, reviews in self.conn.execute(
+            f"SELECT day, SUM(reviews) FROM review_days WHERE {where} GROUP BY day", params
+        ):
+            days[day] = [0, 0, 0, reviews]
+        if aspect:
+            where += " AND aspect = ?"
+            params = [*params, aspect.upper()]
+        for day, sentiment, n in self.conn.execute(
+            f"SELECT day, sentiment, SUM(n) FROM review_cells WHERE {where} GROUP BY day, sentiment", params
+        ):
+            days[day][SENTIMENTS.index(sentiment)] += n
+        return trend_points(((day, *row) for day, row in days.items()), granularity)
+
+
+class SQLiteQCStore:
+    """QC store บน SQLite มี method ชุดเดียวกับ QCItemStore ที่ endpoint ใช้
+
+    ไม่มี write-behind (dirty เป็น False เสมอ) และไม่ cache item ใน memory
+    version มาจากตาราง meta จึงเปลี่ยนพร้อมกันทุก worker (ใช้เป็น key ของ response cache)
+    """
+
+    dirty = False
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+
+    @property
+    def version(self) -> int:
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT value FROM meta WHERE key = 'qc_version'").fetchone()[0]
+
+    def has_session(self, session_id: int) -> bool:
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT 1 FROM qc_sessions WHERE session_id = ?", (session_id,)).fetchone() is not None
+
+    def get(self, qc_item_id: int) -> Optional[dict]:
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT body FROM qc_items WHERE qc_item_id = ?", (qc_item_id,)).fetchone()
+        return _decode_item(row[0]) if row is not None else None
+
+    def encode(self, item: dict) -> bytes:
+        return dumps(qc_item_payload(item))
+
+    def session_items(self, session_id: int) -> Optional[List[dict]]:
+        with self.pool.connection() as conn:
+            if conn.execute("SELECT 1 FROM qc_sessions WHERE session_id = ?", (session_id,)).fetchone() is None:
+                return None
+            rows = conn.execute(
+                "SELECT body FROM qc_items WHERE session_id = ? ORDER BY qc_item_id", (session_id,)
+            ).fetchall()
+        return [_decode_item(body) for body, in rows]
+
+    def session_batch(self, session_id: int) -> str:
+        with self.pool.connection() as conn:
+            item = conn.execute(
+                "SELECT body FROM qc_items WHERE session_id = ? ORDER BY qc_item_id LIMIT 1", (session_id,)
+            ).fetchone()
+            if item is not None:
+                return _decode_item(item[0]).get("batch_id", DEFAULT_BATCH_NAME)
+            # session ว่าง: ใช้ batch_id ที่บันทึกไว้ตอนสร้าง session
+            row = conn.execute("SELECT batch_id FROM qc_sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return row[0] if row is not None and row[0] else DEFAULT_BATCH_NAME
+
+    def progress(self, session_id: Optional[int] = None) -> Dict[str, int]:
+        with self.pool.connection() as conn:
+            if session_id is None:
+                row = conn.execute("SELECT COALESCE(SUM(total), 0), COALESCE(SUM(reviewed), 0) FROM qc_sessions").fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT total, reviewed FROM qc_sessions WHERE session_id = ?", (session_id,)
+                ).fetchone() or (0, 0)
+        total, reviewed = row
+        return {"total": total, "reviewed": reviewed, "remaining": total - reviewed}
+
+    def add_session(self, batch_id: str, items: List[dict]) -> int:
+        """เพิ่ม QC session ใหม่ (จอง session_id / qc_item_id ใน transaction เดียวกัน) คืน session_id"""
+        with self.pool.transaction() as conn:
+            session_id = conn.execute(
+                "SELECT COALESCE(MAX(session_id), ?) + 1 FROM qc_sessions", (DEFAULT_SESSION_ID - 1,)
+            ).fetchone()[0]
+            next_id = conn.execute("SELECT COALESCE(MAX(qc_item_id), 0) + 1 FROM qc_items").fetchone()[0]
+            for offset, item in enumerate(items):
+                item["qc_item_id"] = next_id + offset
+                item["session_id"] = session_id
+                item["batch_id"] = batch_id
+            self._insert(conn, batch_id, session_id, items)
+            return session_id
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, batch_id: str, session_id: int, items: List[dict]) -> None:
+        """qc_sessions.batch_id เก็บ batch_id ของ session (ใช้เป็น batch_name แม้ session จะว่าง)"""
+        reviewed = sum(1 for item in items if item.get("status") == "reviewed")
+        conn.execute(
+            "INSERT INTO qc_sessions (session_id, batch_id, total, reviewed) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (session_id) DO UPDATE SET total = total + excluded.total, reviewed = reviewed + excluded.reviewed",
+            (session_id, batch_id, len(items), reviewed),
+        )
+        conn.executemany(
+            "INSERT INTO qc_items (qc_item_id, session_id, status, body) VALUES (?, ?, ?, ?)",
+            [(item["qc_item_id"], session_id, item.get("status", "pending"), json.dumps(item, ensure_ascii=False))
+             for item in items],
+        )
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'qc_version'")
+
+    def _review(self, conn: sqlite3.Connection, item: dict, final_sentiment: str, confirmed: int, updated_at: str) -> None:
+        if item.get("status") != "reviewed":
+            conn.execute(
+                "UPDATE qc_sessions SET reviewed = reviewed + 1 WHERE session_id = ?",
+                (item.get("session_id", DEFAULT_SESSION_ID),),
+            )
+        item["status"] = "reviewed"
+        item["final_sentiment"] = final_sentiment
+        item["confirmed"] = confirmed
+        item["updated_at"] = updated_at
+        conn.execute(
+            "UPDATE qc_items SET status = 'reviewed', body = ? WHERE qc_item_id = ?",
+            (json.dumps(item, ensure_ascii=False), item["qc_item_id"]),
+        )
+
+    def review(self, qc_item_id: int, final_sentiment: str, confirmed: int, updated_at: str) -> Optional[dict]:
+        """บันทึกผลการ review ของ item, คืน None ถ้าไม่พบ item"""
+        with self.pool.transaction() as conn:
+            row = conn.execute("SELECT body FROM qc_items WHERE qc_item_id = ?", (qc_item_id,)).fetchone()
+            if row is None:
+                return None
+            item = _decode_item(row[0])
+            self._review(conn, item, final_sentiment, confirmed, updated_at)
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'qc_version'")
+            return item
+
+    def review_many(self, session_id: int, updates: List[dict], updated_at: str) -> List[dict]:
+        """เหมือน QCItemStore.review_many แต่ทำใน transaction เดียวของ SQLite"""
+        results = []
+        with self.pool.transaction() as conn:
+            ids = [u["qc_item_id"] for u in updates]
+            items: Dict[int, dict] = {}
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT qc_item_id, body FROM qc_items WHERE session_id = ? "
+                    f"AND qc_item_id IN ({','.join('?' * len(chunk))})",
+                    (session_id, *chunk),
+                ).fetchall()
+                items.update((qc_item_id, _decode_item(body)) for qc_item_id, body in rows)
+            for update in updates:
+                qc_item_id = update["qc_item_id"]
+                item = items.get(qc_item_id)
+                if item is None:
+                    results.append({
+                        "qc_item_id": qc_item_id,
+                        "success": False,
+                        "status": None,
+                        "final_sentiment": None,
+                        "error": "QC item not found in session",
+                    })
+                    continue
+                final_sentiment = update.get("correct_sentiment") or item["predicted_sentiment"]
+                self._review(conn, item, final_sentiment, update.get("confirmed", 1), updated_at)
+                results.append({
+                    "qc_item_id": qc_item_id,
+                    "success": True,
+                    "status": "reviewed",
+                    "final_sentiment": final_sentiment,
+                    "error": None,
+                })
+            if any(r["success"] for r in results):
+                conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'qc_version'")
+        return results
+
+
+class _BatchState:
+    __slots__ = ("dataset", "version", "seq", "size")
+
+    def __init__(self, dataset: ReviewDataset, version: int, seq: int, size: int):
+        self.dataset = dataset
+        self.version = version
+        self.seq = seq
+        self.size = size
+
+
+class SQLiteBackend:
+    def __init__(self, path: str, pool_size: int = 8, memory_budget: Optional[int] = None):
+        self.path = path
+        self.pool = ConnectionPool(path, size=pool_size)
+        self.qc = SQLiteQCStore(self.pool)
+        self.memory_budget = memory_budget
+        # dataset ของ batch ที่โหลดไว้ใน worker นี้ (LRU แบบเดียวกับ BatchRegistry)
+        self._datasets: "OrderedDict[str, _BatchState]" = OrderedDict()
+        # _lock คุม _datasets / _batch_locks เท่านั้น การโหลด/sync dataset ถือ lock ของ batch นั้น
+        # batch อื่นจึงไม่ต้องรอ batch ที่กำลังโหลดข้อมูลหลายแสนแถวอยู่
+        self._lock = threading.RLock()
+        self._batch_locks: Dict[str, threading.Lock] = {}
+        self.evictions = 0
+        self.syncs = 0
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+        with self.pool.transaction() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'aggregates'").fetchone() is None:
+                # ฐานข้อมูลจากก่อนมีตาราง cube: สร้าง cube จากรีวิวที่มีอยู่ครั้งเดียว
+                self._rebuild_aggregates(conn)
+                conn.execute("INSERT INTO meta (key, value) VALUES ('aggregates', 1)")
+
+    @staticmethod
+    def _rebuild_aggregates(conn: sqlite3.Connection, chunk: int = 10_000) -> None:
+        conn.execute("DELETE FROM review_days")
+        conn.execute("DELETE FROM review_cells")
+        for partition, in conn.execute("SELECT DISTINCT batch_id FROM reviews").fetchall():
+            seq = 0
+            while True:
+                rows = conn.execute(
+                    "SELECT seq, body FROM reviews WHERE batch_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                    (partition, seq, chunk),
+                ).fetchall()
+                if not rows:
+                    break
+                _add_aggregates(conn, partition, [json.loads(body) for _, body in rows])
+                seq = rows[-1][0]
+
+    # --- batches / reviews ---
+
+    def partition(self, batch_id: str, create: bool = False) -> str:
+        """batch_id ที่มีอยู่ในตาราง batches (หรือสร้างใหม่ถ้า create=True) ไม่งั้นใช้ partition ตั้งต้น"""
+        if create:
+            with self.pool.transaction() as conn:
+                conn.execute("INSERT OR IGNORE INTO batches (batch_id) VALUES (?)", (batch_id,))
+            return batch_id
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT 1 FROM batches WHERE batch_id = ?", (batch_id,)).fetchone()
+        return batch_id if row is not None else DEFAULT_PARTITION
+
+    def batches(self) -> List[str]:
+        with self.pool.connection() as conn:
+            return [b for b, in conn.execute("SELECT batch_id FROM batches WHERE batch_id != '' ORDER BY batch_id")]
+
+    def _batch_lock(self, partition: str) -> threading.Lock:
+        with self._lock:
+            lock = self._batch_locks.get(partition)
+            if lock is None:
+                lock = self._batch_locks[partition] = threading.Lock()
+            return lock
+
+    def review_dataset(self, batch_id: str) -> ReviewDataset:
+        """ReviewDataset ของ batch ที่ตรงกับข้อมูลล่าสุดใน SQLite (ตามแถวใหม่แบบ incremental)"""
+        partition = self.partition(batch_id)
+        with self._batch_lock(partition):
+            with self.pool.connection() as conn:
+                row = conn.execute("SELECT version FROM batches WHERE batch_id = ?", (partition,)).fetchone()
+                version = row[0] if row is not None else 0
+                with self._lock:
+                    state = self._datasets.get(partition)
+                if state is None:
+                    # เรียงตาม index (batch_id, platform, review_date) รีวิวแต่ละ platform จึงเข้ามาเรียงวันที่อยู่แล้ว
+                    rows = conn.execute(
+                        "SELECT seq, body FROM reviews WHERE batch_id = ? ORDER BY platform, review_date, review_id",
+                        (partition,),
+                    ).fetchall()
+                    reviews = [json.loads(body) for _, body in rows]
+                    state = _BatchState(
+                        ReviewDataset(reviews), version,
+                        max((seq for seq, _ in rows), default=0), sum(len(body) for _, body in rows) * 4,
+                    )
+                    state.dataset.start_search_index()
+                elif state.version != version:
+                    rows = conn.execute(
+                        "SELECT seq, body FROM reviews WHERE seq > ? AND batch_id = ? ORDER BY seq",
+                        (state.seq, partition),
+                    ).fetchall()
+                    if rows:
+                        state.dataset.add_reviews([json.loads(body) for _, body in rows])
+                        state.seq = rows[-1][0]
+                        state.size += sum(len(body) for _, body in rows) * 4
+                    state.version = version
+                    self.syncs += 1
+            with self._lock:
+                self._datasets[partition] = state
+                self._datasets.move_to_end(partition)
+                self._evict()
+            return state.dataset
+
+    def _evict(self) -> None:
+        if self.memory_budget is None:
+            return
+        while len(self._datasets) > 1 and sum(s.size for s in self._datasets.values()) > self.memory_budget:
+            self._datasets.popitem(last=False)
+            self.evictions += 1
+
+    def batch_version(self, batch_id: str) -> int:
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT version FROM batches WHERE batch_id = ?", (self.partition(batch_id),)).fetchone()
+        return row[0] if row is not None else 0
+
+    @contextmanager
+    def aggregates(self, batch_id: str) -> Iterator[SQLiteAggregates]:
+        """cube ของ batch ใน read transaction เดียว (WAL: เห็นข้อมูลชุดเดียวกันตลอด block ไม่บล็อกการเขียน)"""
+        partition = self.partition(batch_id)
+        with self.pool.connection() as conn:
+            conn.execute("BEGIN")
+            try:
+                row = conn.execute("SELECT version FROM batches WHERE batch_id = ?", (partition,)).fetchone()
+                yield SQLiteAggregates(conn, partition, row[0] if row is not None else 0)
+            finally:
+                conn.rollback()
+
+    def insert_reviews(self, partition: str, reviews: Iterable[dict]) -> Tuple[List[dict], int]:
+        """เพิ่มรีวิวลง SQLite (review_id ที่ซ้ำถูกข้าม) พร้อมอัปเดต cube คืน (รีวิวที่เพิ่มจริง, version ของ batch)"""
+        inserted: List[dict] = []
+        version = 0
+        with self.pool.transaction() as conn:
+            # INSERT ทีละแถวเพื่อรู้ว่าแถวไหนถูก OR IGNORE ข้าม (rowcount = 0)
+            for r in reviews:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO reviews (batch_id, review_id, platform, review_date, body) VALUES (?, ?, ?, ?, ?)",
+                    (partition, r["review_id"], str(r["source_platform"]).lower(), str(r["review_date"])[:10],
+                     json.dumps(r, ensure_ascii=False)),
+                )
+                if cursor.rowcount == 1:
+                    inserted.append(r)
+            if inserted:
+                _add_aggregates(conn, partition, inserted)
+                version = conn.execute(
+                    "INSERT INTO batches (batch_id, version) VALUES (?, 1) "
+                    "ON CONFLICT (batch_id) DO UPDATE SET version = version + 1 RETURNING version",
+                    (partition,),
+                ).fetchone()[0]
+        return inserted, version
+
+    def review_sink(self, batch_id: str, create: bool = False) -> "ReviewSink":
+        partition = self.partition(batch_id, create=create)
+        return ReviewSink(self, partition, self.review_dataset(partition))
+
+    # --- QC ---
+
+    def session_store(self, session_id: int) -> Optional[SQLiteQCStore]:
+        return self.qc if self.qc.has_session(session_id) else None
+
+    def item_store(self, qc_item_id: int) -> Optional[SQLiteQCStore]:
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT 1 FROM qc_items WHERE qc_item_id = ?", (qc_item_id,)).fetchone()
+        return self.qc if row is not None else None
+
+    def create_session(self, batch_id: str, items: List[dict]) -> int:
+        return self.qc.add_session(batch_id, items)
+
+    # --- seed / stats ---
+
+    def is_empty(self) -> bool:
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT 1 FROM batches LIMIT 1").fetchone() is None and \
+                conn.execute("SELECT 1 FROM qc_sessions LIMIT 1").fetchone() is None
+
+    def seed(self, load_partitions: Callable[[], Iterable[Tuple[str, List[dict], List[dict]]]]) -> bool:
+        """นำเข้าข้อมูลจากไฟล์ถ้าฐานข้อมูลยังว่าง (worker แรกที่ได้ write lock เป็นคนนำเข้า) คืน True ถ้านำเข้า
+
+        load_partitions คืน (partition, reviews, qc_items) ของแต่ละ partition ที่ validate แล้ว
+        ทีละ partition (โหลด partition ถัดไปหลังเขียน partition ก่อนหน้าเสร็จ ไม่ถือทุก batch ไว้พร้อมกัน)
+        """
+        if not self.is_empty():
+            return False
+        with self.pool.transaction() as conn:
+            if conn.execute("SELECT 1 FROM batches LIMIT 1").fetchone() is not None:
+                return False
+            for partition, reviews, qc_items in load_partitions():
+                conn.execute("INSERT OR IGNORE INTO batches (batch_id, version) VALUES (?, 1)", (partition,))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO reviews (batch_id, review_id, platform, review_date, body) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(partition, r["review_id"], str(r["source_platform"]).lower(), str(r["review_date"])[:10],
+                      json.dumps(dict(r), ensure_ascii=False)) for r in reviews],
+                )
+                _add_aggregates(conn, partition, reviews)
+                by_session: Dict[int, List[dict]] = {}
+                for item in qc_items:
+                    by_session.setdefault(item.get("session_id", DEFAULT_SESSION_ID), []).append(dict(item))
+                for session_id, items in by_session.items():
+                    self.qc._insert(conn, items[0].get("batch_id", DEFAULT_BATCH_NAME), session_id, items)
+        return True
+
+    def forget(self) -> None:
+        """ทิ้ง dataset ที่โหลดไว้ใน worker นี้ (โหลดใหม่จาก SQLite เมื่อถูกใช้)"""
+        with self._lock:
+            self._datasets.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "memory_budget": self.memory_budget,
+                "estimated_bytes": sum(s.size for s in self._datasets.values()),
+                "evictions": self.evictions,
+                "loaded": list(self._datasets),
+                "batches": self.batches(),
+            }
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+class ReviewSink:
+    """ปลายทางของ Ingestor สำหรับ SQLite: เขียนลงฐานข้อมูลก่อน แล้วค่อยตาม dataset ของ worker นี้
+
+    review_id ที่ worker อื่นเพิ่งเพิ่มไปพร้อมกันจะถูก INSERT OR IGNORE ข้ามไป
+    dataset จึงมีเฉพาะแถวที่อยู่ใน SQLite จริง
+    """
+
+    def __init__(self, backend: SQLiteBackend, partition: str, dataset: ReviewDataset):
+        self.backend = backend
+        self.partition = partition
+        self.dataset = dataset
+        self._version = backend.batch_version(partition)
+
+    @property
+    def review_ids(self):
+        return self.dataset.review_ids
+
+    @property
+    def version(self) -> int:
+        """version ของ batch ใน SQLite หลังการเพิ่มครั้งล่าสุด (ชุดเดียวกับ meta.version ของ metrics)"""
+        return self._version
+
+    def __len__(self) -> int:
+        return len(self.dataset)
+
+    def add_reviews(
+        self, reviews: List[dict], before_insert: Optional[Callable[[List[dict]], None]] = None
+    ) -> List[dict]:
+        """เขียนลง SQLite แล้วคืนรีวิวที่เพิ่มจริง (before_insert ถูกเรียกหลังเขียน เพราะไม่รู้แถวที่ซ้ำก่อน INSERT)"""
+        inserted, version = self.backend.insert_reviews(self.partition, reviews)
+        if inserted:
+            self._version = version
+        if inserted and before_insert is not None:
+            before_insert(inserted)
+        self.dataset = self.backend.review_dataset(self.partition)
+        return inserted
@@ -0,0 +1,181 @@
+"""
+In-memory store สำหรับไฟล์ JSON ใน mock_data
+
+แต่ละไฟล์จะถูก parse แค่ครั้งเดียวแล้วเก็บไว้ใน memory ของ process
+และจะโหลดใหม่ก็ต่อเมื่อ mtime/size ของไฟล์เปลี่ยน หรือสั่ง reload() ตรงๆ
+"""
+import json
+import os
+import tempfile
+import threading
+from itertools import count
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+_version_counter = count(1)
+
+# umask ของ process (อ่านได้ทางเดียวคือ set แล้ว set กลับ จึงอ่านครั้งเดียวตอน import ก่อนมี thread อื่น)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+# mode ของไฟล์ใหม่แบบเดียวกับ open() ปกติ (mkstemp สร้างเป็น 0600 เสมอ)
+_NEW_FILE_MODE = 0o666 & ~_UMASK
+
+
+def next_version() -> int:
+    """เลข version ที่ไม่ซ้ำกันทั้ง process ใช้ติดให้ข้อมูลทุกครั้งที่สร้าง/แก้ไข (เช่นเป็น key ของ cache)"""
+    return next(_version_counter)
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+    """คืนค่า (mtime_ns, size) ของไฟล์ หรือ None ถ้าไม่มีไฟล์"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class MockDataStore:
+    """Cache ของไฟล์ JSON ที่ parse แล้ว แยกตามชื่อไฟล์ (path สัมพัทธ์กับ data_dir)"""
+
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+        self._entries: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+        self._builders: Dict[str, Callable[[Any], Any]] = {}
+        self._readers: Dict[str, Callable[[str], Any]] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def register(
+        self,
+        filename: str,
+        builder: Callable[[Any], Any],
+        reader: Optional[Callable[[str], Any]] = None,
+    ) -> None:
+        """กำหนดฟังก์ชันแปลง JSON ที่ parse แล้วเป็น object (เช่น dataset + index) ตอนโหลดไฟล์
+
+        reader ใช้แทน json.load สำหรับไฟล์ที่ไม่ใช่ JSON (รับ path คืนข้อมูลดิบ)
+        """
+        with self._lock:
+            self._builders[filename] = builder
+            if reader is not None:
+                self._readers[filename] = reader
+            self._entries.pop(filename, None)
+
+    def is_fresh(self, filename: str, source: str) -> bool:
+        """ไฟล์ที่ generate มา (เช่น snapshot) มีอยู่และไม่เก่ากว่าไฟล์ต้นทาง"""
+        sig = _file_signature(self.path(filename))
+        if sig is None:
+            return False
+        source_sig = _file_signature(self.path(source))
+        return source_sig is None or sig[0] >= source_sig[0]
+
+    def path(self, filename: str) -> str:
+        return os.path.join(self.data_dir, filename)
+
+    def get(self, filename: str) -> Any:
+        """คืนข้อมูลของไฟล์จาก memory, โหลดใหม่ถ้าไฟล์บน disk เปลี่ยน"""
+        path = self.path(filename)
+        sig = _file_signature(path)
+        if sig is None:
+            with self._lock:
+                self._entries.pop(filename, None)
+            return None
+
+        entry = self._entries.get(filename)
+        if entry is not None and entry[0] == sig:
+            self.hits += 1
+            return entry[1]
+
+        with self._lock:
+            # อาจมี thread อื่นโหลดไปแล้วระหว่างรอ lock
+            entry = self._entries.get(filename)
+            if entry is not None and entry[0] == sig:
+                self.hits += 1
+                return entry[1]
+            if filename in self._versions:
+                self.reloads += 1
+            else:
+                self.misses += 1
+            return self._load(filename, path, sig)
+
+    def peek(self, filename: str) -> Any:
+        """คืนข้อมูลที่โหลดไว้แล้วใน memory (ไม่เช็คไฟล์และไม่โหลดใหม่)"""
+        entry = self._entries.get(filename)
+        return entry[1] if entry is not None else None
+
+    def loaded(self, basename: str) -> List[str]:
+        """ชื่อไฟล์ที่โหลดอยู่ใน memory ซึ่งมีชื่อไฟล์ (ไม่รวมโฟลเดอร์) ตรงกับ basename"""
+        return [name for name in list(self._entries) if os.path.basename(name) == basename]
+
+    def evict(self, filename: str) -> None:
+        """ปลดข้อมูลของไฟล์ออกจาก memory (ถูกโหลดใหม่จาก disk เมื่อ get ครั้งถัดไป)"""
+        with self._lock:
+            self._entries.pop(filename, None)
+
+    def save(self, filename: str, payload: Any) -> None:
+        """เขียน payload เป็น JSON แบบ atomic (temp file + rename)
+
+        ข้อมูลใน memory ถือว่าตรงกับไฟล์ที่เพิ่งเขียนแล้ว จึงอัปเดตแค่ signature ไม่ต้อง parse ใหม่
+        """
+        path = self.path(filename)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                mode = os.stat(path).st_mode & 0o777 if os.path.exists(path) else _NEW_FILE_MODE
+                os.chmod(tmp_path, mode)
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(payload, f, ensure_ascii=False, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            entry = self._entries.get(filename)
+            if entry is not None:
+                self._entries[filename] = (_file_signature(path), entry[1])
+
+    def reload(self, filename: Optional[str] = None) -> None:
+        """บังคับโหลดไฟล์ใหม่ (ทุกไฟล์ที่เคยโหลด ถ้าไม่ระบุชื่อ)"""
+        with self._lock:
+            names = [filename] if filename else list(self._entries)
+            for name in names:
+                self._entries.pop(name, None)
+                path = self.path(name)
+                sig = _file_signature(path)
+                if sig is None:
+                    continue
+                self.reloads += 1
+                self._load(name, path, sig)
+
+    def version(self, filename: str) -> int:
+        """เลขเวอร์ชันของข้อมูล เพิ่มขึ้นทุกครั้งที่ไฟล์ถูกโหลดใหม่"""
+        return self._versions.get(filename, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads,
+            "files": dict(self._versions),
+        }
+
+    def _load(self, filename: str, path: str, sig: Tuple[int, int]) -> Any:
+        reader = self._readers.get(filename)
+        if reader is not None:
+            data = reader(path)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        builder = self._builders.get(filename)
+        if builder is not None:
+            data = builder(data)
+        self._entries[filename] = (sig, data)
+        self._versions[filename] = self._versions.get(filename, 0) + 1
+        return data
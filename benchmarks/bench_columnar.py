@@ -0,0 +1,101 @@
+"""
+Benchmark บนผลทำนาย 1M+ แถว: metrics (dict path เดิม vs aggregate cube)
+และการเลือก QC session (heap แบบ streaming vs columnar np.argpartition)
+
+    python benchmarks/bench_columnar.py --reviews 500000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.aggregates import AggregateIndex  # noqa: E402
+from app.columnar import ColumnarPredictions, np  # noqa: E402
+from app.qc_session import iter_predictions, select_buckets  # noqa: E402
+
+PLATFORMS = ["youtube", "facebook", "instagram", "tiktok", "google", "shopee"]
+ASPECTS = ["taste", "price", "service", "atmosphere", "accessibility"]
+SENTIMENTS = ["positive", "negative", "neutral"]
+
+
+def make_reviews(n, seed=0):
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    reviews = []
+    for i in range(n):
+        results = {
+            aspect: {"sentiment": rng.choice(SENTIMENTS), "confidence": round(rng.uniform(0.3, 1.0), 2)}
+            for aspect in rng.sample(ASPECTS, rng.randint(1, 4))
+        }
+        reviews.append({
+            "review_id": i,
+            "source_platform": rng.choice(PLATFORMS),
+            "review_date": (start + timedelta(days=rng.randrange(365))).isoformat(),
+            "content": "",
+            "results": results,
+        })
+    return reviews
+
+
+def dict_path(reviews, platforms, from_date, to_date):
+    """อัลกอริทึมเดิมของ get_batch_metrics (วนทุกรีวิวทุก aspect)"""
+    overall = {"positive": 0, "negative": 0, "neutral": 0}
+    aspects = defaultdict(lambda: {"positive": 0, "negative": 0, "neutral": 0})
+    for r in reviews:
+        if r["source_platform"] not in platforms or not (from_date <= r["review_date"] <= to_date):
+            continue
+        for aspect, detail in r["results"].items():
+            sentiment = detail["sentiment"]
+            overall[sentiment] += 1
+            aspects[aspect.upper()][sentiment] += 1
+    return overall, dict(aspects)
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reviews", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    if np is None:
+        sys.exit("numpy is required for this benchmark")
+
+    reviews = make_reviews(args.reviews)
+    platforms, from_date, to_date = {"shopee", "google"}, "2024-03-01", "2024-08-31"
+
+    build_cube_ms, cube = timed(lambda: AggregateIndex(reviews), 1)
+    build_col_ms, col = timed(lambda: ColumnarPredictions(reviews), 1)
+    print(f"reviews={len(reviews):,} aspect_rows={len(col):,}")
+    print(f"build  cube={build_cube_ms:9.1f} ms  columnar={build_col_ms:9.1f} ms")
+
+    dict_ms, expected = timed(lambda: dict_path(reviews, platforms, from_date, to_date), args.repeat)
+    cube_ms, cube_res = timed(lambda: cube.sentiment_counts(platforms, from_date, to_date), args.repeat)
+    assert cube_res == expected
+    print(f"metrics dict={dict_ms:9.2f} ms  cube={cube_ms:9.2f} ms")
+
+    k, m = 1000, 100
+    heap_ms, (heap_a, _) = timed(lambda: select_buckets(iter_predictions(reviews), k, m, random.Random(0)), args.repeat)
+    part_ms, (rows_a, _) = timed(lambda: col.select_buckets(k, m, random.Random(0)), args.repeat)
+    assert [p[0] for p in heap_a] == [col.prediction(reviews, row)[0] for row in rows_a]
+    print(f"qc     heap={heap_ms:9.2f} ms  argpartition={part_ms:9.2f} ms")
+
+    # ingest ทีละ 1000 รีวิว: ต่อท้าย column แบบขยาย capacity ไม่ copy ทั้ง array ทุก batch
+    extend_ms, _ = timed(lambda: [col.extend(reviews[i:i + 1000]) for i in range(0, 100_000, 1000)], 1)
+    print(f"extend 100 batches x 1000 reviews={extend_ms:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
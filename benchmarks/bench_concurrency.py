@@ -0,0 +1,139 @@
+"""
+Load test: latency ของ request เบา (static / HTML / GET QC session) ระหว่างที่มี metrics หนัก ๆ วิ่งพร้อมกัน
+
+client หลาย process ยิง request ผสมไปยัง uvicorn worker เดียว (file backend):
+    metrics      ช่วงวันที่สุ่ม (aggregation จริง ไม่โดน cache)
+    metrics_hot  ทุก client ขอช่วงวันที่เดียวกัน (เปลี่ยนทุก 0.5 วินาที) request ที่ซ้อนกันถูกรวมเป็นงานเดียว
+    qc_session   GET QC session
+    static       ไฟล์ใน /static และหน้า HTML
+รายงาน p50 / p99 แยกตามชนิด request โดยรันเทียบจำนวน thread ของ executor (REVIEW_RADAR_EXECUTOR_THREADS)
+
+    python benchmarks/bench_concurrency.py --reviews 200000 --clients 16 --seconds 10 --threads 1 4
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_columnar import make_reviews  # noqa: E402
+from benchmarks.bench_workers import free_port, percentile, request, wait_ready  # noqa: E402
+
+STATIC_PATHS = ["/", "/qc"] + sorted(
+    "/static/" + os.path.relpath(os.path.join(d, name), os.path.join(ROOT, "static")).replace(os.sep, "/")
+    for d, _, names in os.walk(os.path.join(ROOT, "static")) for name in names
+)
+
+
+def client(args):
+    port, session_id, seconds, seed = args
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    latencies = {}
+    errors = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        roll = rng.random()
+        if roll < 0.35:
+            kind = "metrics"
+            a = start + timedelta(days=rng.randrange(300))
+            b = a + timedelta(days=rng.randrange(1, 60))
+            path = f"/api/batches/bench/metrics?from_date={a}&to_date={b}"
+        elif roll < 0.5:
+            kind = "metrics_hot"
+            a = start + timedelta(days=int(time.time() * 2) % 300)
+            path = f"/api/batches/bench/metrics?from_date={a}&to_date={a + timedelta(days=90)}"
+        elif roll < 0.7:
+            kind, path = "qc_session", f"/api/qc-sessions/{session_id}"
+        else:
+            kind, path = "static", rng.choice(STATIC_PATHS)
+        t0 = time.perf_counter()
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        status, _ = request(conn, "GET", path)
+        conn.close()
+        latencies.setdefault(kind, []).append(time.perf_counter() - t0)
+        if status >= 400:
+            errors += 1
+    return latencies, errors
+
+
+def run(threads, data_dir, args):
+    port = free_port()
+    env = dict(os.environ, PYTHONPATH=ROOT, REVIEW_RADAR_DATA_DIR=data_dir, REVIEW_RADAR_EXECUTOR_THREADS=str(threads))
+    env.pop("REVIEW_RADAR_BACKEND", None)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    try:
+        wait_ready(port)
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+        _, data = request(conn, "POST", "/api/batches/bench/qc-sessions",
+                          {"low_confidence_count": args.items, "random_audit_count": 0, "seed": 1})
+        session_id = json.loads(data)["data"]["session_id"]
+        request(conn, "GET", "/api/batches/bench/metrics")
+        conn.close()
+
+        jobs = [(port, session_id, args.seconds, seed) for seed in range(args.clients)]
+        t0 = time.perf_counter()
+        with multiprocessing.Pool(args.clients) as pool:
+            results = pool.map(client, jobs)
+        elapsed = time.perf_counter() - t0
+
+        by_kind = {}
+        for latencies, _ in results:
+            for kind, values in latencies.items():
+                by_kind.setdefault(kind, []).extend(values)
+        total = sum(len(v) for v in by_kind.values())
+        return {
+            "executor_threads": threads,
+            "requests": total,
+            "rps": round(total / elapsed, 1),
+            "errors": sum(r[1] for r in results),
+            "latency_ms": {
+                kind: {
+                    "count": len(values),
+                    "p50": round(percentile(values, 0.50) * 1000, 2),
+                    "p99": round(percentile(values, 0.99) * 1000, 2),
+                }
+                for kind, values in sorted(by_kind.items())
+            },
+        }
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reviews", type=int, default=200_000)
+    parser.add_argument("--items", type=int, default=500, help="จำนวน item ใน QC session ที่ใช้ทดสอบ")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4], help="จำนวน thread ของ executor ที่เทียบ")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(data_dir, "reviews.json"), "w", encoding="utf-8") as f:
+            json.dump(make_reviews(args.reviews, seed=1), f, ensure_ascii=False)
+        with open(os.path.join(data_dir, "qc_items.json"), "w", encoding="utf-8") as f:
+            json.dump([], f)
+        for threads in args.threads:
+            print(json.dumps(run(threads, data_dir, args)))
+    finally:
+        shutil.rmtree(data_dir)
+
+
+if __name__ == "__main__":
+    main()
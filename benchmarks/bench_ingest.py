@@ -0,0 +1,68 @@
+"""
+Benchmark: POST /api/batches/{id}/reviews/ingest (NDJSON stream) ต่อจาก dataset ตั้งต้น
+วัด throughput ของการ ingest และเวลาสร้าง QC session หลัง ingest (index อัปเดตแบบ incremental)
+
+    python benchmarks/bench_ingest.py --base 100000 --rows 100000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import app.main as app_main  # noqa: E402
+from benchmarks.bench_columnar import make_reviews  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base", type=int, default=100_000, help="จำนวนรีวิวตั้งต้นใน reviews.json")
+    parser.add_argument("--rows", type=int, default=100_000, help="จำนวนรีวิวที่ ingest")
+    parser.add_argument("--chunk", type=int, default=1 << 16, help="ขนาด chunk ของ body (bytes)")
+    args = parser.parse_args()
+
+    reviews = make_reviews(args.base + args.rows, seed=1)
+    body = b"".join(json.dumps(r, ensure_ascii=False).encode("utf-8") + b"\n" for r in reviews[args.base:])
+
+    def chunks():
+        for i in range(0, len(body), args.chunk):
+            yield body[i:i + args.chunk]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "reviews.json"), "w", encoding="utf-8") as f:
+            json.dump(reviews[:args.base], f, ensure_ascii=False)
+        with open(os.path.join(tmp, "qc_items.json"), "w", encoding="utf-8") as f:
+            json.dump([], f)
+        app_main.data_store.data_dir = tmp
+        client = TestClient(app_main.app)
+        client.get("/api/batches/bench/metrics")  # โหลดข้อมูลก่อนเริ่มจับเวลา
+
+        t0 = time.perf_counter()
+        res = client.post("/api/batches/bench/reviews/ingest", content=chunks())
+        ingest_seconds = time.perf_counter() - t0
+        report = res.json()
+        assert res.status_code == 200 and report["accepted"] == args.rows, report
+
+        t0 = time.perf_counter()
+        res = client.post("/api/batches/bench/qc-sessions", json={})
+        session_ms = (time.perf_counter() - t0) * 1000
+        assert res.status_code == 201
+
+    result = {
+        "base_reviews": args.base,
+        "ingested_rows": args.rows,
+        "body_mb": round(len(body) / 1e6, 1),
+        "ingest_seconds": round(ingest_seconds, 3),
+        "rows_per_sec": round(args.rows / ingest_seconds, 1),
+        "qc_session_ms_after_ingest": round(session_ms, 1),
+    }
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
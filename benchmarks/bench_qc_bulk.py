@@ -0,0 +1,76 @@
+"""
+Benchmark: PATCH /api/qc-sessions/{id}/items ที่ 10k items ต่อ request
+เทียบกับ PATCH /api/qc-items/{id} ทีละ item
+
+    python benchmarks/bench_qc_bulk.py --items 10000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import app.main as app_main  # noqa: E402
+
+
+def make_qc_items(n):
+    return [
+        {
+            "qc_item_id": i,
+            "review_id": 1000 + i,
+            "review_content": "รสชาติดี แต่ราคาแรงไปหน่อย",
+            "aspect": "price",
+            "predicted_sentiment": "neutral",
+            "confidence": 0.5,
+            "sentiment_gap": 0.1,
+            "status": "pending",
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--single", type=int, default=1_000, help="จำนวน PATCH ทีละ item ที่ใช้วัด")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "qc_items.json"), "w", encoding="utf-8") as f:
+            json.dump(make_qc_items(args.items), f, ensure_ascii=False)
+        app_main.data_store.data_dir = tmp
+        client = TestClient(app_main.app)
+        client.get("/api/qc-sessions/55")  # โหลดข้อมูลก่อนเริ่มจับเวลา
+
+        t0 = time.perf_counter()
+        for i in range(1, args.single + 1):
+            client.patch(f"/api/qc-items/{i}", json={"confirmed": 1})
+        single = args.single / (time.perf_counter() - t0)
+
+        payload = {"items": [{"qc_item_id": i, "correct_sentiment": "negative"} for i in range(1, args.items + 1)]}
+        t0 = time.perf_counter()
+        res = client.patch("/api/qc-sessions/55/items", json=payload)
+        bulk_seconds = time.perf_counter() - t0
+        assert res.status_code == 200 and res.json()["updated_count"] == args.items
+
+        t0 = time.perf_counter()
+        app_main.qc_writer.flush()
+        flush_seconds = time.perf_counter() - t0
+
+    result = {
+        "single_items_per_sec": round(single, 1),
+        "bulk_items": args.items,
+        "bulk_request_ms": round(bulk_seconds * 1000, 1),
+        "bulk_items_per_sec": round(args.items / bulk_seconds, 1),
+        "flush_ms": round(flush_seconds * 1000, 1),
+    }
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: requests/sec ของ GET /reviews และ GET /qc-sessions ระหว่าง
+path เดิม (คืน dict ให้ FastAPI validate + serialise ผ่าน response_model)
+กับ fast path (validate ตอนโหลด + ต่อ JSON fragment ที่ encode ไว้)
+
+    python benchmarks/bench_serialization.py --reviews 50000 --limit 500
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import app.main as app_main  # noqa: E402
+from benchmarks.bench_columnar import make_reviews  # noqa: E402
+from app.sampling import sample_view  # noqa: E402
+
+
+def make_qc_items(reviews, n):
+    items = []
+    for i, review in enumerate(reviews[:n]):
+        aspect, detail = next(iter(review["results"].items()))
+        items.append({
+            "qc_item_id": i + 1,
+            "review_id": review["review_id"],
+            "review_content": review["content"],
+            "aspect": aspect,
+            "predicted_sentiment": detail["sentiment"],
+            "confidence": detail["confidence"],
+            "sentiment_gap": 0.1,
+            "status": "pending",
+        })
+    return items
+
+
+# path เดิม: คืน dict แล้วให้ FastAPI validate ผ่าน response_model
+@app_main.app.get("/bench/pydantic/reviews", response_model=app_main.ReviewsResponse)
+async def pydantic_reviews(limit: int = 10, sort: str = "date"):
+    filtered = app_main.get_review_dataset("bench").view()
+    if sort == "random":
+        data = sample_view(filtered, limit)
+    else:
+        data = [r for _, r in zip(range(limit), filtered)]
+    return {"meta": {"total_found": len(filtered), "sort": sort, "batch_id": "bench"}, "data": data}
+
+
+@app_main.app.get("/bench/pydantic/qc-sessions/{session_id}", response_model=app_main.QCItemsResponse)
+async def pydantic_qc_items(session_id: int):
+    qc_store = app_main.get_session_store(session_id)
+    return {
+        "meta": {"session_id": session_id, "batch_name": "bench", "progress": qc_store.progress(session_id)},
+        "items": qc_store.session_items(session_id),
+    }
+
+
+def rps(client, url, seconds):
+    client.get(url)  # warm up (โหลดข้อมูล + encode fragment)
+    n = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        assert client.get(url).status_code == 200
+        n += 1
+    return n / (time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reviews", type=int, default=50_000)
+    parser.add_argument("--qc-items", type=int, default=2_000)
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    reviews = make_reviews(args.reviews)
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "reviews.json"), "w", encoding="utf-8") as f:
+            json.dump(reviews, f, ensure_ascii=False)
+        with open(os.path.join(tmp, "qc_items.json"), "w", encoding="utf-8") as f:
+            json.dump(make_qc_items(reviews, args.qc_items), f, ensure_ascii=False)
+        app_main.data_store.data_dir = tmp
+        app_main.data_store.reload()
+        app_main.response_cache.max_entries = 0  # วัดเฉพาะการ serialise ไม่ให้ response cache ช่วย
+
+        client = TestClient(app_main.app)
+        cases = [
+            (f"reviews sort=date limit={args.limit}",
+             f"/bench/pydantic/reviews?limit={args.limit}", f"/api/batches/bench/reviews?sort=date&limit={args.limit}"),
+            (f"reviews sort=random limit={args.limit}",
+             f"/bench/pydantic/reviews?sort=random&limit={args.limit}",
+             f"/api/batches/bench/reviews?sort=random&limit={args.limit}"),
+            (f"qc-session items={args.qc_items}",
+             "/bench/pydantic/qc-sessions/55", "/api/qc-sessions/55"),
+        ]
+        results = {}
+        for name, before_url, after_url in cases:
+            before = rps(client, before_url, args.seconds)
+            after = rps(client, after_url, args.seconds)
+            results[name] = {"before_rps": round(before, 1), "after_rps": round(after, 1),
+                             "speedup": round(after / before, 2)}
+            print(f"{name:32s} before={before:8.1f} req/s  after={after:8.1f} req/s  x{after / before:.2f}")
+        print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
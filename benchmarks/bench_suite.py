@@ -0,0 +1,312 @@
+"""
+Benchmark suite: ยิงทุก endpoint ของ app.main แบบ in-process (TestClient) บนข้อมูลจาก generate_data.py
+แล้วรายงาน throughput / latency percentile / peak RSS เป็น JSON สำหรับเทียบผลข้าม commit
+
+    python benchmarks/bench_suite.py --reviews 100000 --out bench.json
+    python benchmarks/bench_suite.py --reviews 100000 --compare bench.json     # เทียบกับผลรอบก่อน
+    python benchmarks/bench_suite.py --data /tmp/rr_1m --snapshot              # ใช้ชุดข้อมูลที่สร้างไว้แล้ว
+
+ไฟล์รีวิวของ --data ถูก symlink เข้าโฟลเดอร์ชั่วคราว (qc_items.json ถูก copy) การ PATCH / ingest
+ระหว่าง benchmark จึงไม่แก้ข้อมูลต้นฉบับ ชุดข้อมูลถูกสร้างใน subprocess ไม่ให้นับรวมกับ RSS ของ server
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.generate_data import PLATFORMS, iter_reviews  # noqa: E402
+
+START = date(2024, 1, 1)
+# คำค้นที่มีอยู่ในวลีของ generate_data.py (ทั้งคำที่พบบ่อยและไม่บ่อย)
+SEARCH_TERMS = ["ราคา", "อร่อย", "พนักงาน", "ที่จอดรถ", "คุ้ม ราคา", "delivery", "worth it", "แพง"]
+
+
+def rss_mb() -> float:
+    # ru_maxrss เป็น KB บน Linux และ byte บน macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def percentile(values: List[float], p: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "rps": round(len(values) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+        "p90_ms": round(percentile(values, 0.90) * 1000, 3),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if values else 0.0,
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return out.stdout.strip() + ("-dirty" if dirty else "") if out.returncode == 0 else None
+    except OSError:
+        return None
+
+
+def prepare_data(args, work_dir: str) -> Dict[str, object]:
+    """สร้าง/เตรียมชุดข้อมูลใน work_dir (ใช้เป็น REVIEW_RADAR_DATA_DIR)"""
+    if args.data:
+        for name in ("reviews.json", "reviews.snap"):
+            source = os.path.join(os.path.abspath(args.data), name)
+            if os.path.exists(source):
+                os.symlink(source, os.path.join(work_dir, name))
+        shutil.copy(os.path.join(args.data, "qc_items.json"), work_dir)
+        summary: Dict[str, object] = {"source": os.path.abspath(args.data)}
+    else:
+        out = subprocess.run(
+            [sys.executable, os.path.join(ROOT, "benchmarks", "generate_data.py"), "--reviews", str(args.reviews),
+             "--qc-items", str(args.qc_items), "--seed", str(args.seed), "--out", work_dir],
+            check=True, capture_output=True, text=True,
+        )
+        summary = json.loads(out.stdout)
+    if args.snapshot and not os.path.exists(os.path.join(work_dir, "reviews.snap")):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "app.snapshot", os.path.join(work_dir, "reviews.json")],
+                       cwd=ROOT, check=True, capture_output=True)
+        summary["snapshot_seconds"] = round(time.perf_counter() - t0, 2)
+    return summary
+
+
+class Suite:
+    def __init__(self, client, args):
+        self.client = client
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.results: Dict[str, Dict[str, float]] = {}
+        self.session_id: Optional[int] = None
+        self.item_ids: List[int] = []
+
+    def call(self, method: str, path: str, **kwargs):
+        response = self.client.request(method, path, **kwargs)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{method} {path} -> {response.status_code}: {response.text[:200]}")
+        return response
+
+    def measure(self, name: str, fn: Callable[[int], None], iterations: Optional[int] = None) -> None:
+        """เรียก fn(i) ซ้ำจนครบจำนวนครั้งหรือหมดเวลาต่อ scenario (อย่างน้อย 1 ครั้ง)"""
+        iterations = iterations or self.args.iterations
+        deadline = time.perf_counter() + self.args.max_seconds
+        latencies = []
+        started = time.perf_counter()
+        for i in range(iterations):
+            t0 = time.perf_counter()
+            fn(i)
+            latencies.append(time.perf_counter() - t0)
+            if time.perf_counter() > deadline:
+                break
+        self.results[name] = summarize(latencies, time.perf_counter() - started)
+
+    def date_range(self, max_days: int = 90):
+        a = START + timedelta(days=self.rng.randrange(365))
+        return a, a + timedelta(days=self.rng.randrange(1, max_days))
+
+    # --- scenarios (เรียงตามลำดับที่รัน: อ่านก่อน แล้วค่อยเขียน) ---
+
+    def pages(self, i: int) -> None:
+        self.call("GET", "/" if i % 2 == 0 else "/qc")
+
+    def metrics_cached(self, i: int) -> None:
+        self.call("GET", "/api/batches/bench/metrics")
+
+    def metrics_filtered(self, i: int) -> None:
+        # ช่วงวันที่ / platform สุ่มทุกครั้ง cache ไม่โดน ต้อง aggregate จริง
+        a, b = self.date_range(180)
+        platforms = ",".join(self.rng.sample(PLATFORMS, self.rng.randint(1, 3)))
+        self.call("GET", f"/api/batches/bench/metrics?platforms={platforms}&from_date={a}&to_date={b}")
+
+    def trends(self, i: int) -> None:
+        # ทั้งปี สลับ granularity / aspect / platform (cache ไม่โดนเพราะ key ไม่ซ้ำในรอบแรก)
+        granularity = ("day", "week", "month")[i % 3]
+        aspect = self.rng.choice(["", "taste", "price", "service"])
+        platforms = ",".join(self.rng.sample(PLATFORMS, self.rng.randint(1, 6)))
+        self.call("GET", f"/api/batches/bench/trends?granularity={granularity}&aspect={aspect}&platforms={platforms}")
+
+    def reviews_random(self, i: int) -> None:
+        self.call("GET", f"/api/batches/bench/reviews?sort=random&limit=20&seed={i}")
+
+    def reviews_filtered(self, i: int) -> None:
+        a, b = self.date_range()
+        platform = self.rng.choice(PLATFORMS)
+        self.call("GET", f"/api/batches/bench/reviews?sort=random&limit=20&platforms={platform}"
+                         f"&from_date={a}&to_date={b}&seed={i}")
+
+    def reviews_search(self, i: int) -> None:
+        # ครั้งแรกรวมเวลาสร้าง inverted index สลับ sort / filter aspect, sentiment, platform, วันที่
+        q = self.rng.choice(SEARCH_TERMS)
+        sort = ("relevance", "date", "random")[i % 3]
+        params = f"q={q}&sort={sort}&limit=20&seed={i}"
+        if i % 2:
+            a, b = self.date_range(180)
+            params += f"&aspect={self.rng.choice(['taste', 'price', 'service'])}&sentiment=negative"
+            params += f"&platforms={self.rng.choice(PLATFORMS)}&from_date={a}&to_date={b}"
+        self.call("GET", f"/api/batches/bench/reviews?{params}")
+
+    def reviews_ordered(self, i: int) -> None:
+        # ตามหน้า keyset 5 หน้าต่อครั้ง
+        cursor = ""
+        for _ in range(5):
+            body = self.call("GET", f"/api/batches/bench/reviews?sort=date&limit=50{cursor}").json()
+            next_cursor = body["meta"]["next_cursor"]
+            if not next_cursor:
+                break
+            cursor = f"&cursor={next_cursor}"
+
+    def export_ndjson(self, i: int) -> None:
+        a = START + timedelta(days=self.rng.randrange(358))
+        self.call("GET", f"/api/batches/bench/reviews.ndjson?from_date={a}&to_date={a + timedelta(days=7)}")
+
+    def qc_session_create(self, i: int) -> None:
+        body = self.call("POST", "/api/batches/bench/qc-sessions",
+                         json={"low_confidence_count": 40, "random_audit_count": 10, "seed": i}).json()
+        self.session_id = body["data"]["session_id"]
+
+    def qc_session_fetch(self, i: int) -> None:
+        body = self.call("GET", f"/api/qc-sessions/{self.session_id}").json()
+        if not self.item_ids:
+            self.item_ids = [item["qc_item_id"] for item in body["items"]]
+
+    def qc_item_patch(self, i: int) -> None:
+        qc_item_id = self.item_ids[i % len(self.item_ids)]
+        self.call("PATCH", f"/api/qc-items/{qc_item_id}", json={"confirmed": 1, "correct_sentiment": "neutral"})
+
+    def qc_session_fetch_after_patch(self, i: int) -> None:
+        # PATCH ทำให้ cache ของ session หมดอายุ วัดการ encode ใหม่
+        self.call("PATCH", f"/api/qc-items/{self.item_ids[i % len(self.item_ids)]}", json={"confirmed": 1})
+        self.call("GET", f"/api/qc-sessions/{self.session_id}")
+
+    def qc_bulk_patch(self, i: int) -> None:
+        items = [{"qc_item_id": qc_item_id, "confirmed": 1} for qc_item_id in self.item_ids]
+        self.call("PATCH", f"/api/qc-sessions/{self.session_id}/items", json={"items": items})
+
+    def store_stats(self, i: int) -> None:
+        self.call("GET", "/api/store/stats")
+        self.call("GET", "/api/batches")
+
+    def ingest(self, i: int) -> None:
+        first_id = 10_000_000_000 + i * self.args.ingest_rows
+        body = b"".join(
+            json.dumps(r, ensure_ascii=False).encode("utf-8") + b"\n"
+            for r in iter_reviews(self.args.ingest_rows, seed=i, first_id=first_id)
+        )
+        report = self.call("POST", "/api/batches/bench/reviews/ingest", content=body).json()
+        if report["accepted"] != self.args.ingest_rows:
+            raise RuntimeError(f"ingest accepted {report['accepted']} of {self.args.ingest_rows}")
+
+    def run(self) -> None:
+        self.measure("pages", self.pages)
+        self.measure("metrics_cached", self.metrics_cached)
+        self.measure("metrics_filtered", self.metrics_filtered)
+        self.measure("trends_year", self.trends)
+        self.measure("reviews_random", self.reviews_random)
+        self.measure("reviews_filtered", self.reviews_filtered)
+        self.measure("reviews_search", self.reviews_search)
+        self.measure("reviews_ordered_5_pages", self.reviews_ordered, max(1, self.args.iterations // 5))
+        self.measure("export_ndjson_week", self.export_ndjson, max(1, self.args.iterations // 10))
+        self.measure("qc_session_create", self.qc_session_create, max(1, self.args.iterations // 10))
+        self.measure("qc_session_fetch", self.qc_session_fetch)
+        self.measure("qc_item_patch", self.qc_item_patch)
+        self.measure("qc_session_fetch_after_patch", self.qc_session_fetch_after_patch)
+        self.measure("qc_bulk_patch", self.qc_bulk_patch, max(1, self.args.iterations // 10))
+        self.measure("store_stats", self.store_stats)
+        self.measure(f"ingest_{self.args.ingest_rows}_rows", self.ingest, 3)
+        self.measure("metrics_after_ingest", self.metrics_filtered)
+
+
+def compare(current: Dict, baseline: Dict) -> List[str]:
+    lines = [f"baseline {baseline['meta'].get('revision')} -> current {current['meta'].get('revision')}"]
+    for name, result in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if not before or not before["p50_ms"]:
+            lines.append(f"  {name:32s} p50 {result['p50_ms']:9.3f} ms   (new)")
+            continue
+        ratio = result["p50_ms"] / before["p50_ms"]
+        lines.append(f"  {name:32s} p50 {before['p50_ms']:9.3f} -> {result['p50_ms']:9.3f} ms  x{ratio:.2f}"
+                     f"   p99 {before['p99_ms']:9.3f} -> {result['p99_ms']:9.3f} ms")
+    lines.append(f"  peak_rss_mb {baseline['peak_rss_mb']} -> {current['peak_rss_mb']}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reviews", type=int, default=100_000)
+    parser.add_argument("--qc-items", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data", help="โฟลเดอร์ข้อมูลที่สร้างไว้แล้ว (ข้ามการ generate)")
+    parser.add_argument("--snapshot", action="store_true", help="สร้าง reviews.snap แล้วโหลดผ่าน mmap")
+    parser.add_argument("--iterations", type=int, default=200, help="จำนวนครั้งต่อ scenario")
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="เวลาสูงสุดต่อ scenario")
+    parser.add_argument("--ingest-rows", type=int, default=10_000)
+    parser.add_argument("--out", help="เขียนผลเป็น JSON ลงไฟล์ (ไม่ระบุ = stdout)")
+    parser.add_argument("--compare", help="ไฟล์ผลของรอบก่อนสำหรับเทียบ")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="review_radar_bench_")
+    try:
+        dataset = prepare_data(args, work_dir)
+        # data_dir ถูกอ่านตอน import app.main จึงต้องตั้งก่อน import
+        os.environ["REVIEW_RADAR_DATA_DIR"] = work_dir
+        rss_before = rss_mb()
+        from fastapi.testclient import TestClient
+        import app.main as app_main
+
+        with TestClient(app_main.app) as client:
+            t0 = time.perf_counter()
+            client.get("/api/batches/bench/metrics").raise_for_status()
+            load = {"seconds": round(time.perf_counter() - t0, 3), "rss_after_load_mb": rss_mb()}
+            suite = Suite(client, args)
+            suite.run()
+
+        result = {
+            "meta": {
+                "revision": git_revision(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "cpu_count": os.cpu_count(),
+                "backend": os.environ.get("REVIEW_RADAR_BACKEND", "file"),
+                "iterations": args.iterations,
+            },
+            "dataset": dataset,
+            "load": {**load, "rss_before_import_mb": rss_before},
+            "scenarios": suite.results,
+            "peak_rss_mb": rss_mb(),
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            print("\n".join(compare(result, json.load(f))), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Load test: uvicorn --workers 1 เทียบกับ --workers N บน SQLite backend (REVIEW_RADAR_BACKEND=sqlite)
+
+client หลาย process ยิง request ผสม (metrics ช่วงวันที่สุ่ม / GET QC session / PATCH QC item)
+แล้วตรวจว่า progress ที่อ่านได้จาก worker ใดก็ตามตรงกับจำนวน item ที่ถูก PATCH จริง
+
+    python benchmarks/bench_workers.py --reviews 50000 --workers 4 --clients 8 --seconds 10
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_columnar import make_reviews  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def request(conn, method, path, body=None):
+    headers = {"Content-Type": "application/json"} if body is not None else {}
+    conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+    response = conn.getresponse()
+    data = response.read()
+    return response.status, data
+
+
+def wait_ready(port, timeout=60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            status, _ = request(conn, "GET", "/api/batches")
+            conn.close()
+            if status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def client(args):
+    port, session_id, item_ids, seconds, seed = args
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    latencies, patched, errors = [], set(), 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        roll = rng.random()
+        if roll < 0.7:
+            a = start + timedelta(days=rng.randrange(300))
+            b = a + timedelta(days=rng.randrange(1, 60))
+            method, path, body = "GET", f"/api/batches/bench/metrics?from_date={a}&to_date={b}", None
+        elif roll < 0.9:
+            method, path, body = "GET", f"/api/qc-sessions/{session_id}", None
+        else:
+            qc_item_id = rng.choice(item_ids)
+            method, path, body = "PATCH", f"/api/qc-items/{qc_item_id}", {"confirmed": 1}
+        # เปิด connection ใหม่ทุก request: socket ที่ worker ของ uvicorn (--workers > 1) รับมาไม่ได้ตั้ง
+        # TCP_NODELAY ทำให้ keep-alive โดน delayed ACK ~40ms ต่อ request ซึ่งไม่เกี่ยวกับ backend
+        t0 = time.perf_counter()
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        status, _ = request(conn, method, path, body)
+        conn.close()
+        latencies.append(time.perf_counter() - t0)
+        if status >= 400:
+            errors += 1
+        elif method == "PATCH":
+            patched.add(qc_item_id)
+    return latencies, patched, errors
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+def run(workers, data_dir, args):
+    port = free_port()
+    db_path = os.path.join(data_dir, f"workers_{workers}.db")
+    env = dict(
+        os.environ,
+        PYTHONPATH=ROOT,
+        REVIEW_RADAR_BACKEND="sqlite",
+        REVIEW_RADAR_DATA_DIR=data_dir,
+        REVIEW_RADAR_SQLITE_PATH=db_path,
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    try:
+        wait_ready(port)
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+        status, data = request(conn, "POST", "/api/batches/bench/qc-sessions",
+                               {"low_confidence_count": args.items, "random_audit_count": 0, "seed": 1})
+        session_id = json.loads(data)["data"]["session_id"]
+        _, data = request(conn, "GET", f"/api/qc-sessions/{session_id}")
+        item_ids = [i["qc_item_id"] for i in json.loads(data)["items"]]
+        # ให้ทุก worker โหลด dataset ก่อนเริ่มจับเวลา
+        for _ in range(workers * 4):
+            request(conn, "GET", "/api/batches/bench/metrics")
+
+        jobs = [(port, session_id, item_ids, args.seconds, seed) for seed in range(args.clients)]
+        t0 = time.perf_counter()
+        with multiprocessing.Pool(args.clients) as pool:
+            results = pool.map(client, jobs)
+        elapsed = time.perf_counter() - t0
+
+        latencies = [lat for r in results for lat in r[0]]
+        patched = set().union(*(r[1] for r in results))
+        errors = sum(r[2] for r in results)
+        # อ่าน progress ซ้ำหลายครั้ง (แต่ละครั้งอาจได้ worker คนละตัว) ทุกครั้งต้องตรงกัน
+        seen = set()
+        for _ in range(workers * 4):
+            fresh = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            _, data = request(fresh, "GET", f"/api/qc-sessions/{session_id}")
+            seen.add(json.loads(data)["meta"]["progress"]["reviewed"])
+            fresh.close()
+        conn.close()
+        return {
+            "workers": workers,
+            "requests": len(latencies),
+            "rps": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            "errors": errors,
+            "patched_items": len(patched),
+            "reviewed_seen": sorted(seen),
+            "consistent": seen == {len(patched)},
+        }
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reviews", type=int, default=50_000)
+    parser.add_argument("--items", type=int, default=2_000, help="จำนวน item ใน QC session ที่ใช้ทดสอบ")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(data_dir, "reviews.json"), "w", encoding="utf-8") as f:
+            json.dump(make_reviews(args.reviews, seed=1), f, ensure_ascii=False)
+        with open(os.path.join(data_dir, "qc_items.json"), "w", encoding="utf-8") as f:
+            json.dump([], f)
+        for workers in (1, args.workers):
+            print(json.dumps(run(workers, data_dir, args)))
+    finally:
+        shutil.rmtree(data_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+สร้างชุดข้อมูลจำลองขนาดใหญ่ในรูปแบบเดียวกับ mock_data (reviews.json + qc_items.json)
+
+- platform / จำนวน aspect / sentiment ต่อ aspect สุ่มตามน้ำหนัก (ไม่ uniform) ใกล้เคียงข้อมูลจริง
+- วันที่กระจายทั้งช่วง มีแนวโน้มเพิ่มขึ้นและมีรีวิวช่วงเสาร์-อาทิตย์มากกว่า
+- confidence เบ้ไปทางสูง (Beta) มีหางต่ำให้ QC session เลือก
+- content เป็นประโยคภาษาไทย (ปนคำอังกฤษ / emoji) ประกอบจากวลีตาม aspect และ sentiment ของรีวิว
+- เขียนไฟล์แบบ streaming ใช้ memory คงที่ (10M รีวิว ~ 3 GB บน disk)
+- seed เดียวกันได้ไฟล์เดิมทุกครั้ง
+
+    python benchmarks/generate_data.py --reviews 1000000 --out /tmp/rr_1m
+    python benchmarks/generate_data.py --reviews 100000 --format ndjson --out /tmp/rr_ingest
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson เป็น optional dependency
+    orjson = None
+
+PLATFORMS = ["shopee", "facebook", "google", "tiktok", "instagram", "youtube"]
+PLATFORM_WEIGHTS = [30, 22, 18, 15, 10, 5]
+ASPECTS = ["taste", "price", "service", "atmosphere", "accessibility"]
+ASPECT_WEIGHTS = [34, 22, 24, 12, 8]
+ASPECT_COUNT_WEIGHTS = [55, 30, 12, 3]  # จำนวน aspect ต่อรีวิว 1..4
+SENTIMENTS = ["positive", "negative", "neutral"]
+# สัดส่วน positive / negative / neutral ของแต่ละ aspect (service กับ accessibility โดนบ่นมากกว่า)
+SENTIMENT_WEIGHTS = {
+    "taste": [62, 20, 18],
+    "price": [40, 35, 25],
+    "service": [45, 40, 15],
+    "atmosphere": [58, 22, 20],
+    "accessibility": [30, 50, 20],
+}
+PHRASES = {
+    ("taste", "positive"): ["อร่อยมาก", "รสชาติกลมกล่อม", "น้ำจิ้มคือที่สุด!", "หมูกรอบคือดีย์!!!", "เนื้อนุ่มละลายในปาก"],
+    ("taste", "negative"): ["รสชาติเค็มปี๋", "จืดมาก ไม่มีรสชาติ", "รสชาติเพี้ยนไปจากเดิม", "ของไม่สด"],
+    ("taste", "neutral"): ["รสชาติธรรมดา", "ก็กินได้ ไม่ได้ว้าว", "รสชาติมาตรฐาน"],
+    ("price", "positive"): ["คุ้มราคามาก", "ราคาไม่แรง", "โปรดีมาก คุ้มสุดๆ", "worth it มาก"],
+    ("price", "negative"): ["แพงเกินไป", "ราคาแรงอยู่เด้อออ", "ค่าส่งแพง", "โปรโมชั่นไม่ได้ลดจริง"],
+    ("price", "neutral"): ["ราคากลางๆ", "ราคาสมเหตุสมผล", "ราคาพอๆ กับเจ้าอื่น"],
+    ("service", "positive"): ["พนักงานบริการดีมาก", "จัดส่งรวดเร็ว delivery ไว", "แอดมินตอบไว", "ยิ้มแย้มแจ่มใส"],
+    ("service", "negative"): ["รอนานมาก", "แอดมินตอบช้า", "ส่งของผิด", "พนักงานหน้าบึ้ง service แย่"],
+    ("service", "neutral"): ["บริการปกติ", "ส่งตามเวลา", "พนักงานโอเค"],
+    ("atmosphere", "positive"): ["บรรยากาศดี", "ร้านสวย ถ่ายรูปได้ทุกมุม", "วิวหลักล้าน", "เพลงเพราะ"],
+    ("atmosphere", "negative"): ["เสียงดังมาก", "ร้านไม่ค่อยสะอาด", "ร้อนมาก แอร์ไม่เย็น"],
+    ("atmosphere", "neutral"): ["ร้านเรียบๆ", "บรรยากาศทั่วไป"],
+    ("accessibility", "positive"): ["เดินทางสะดวก", "ใกล้ BTS", "ที่จอดรถเยอะ"],
+    ("accessibility", "negative"): ["ที่จอดรถน้อยมาก", "ทางเข้าหายาก", "ไกลมาก เดินทางลำบาก"],
+    ("accessibility", "neutral"): ["เดินทางพอได้", "มีที่จอดบ้าง"],
+}
+FILLERS = ["", "", "", " แนะนำเลย", " จะกลับมาอีก", " ขอบาย", " 😋", " 👍", " 😡", " ✨", " ครับ", " ค่ะ", " นะ"]
+CONNECTORS = [" ", " แต่", " และ", " ส่วน", " แถม"]
+
+
+def _dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def day_weights(days: int, start: date) -> List[float]:
+    """น้ำหนักของแต่ละวัน: โตขึ้นราว 2 เท่าตลอดช่วง, เสาร์-อาทิตย์ x1.6, มี peak เล็กๆ ทุกต้นเดือน"""
+    weights = []
+    for i in range(days):
+        d = start + timedelta(days=i)
+        w = 1.0 + i / max(days - 1, 1)
+        if d.weekday() >= 5:
+            w *= 1.6
+        if d.day <= 3:
+            w *= 1.3
+        weights.append(w)
+    return weights
+
+
+def iter_reviews(
+    n: int,
+    seed: int = 0,
+    first_id: int = 1,
+    start: date = date(2024, 1, 1),
+    days: int = 365,
+) -> Iterator[dict]:
+    rng = random.Random(seed)
+    dates = [(start + timedelta(days=i)).isoformat() for i in range(days)]
+    cum_days = _cumulative(day_weights(days, start))
+    cum_platforms = _cumulative(PLATFORM_WEIGHTS)
+    cum_counts = _cumulative(ASPECT_COUNT_WEIGHTS)
+    cum_sentiments = {aspect: _cumulative(w) for aspect, w in SENTIMENT_WEIGHTS.items()}
+    for review_id in range(first_id, first_id + n):
+        count = rng.choices((1, 2, 3, 4), cum_weights=cum_counts)[0]
+        aspects = _weighted_sample(rng, count)
+        results = {}
+        parts = []
+        for aspect in aspects:
+            sentiment = rng.choices(SENTIMENTS, cum_weights=cum_sentiments[aspect])[0]
+            # confidence เบ้ไปทางสูง neutral มักมั่นใจน้อยกว่า
+            confidence = rng.betavariate(6 if sentiment == "neutral" else 9, 2)
+            results[aspect] = {"sentiment": sentiment, "confidence": round(max(0.3, min(confidence, 0.99)), 2)}
+            parts.append(rng.choice(PHRASES[(aspect, sentiment)]))
+        content = parts[0] + "".join(rng.choice(CONNECTORS) + p for p in parts[1:]) + rng.choice(FILLERS)
+        yield {
+            "review_id": review_id,
+            "source_platform": rng.choices(PLATFORMS, cum_weights=cum_platforms)[0],
+            "review_date": rng.choices(dates, cum_weights=cum_days)[0],
+            "content": content,
+            "results": results,
+        }
+
+
+def _cumulative(weights) -> List[float]:
+    total, result = 0.0, []
+    for w in weights:
+        total += w
+        result.append(total)
+    return result
+
+
+def _weighted_sample(rng: random.Random, k: int) -> List[str]:
+    # Efraimidis-Spirakis: สุ่มไม่ซ้ำตามน้ำหนัก
+    keys = sorted(((rng.random() ** (1.0 / w), a) for a, w in zip(ASPECTS, ASPECT_WEIGHTS)), reverse=True)
+    return [a for _, a in keys[:k]]
+
+
+def qc_item(review: dict, qc_item_id: int, rng: random.Random, reviewed: bool) -> dict:
+    """item ของ aspect ที่ confidence ต่ำสุดของรีวิว (แบบเดียวกับ Bucket A ของ QC session)"""
+    aspect, detail = min(review["results"].items(), key=lambda kv: kv[1]["confidence"])
+    item = {
+        "qc_item_id": qc_item_id,
+        "review_id": review["review_id"],
+        "review_content": review["content"],
+        "aspect": aspect,
+        "predicted_sentiment": detail["sentiment"],
+        "confidence": detail["confidence"],
+        "sentiment_gap": round(max(0.01, (detail["confidence"] - 0.3) * rng.uniform(0.2, 0.8)), 2),
+        "status": "pending",
+    }
+    if reviewed:
+        item.update(status="reviewed", final_sentiment=detail["sentiment"], confirmed=1)
+    return item
+
+
+def generate(
+    out_dir: str,
+    reviews: int,
+    qc_items: int = 1000,
+    reviewed_ratio: float = 0.0,
+    seed: int = 0,
+    days: int = 365,
+    fmt: str = "json",
+    first_id: int = 1,
+    progress: bool = False,
+) -> Dict[str, object]:
+    """เขียน reviews.json (หรือ reviews.ndjson) และ qc_items.json ลง out_dir คืนสรุปของชุดข้อมูล"""
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed + 1)
+    # เลือกรีวิวสำหรับ qc_items แบบ reservoir-free: สุ่มด้วยความน่าจะเป็นคงที่ แล้วตัดให้ไม่เกินจำนวนที่ขอ
+    pick = min(1.0, qc_items / reviews * 1.05) if reviews else 0.0
+    items: List[dict] = []
+    name = "reviews.json" if fmt == "json" else "reviews.ndjson"
+    t0 = time.perf_counter()
+    with open(os.path.join(out_dir, name), "wb") as f:
+        if fmt == "json":
+            f.write(b"[")
+        buffer: List[bytes] = []
+        for i, review in enumerate(iter_reviews(reviews, seed, first_id, days=days)):
+            row = _dumps(review)
+            buffer.append((b",\n" if i and fmt == "json" else b"\n" if i else b"") + row)
+            if len(items) < qc_items and rng.random() < pick:
+                items.append(qc_item(review, 5001 + len(items), rng, rng.random() < reviewed_ratio))
+            if len(buffer) >= 10_000:
+                f.write(b"".join(buffer))
+                buffer.clear()
+                if progress and (i + 1) % 1_000_000 == 0:
+                    print(f"{i + 1:,} reviews ({time.perf_counter() - t0:.0f}s)", file=sys.stderr)
+        f.write(b"".join(buffer))
+        f.write(b"]\n" if fmt == "json" else b"\n")
+    with open(os.path.join(out_dir, "qc_items.json"), "wb") as f:
+        f.write(b"[" + b",\n".join(_dumps(item) for item in items) + b"]\n")
+    return {
+        "out_dir": out_dir,
+        "reviews": reviews,
+        "qc_items": len(items),
+        "seed": seed,
+        "days": days,
+        "format": fmt,
+        "bytes": os.path.getsize(os.path.join(out_dir, name)),
+        "seconds": round(time.perf_counter() - t0, 2),
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--reviews", type=int, default=10_000, help="จำนวนรีวิว (10k ถึง 10M)")
+    parser.add_argument("--qc-items", type=int, default=1000, help="จำนวน item ใน qc_items.json")
+    parser.add_argument("--reviewed-ratio", type=float, default=0.0, help="สัดส่วน qc item ที่ review แล้ว")
+    parser.add_argument("--days", type=int, default=365, help="จำนวนวันที่รีวิวกระจายตั้งแต่ 2024-01-01")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=["json", "ndjson"], default="json")
+    parser.add_argument("--out", required=True, help="โฟลเดอร์ปลายทาง (ใช้เป็น REVIEW_RADAR_DATA_DIR ได้ตรงๆ)")
+    args = parser.parse_args(argv)
+    summary = generate(
+        args.out, args.reviews, args.qc_items, args.reviewed_ratio, args.seed, args.days, args.format,
+        progress=args.reviews >= 1_000_000,
+    )
+    print(json.dumps(summary, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,12 @@ let currentPlatform = 'all';
 let currentView = 'dashboard';
 let activeCharts = [];
 let overallChartInstance = null;
+// metrics ที่แสดงอยู่ (พร้อม filter และ version ของข้อมูล) สำหรับบวก metrics_delta จาก SSE
+let currentMetrics = null;
+// delta ที่มาระหว่างโหลด metrics (null = ไม่ได้กำลังโหลด)
+let pendingDeltas = null;
+let metricsRequest = 0;
+let deltaRenderScheduled = false;
 
 // สีเดิมที่คุณตั้งค่าไว้ (Vibrant Pastel)
 const COLORS = {
@@ -29,8 +35,7 @@ const SentimentService = {
 		try {
 			const res = await fetch(`/api/batches/${batchId}/metrics?${params}`);
 			if (!res.ok) throw new Error('Metrics API Error');
-			const json = await res.json();
-			return json.data;
+			return await res.json();
 		} catch (err) {
 			console.error(err);
 			return null;
@@ -39,9 +44,10 @@ const SentimentService = {
 
 	// ดึง Reviews (ตาราง)
 	async getReviews(batchId, platform, startDate, endDate, sentiment, aspect) {
-		// API ปัจจุบันรับ params ตามนี้
 		const params = new URLSearchParams({ sort: 'random', limit: 50 });
-		if (platform !== 'all') params.append('platform', platform);
+		if (startDate) params.append('from_date', startDate);
+		if (endDate) params.append('to_date', endDate);
+		if (platform !== 'all') params.append('platforms', platform);
 
 		try {
 			const res = await fetch(`/api/batches/${batchId}/reviews?${params}`);
@@ -99,39 +105,59 @@ function renderCurrentView() {
 async function renderDashboard() {
 	const loadingOverlay = document.getElementById('loadingOverlay');
 	if (loadingOverlay) loadingOverlay.style.display = 'flex';
+	const request = ++metricsRequest;
 
 	try {
 		const startDate = document.getElementById('startDate').value;
 		const endDate = document.getElementById('endDate').value;
 
-		// 1. เรียก API
-		const data = await SentimentService.getMetrics(DEFAULT_BATCH_ID, currentPlatform, startDate, endDate);
-
-		if (data) {
-			// 2. อัปเดตตัวเลข Platform Counts
-			updatePlatformCounts(data.platform_counts);
-
-			// 3. เตรียมข้อมูล Overall Chart (แปลง positive -> pos)
-			const overallScores = {
-				pos: data.overall_sentiment.positive,
-				neg: data.overall_sentiment.negative,
-				neu: data.overall_sentiment.neutral
+		// 1. เรียก API (delta ที่มาระหว่างรอถูกเก็บไว้ก่อน)
+		pendingDeltas = [];
+		const json = await SentimentService.getMetrics(DEFAULT_BATCH_ID, currentPlatform, startDate, endDate);
+		// filter ถูกเปลี่ยนระหว่างรอ: ผลของ request ล่าสุดจะมาแทน
+		if (request !== metricsRequest) return;
+
+		if (json) {
+			currentMetrics = {
+				data: json.data,
+				version: json.meta.version,
+				platform: currentPlatform,
+				startDate,
+				endDate
 			};
-
-			renderOverallChart(overallScores);
-			updateOverallStats(overallScores);
-
-			// 4. วาดกราฟ Aspect
-			renderAspectGrid(data.aspect_metrics);
+			// delta ที่ใหม่กว่าข้อมูลที่เพิ่งโหลดมา
+			pendingDeltas.forEach(delta => mergeMetricsDelta(currentMetrics, delta));
+			drawMetrics(currentMetrics.data);
 		}
 
 	} catch (error) {
 		console.error("Dashboard Error:", error);
 	} finally {
-		if (loadingOverlay) loadingOverlay.style.display = 'none';
+		if (request === metricsRequest) {
+			pendingDeltas = null;
+			if (loadingOverlay) loadingOverlay.style.display = 'none';
+		}
 	}
 }
 
+function drawMetrics(data) {
+	// 2. อัปเดตตัวเลข Platform Counts
+	updatePlatformCounts(data.platform_counts);
+
+	// 3. เตรียมข้อมูล Overall Chart (แปลง positive -> pos)
+	const overallScores = {
+		pos: data.overall_sentiment.positive,
+		neg: data.overall_sentiment.negative,
+		neu: data.overall_sentiment.neutral
+	};
+
+	renderOverallChart(overallScores);
+	updateOverallStats(overallScores);
+
+	// 4. วาดกราฟ Aspect
+	renderAspectGrid(data.aspect_metrics);
+}
+
 function updatePlatformCounts(counts) {
 	const setTxt = (id, val) => {
 		const el = document.getElementById(id);
@@ -348,5 +374,56 @@ async function renderCommentsList() {
 	}
 }
 
+// --- 6. LIVE UPDATES (SSE) ---
+
+// บวก delta (แยกเป็น cell ตาม platform / วัน) เฉพาะส่วนที่ตรงกับ filter ของ metrics ที่แสดงอยู่
+function mergeMetricsDelta(metrics, delta) {
+	if (delta.version <= metrics.version) return false; // metrics ที่โหลดมารวม delta นี้แล้ว
+	metrics.version = delta.version;
+	const data = metrics.data;
+	const addCounts = (target, counts) => {
+		Object.entries(counts).forEach(([key, n]) => target[key] = (target[key] || 0) + n);
+	};
+	delta.cells.forEach(cell => {
+		if ((metrics.startDate && cell.date < metrics.startDate) || (metrics.endDate && cell.date > metrics.endDate)) return;
+		// platform_counts นับทุก platform (ตัวเลขบนปุ่ม) ส่วน sentiment นับเฉพาะ platform ที่เลือก
+		data.platform_counts[cell.platform] = (data.platform_counts[cell.platform] || 0) + cell.reviews;
+		if (metrics.platform !== 'all' && metrics.platform !== cell.platform) return;
+		addCounts(data.overall_sentiment, cell.sentiment);
+		Object.entries(cell.aspects).forEach(([aspect, counts]) => {
+			if (!data.aspect_metrics[aspect]) data.aspect_metrics[aspect] = { positive: 0, negative: 0, neutral: 0 };
+			addCounts(data.aspect_metrics[aspect], counts);
+		});
+	});
+	return true;
+}
+
+function applyMetricsDelta(delta) {
+	if (pendingDeltas) {
+		pendingDeltas.push(delta);
+		return;
+	}
+	if (!currentMetrics || !mergeMetricsDelta(currentMetrics, delta)) return;
+	if (currentView !== 'dashboard' || deltaRenderScheduled) return;
+	// ingest ส่ง delta ทุก 1000 รีวิว วาดกราฟใหม่อย่างมากเฟรมละครั้ง
+	deltaRenderScheduled = true;
+	requestAnimationFrame(() => {
+		deltaRenderScheduled = false;
+		drawMetrics(currentMetrics.data);
+	});
+}
+
+function subscribeBatchEvents(batchId) {
+	if (!window.EventSource) return;
+	const source = new EventSource(`/api/batches/${batchId}/events`);
+	source.addEventListener('metrics_delta', (e) => applyMetricsDelta(JSON.parse(e.data)));
+	// ตามไม่ทันหรือข้อมูลถูก reload: โหลด metrics เต็มใหม่
+	source.addEventListener('resync', () => {
+		currentMetrics = null;
+		if (currentView === 'dashboard') renderDashboard();
+	});
+}
+
 // Start
 renderCurrentView();
+subscribeBatchEvents(DEFAULT_BATCH_ID);
@@ -1,12 +1,16 @@
 // Global Variables
 const SESSION_ID = 55; // Hardcode ไว้ก่อน
 let currentQCItems = [];
+// qc_item_id -> item ของ currentQCItems (หา item จาก event ได้ทันทีแม้ bulk update จะมีหลายพันรายการ)
+let qcItemsById = new Map();
 let currentAuditItemId = null;
 let auditModal = null;
+let qcEvents = null;
 
 document.addEventListener('DOMContentLoaded', () => {
 	auditModal = new bootstrap.Modal(document.getElementById('auditModal'));
 	loadQCItems();
+	subscribeQCEvents();
 });
 
 // --- API Functions ---
@@ -21,6 +25,7 @@ async function loadQCItems() {
 
 		// 2. เก็บข้อมูลไว้ใน Global Variable
 		currentQCItems = data.items;
+		qcItemsById = new Map(currentQCItems.map(item => [item.qc_item_id, item]));
 
 		// 3. อัปเดต UI
 		renderStats(data.meta.progress);
@@ -49,16 +54,57 @@ async function submitUpdate(qcItemId, correctSentiment) {
 
 		if (!res.ok) throw new Error('Update Failed');
 
-		// Update สำเร็จ -> รีโหลดตาราง
-		await loadQCItems();
+		// Update สำเร็จ -> อัปเดตแถวนั้นทันที (progress จะตามมาทาง SSE)
+		const json = await res.json();
+		applyItemUpdate(json.data);
 		auditModal.hide();
 
+		// ถ้าไม่ได้ต่อ SSE อยู่ ให้โหลดตารางใหม่เหมือนเดิม
+		if (!qcEvents || qcEvents.readyState !== EventSource.OPEN) await loadQCItems();
+
 	} catch (err) {
 		console.error(err);
 		alert("Error saving data");
 	}
 }
 
+// --- Live Updates (SSE) ---
+
+function subscribeQCEvents() {
+	if (!window.EventSource) return;
+	qcEvents = new EventSource(`/api/qc-sessions/${SESSION_ID}/events`);
+
+	// progress ล่าสุด (ส่งมาตอนเชื่อมต่อ)
+	qcEvents.addEventListener('progress', (e) => renderStats(JSON.parse(e.data)));
+
+	// มีคน review item ใน session นี้ (รวมถึงคนอื่นที่เปิดหน้าเดียวกันอยู่)
+	qcEvents.addEventListener('qc_item', (e) => {
+		const update = JSON.parse(e.data);
+		applyItemUpdate(update);
+		renderStats(update.progress);
+	});
+
+	// bulk update หลาย item พร้อมกัน
+	qcEvents.addEventListener('qc_items', (e) => {
+		const update = JSON.parse(e.data);
+		let changed = false;
+		update.items.forEach(item => changed = applyItemUpdate(item, false) || changed);
+		if (changed) renderTable(currentQCItems);
+		renderStats(update.progress);
+	});
+
+	// ตามไม่ทันหรือข้อมูลถูกโหลดใหม่ -> ดึงรายการทั้งหมดใหม่
+	qcEvents.addEventListener('resync', () => loadQCItems());
+}
+
+function applyItemUpdate(update, render = true) {
+	const item = qcItemsById.get(update.qc_item_id);
+	if (!item || item.status === update.status) return false;
+	item.status = update.status;
+	if (render) renderTable(currentQCItems);
+	return true;
+}
+
 
 // --- Render Functions ---
 
@@ -122,7 +168,7 @@ function renderTable(items) {
 
 function openAuditModal(qcItemId) {
 	// หาข้อมูล item จาก array
-	const item = currentQCItems.find(i => i.qc_item_id === qcItemId);
+	const item = qcItemsById.get(qcItemId);
 	if (!item) return;
 
 	currentAuditItemId = qcItemId;
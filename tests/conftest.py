@@ -0,0 +1,40 @@
+"""
+รัน API บนสำเนาของ mock_data ใน temp directory (test แก้ QC / ingest ได้โดยไม่แตะไฟล์ใน repo)
+
+    python -m pytest -q
+
+app.main อ่าน REVIEW_RADAR_* ตอน import จึงต้องตั้งค่าที่นี่ก่อน test module ใด import app
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DATA_DIR = tempfile.mkdtemp(prefix="review-radar-test-")
+shutil.copytree(os.path.join(ROOT, "mock_data"), DATA_DIR, dirs_exist_ok=True)
+os.environ["REVIEW_RADAR_DATA_DIR"] = DATA_DIR
+os.environ["REVIEW_RADAR_BACKEND"] = "file"
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def app_main():
+    import app.main
+
+    return app.main
+
+
+@pytest.fixture(scope="session")
+def client(app_main):
+    from fastapi.testclient import TestClient
+
+    with TestClient(app_main.app) as c:
+        yield c
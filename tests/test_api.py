@@ -0,0 +1,156 @@
+import json
+
+BATCH = "b1"
+
+
+def review_ids(page):
+    return [r["review_id"] for r in page["data"]]
+
+
+# --- 1.2 GET Reviews ---
+def test_cursor_pages_cover_batch_in_order(client):
+    everything = client.get(f"/api/batches/{BATCH}/reviews", params={"sort": "date", "limit": 1000}).json()
+    expected = [(r["review_date"], r["review_id"]) for r in everything["data"]]
+    assert expected == sorted(expected)
+    assert everything["meta"]["next_cursor"] is None
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"sort": "date", "limit": 7}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get(f"/api/batches/{BATCH}/reviews", params=params).json()
+        assert page["meta"]["total_found"] == len(expected)
+        assert len(page["data"]) <= 7
+        seen += [(r["review_date"], r["review_id"]) for r in page["data"]]
+        cursor = page["meta"]["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == expected
+
+
+def test_cursor_respects_platform_filter(client):
+    params = {"sort": "date", "platform": "shopee", "limit": 3}
+    first = client.get(f"/api/batches/{BATCH}/reviews", params=params).json()
+    second = client.get(
+        f"/api/batches/{BATCH}/reviews", params={**params, "cursor": first["meta"]["next_cursor"]}
+    ).json()
+    rows = first["data"] + second["data"]
+    assert {r["source_platform"].lower() for r in rows} == {"shopee"}
+    assert len(set(review_ids(first)) & set(review_ids(second))) == 0
+
+
+def test_invalid_cursor_is_rejected(client):
+    r = client.get(f"/api/batches/{BATCH}/reviews", params={"sort": "date", "cursor": "not-a-cursor"})
+    assert r.status_code == 400
+
+
+def test_random_sort_is_reproducible_with_seed(client):
+    params = {"sort": "random", "limit": 10, "seed": 42}
+    first = client.get(f"/api/batches/{BATCH}/reviews", params=params).json()
+    again = client.get(f"/api/batches/{BATCH}/reviews", params=params).json()
+    other = client.get(f"/api/batches/{BATCH}/reviews", params={**params, "seed": 7}).json()
+    assert len(first["data"]) == 10
+    assert len(set(review_ids(first))) == 10
+    assert review_ids(first) == review_ids(again)
+    assert review_ids(first) != review_ids(other)
+
+
+# --- 1.1 GET Metrics ---
+def test_metrics_etag_returns_304(client):
+    url = f"/api/batches/{BATCH}/metrics"
+    first = client.get(url, params={"platforms": "shopee"})
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    cached = client.get(url, params={"platforms": "shopee"}, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    stale = client.get(url, params={"platforms": "shopee"}, headers={"If-None-Match": '"stale"'})
+    assert stale.status_code == 200
+    assert stale.json() == first.json()
+
+
+# --- 1.5 POST Ingest Reviews ---
+def make_review(review_id, day=1):
+    return {
+        "review_id": review_id,
+        "source_platform": "Shopee",
+        "review_date": f"2025-01-{day:02d}",
+        "content": f"รีวิวทดสอบ {review_id}",
+        "results": {"TASTE": {"sentiment": "positive", "confidence": 0.9}},
+    }
+
+
+def test_ingest_reports_duplicates_and_invalid_rows(client):
+    url = "/api/batches/ingest-test/reviews/ingest"
+    rows = [make_review(700000 + i, i % 28 + 1) for i in range(5)]
+    lines = [json.dumps(r, ensure_ascii=False) for r in rows]
+    lines += [
+        json.dumps(rows[0], ensure_ascii=False),  # ซ้ำในไฟล์เดียวกัน
+        "{bad json",
+        json.dumps({"review_id": "abc"}),
+        "",
+    ]
+    r = client.post(url, params={"create": "true"}, content="\n".join(lines).encode("utf-8"))
+    assert r.status_code == 200
+    report = r.json()
+    assert report["accepted"] == 5
+    assert report["duplicates"] == 1
+    assert report["invalid"] == 2
+    assert len(report["errors"]) == 2
+    assert report["total_reviews"] == 5
+
+    # ส่งซ้ำ: ทุกแถวซ้ำกับที่ ingest ไปแล้ว
+    again = client.post(url, content="\n".join(lines[:5]).encode("utf-8")).json()
+    assert again["accepted"] == 0
+    assert again["duplicates"] == 5
+    assert again["total_reviews"] == 5
+
+    page = client.get("/api/batches/ingest-test/reviews", params={"sort": "date", "limit": 10}).json()
+    assert sorted(review_ids(page)) == [r["review_id"] for r in rows]
+
+
+# --- 2.3 / 2.5 PATCH QC Items ---
+def saved_qc_items(app_main):
+    app_main.qc_writer.flush()
+    with open(app_main.data_store.path("qc_items.json"), encoding="utf-8") as f:
+        return {item["qc_item_id"]: item for item in json.load(f)}
+
+
+def test_patch_qc_item_is_persisted(client, app_main):
+    r = client.patch("/api/qc-items/5001", json={"correct_sentiment": "positive", "confirmed": 1})
+    assert r.status_code == 200
+    assert r.json()["data"]["final_sentiment"] == "positive"
+
+    item = saved_qc_items(app_main)[5001]
+    assert item["status"] == "reviewed"
+    assert item["final_sentiment"] == "positive"
+    assert item["confirmed"] == 1
+
+    assert client.patch("/api/qc-items/1", json={"confirmed": 1}).status_code == 404
+
+
+def test_bulk_patch_qc_items_is_persisted(client, app_main):
+    r = client.patch("/api/qc-sessions/55/items", json={"items": [
+        {"qc_item_id": 5002},
+        {"qc_item_id": 5003, "correct_sentiment": "positive"},
+        {"qc_item_id": 1},
+    ]})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["success"] is False
+    assert body["updated_count"] == 2
+    assert [x["success"] for x in body["results"]] == [True, True, False]
+
+    items = saved_qc_items(app_main)
+    assert items[5002]["status"] == "reviewed"
+    assert items[5002]["final_sentiment"] == items[5002]["predicted_sentiment"]
+    assert items[5003]["final_sentiment"] == "positive"
+    assert 1 not in items
+
+    session = client.get("/api/qc-sessions/55").json()
+    statuses = {i["qc_item_id"]: i["status"] for i in session["items"]}
+    assert statuses[5002] == statuses[5003] == "reviewed"